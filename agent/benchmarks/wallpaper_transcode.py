@@ -0,0 +1,84 @@
+"""
+Cost of serving the lab wallpaper as a screen-sized variant instead of the
+original image.
+
+For a synthetic photo-like source it measures, per screen resolution: the
+time to build the variant (cold, once per machine) and to decode the image
+the desktop will load, the file size, and the decoded bitmap the compositor
+keeps in memory (4 bytes per pixel).
+
+    python benchmarks/wallpaper_transcode.py [--width 6000 --height 4000 --repeat 5]
+"""
+import argparse
+import io
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageFilter  # noqa: E402
+
+from src.features.wallpaper_transcode import target_size, transcode  # noqa: E402
+
+SCREENS = [(1366, 768), (1920, 1080), (2560, 1440), (3840, 2160)]
+
+
+def make_source(path: str, width: int, height: int, fmt: str):
+    """Gradient plus blurred noise: compresses roughly like a photograph."""
+    noise = Image.effect_noise((width // 4, height // 4), 64).convert('RGB').resize((width, height))
+    gradient = Image.linear_gradient('L').resize((width, height)).convert('RGB')
+    Image.blend(noise.filter(ImageFilter.GaussianBlur(2)), gradient, 0.5).save(path, format=fmt, quality=95)
+
+
+def timed(func, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def decode(path: str):
+    with Image.open(path) as img:
+        img.load()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--width', type=int, default=6000)
+    parser.add_argument('--height', type=int, default=4000)
+    parser.add_argument('--format', default='JPEG', choices=['JPEG', 'PNG'])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        source = os.path.join(tmp, f"source.{args.format.lower()}")
+        make_source(source, args.width, args.height, args.format)
+        source_bytes = os.path.getsize(source)
+        source_decode = timed(lambda: decode(source), args.repeat)
+        print(f"source {args.width}x{args.height} {args.format}: {source_bytes / 1024:.0f} KiB, "
+              f"decode {source_decode:.1f} ms, bitmap {args.width * args.height * 4 / 2**20:.1f} MiB")
+        print(f"{'screen':>11} {'variant':>11} {'build ms':>9} {'decode ms':>10} {'KiB':>7} {'bitmap MiB':>11}")
+
+        for screen in SCREENS:
+            variant = os.path.join(tmp, f"variant-{screen[0]}x{screen[1]}.jpg")
+            build = timed(lambda: transcode(source, variant, screen, fmt='JPEG'), args.repeat)
+            variant_decode = timed(lambda: decode(variant), args.repeat)
+            size = target_size((args.width, args.height), screen)
+            print(f"{screen[0]:>5}x{screen[1]:<5} {size[0]:>5}x{size[1]:<5} {build:>9.1f} {variant_decode:>10.1f} "
+                  f"{os.path.getsize(variant) / 1024:>7.0f} {size[0] * size[1] * 4 / 2**20:>11.1f}")
+
+        # Baseline for the build column: full decode + resize without JPEG draft mode
+        def naive():
+            with Image.open(source) as img:
+                img.convert('RGB').resize(target_size(img.size, SCREENS[1]), Image.Resampling.LANCZOS) \
+                    .save(io.BytesIO(), format='JPEG', quality=90)
+        print(f"naive full-decode build for {SCREENS[1][0]}x{SCREENS[1][1]}: {timed(naive, args.repeat):.1f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -117,8 +117,8 @@ cat > "$AUTOSTART_DIR/iflab-wallpaper.desktop" <<EOF
 [Desktop Entry]
 Type=Application
 Name=IFLab Wallpaper Applier
-Comment=Applies lab wallpaper on login and periodically
-Exec=$AGENT_DIR/.venv/bin/python $AGENT_DIR/main.py --apply-wallpaper
+Comment=Applies the lab wallpaper on login and whenever the agent service updates it
+Exec=$AGENT_DIR/.venv/bin/python $AGENT_DIR/main.py --watch-wallpaper
 Terminal=false
 NoDisplay=true
 X-GNOME-Autostart-enabled=true
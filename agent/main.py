@@ -2,8 +2,14 @@ import sys
 import os
 import time
 import socket
+import random
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import requests
+
 # Fix sys.path for NSSM/Windows Service
 _current_dir = os.path.dirname(os.path.abspath(__file__))
 if _current_dir not in sys.path:
@@ -12,15 +18,28 @@ if _current_dir not in sys.path:
 from src import config
 from src.utils.logger import setup_logger
 from src.security import get_hardware_fingerprint
-from src.api_client import ApiClient
+from src.api_client import ApiClient, AsyncApiClient, CIRCUIT_CLOSED
+from src.api_stats import ApiStats, write_status_file, read_status_file
+from src.outbox import Outbox
 
-from src.collectors.hardware import get_hardware_info
+from src.collectors.hardware import get_hardware_info, get_hardware_inventory
 from src.collectors.software import get_software_list
+from src.collectors.software_state import SoftwareInventoryState
+from src.collectors.sampler import MetricsSampler
+from src.collectors.aggregation import WindowAggregator
+from src.collectors.rates import CounterRates
+from src.collectors.disks import get_disk_usage, get_disk_probe
+from src.collectors.registry import CollectorRegistry, COST_HIGH
 from src.features.wallpaper import WallpaperManager
 from src.features.kiosk import KioskManager
 from src.commands.executor import CommandExecutor
 from src.commands.parser import is_command_expired
+from src.commands.transport import LongPollTransport
+from src.commands.status import StatusReporter
+from src.commands.polling import AdaptivePollController
 from src.features.updater import execute_installer
+from src.utils.scheduler import Scheduler, MISSED_SKIP
+from src.utils.delta import SnapshotDeltaEncoder
 
 logger = setup_logger(__name__)
 
@@ -38,6 +57,27 @@ class AgentOrchestrator:
         self.wallpaper_man = WallpaperManager(self.api)
         self.kiosk_man = KioskManager(str(self.agent_dir))
         self.cmd_executor = CommandExecutor(str(self.agent_dir), self.api)
+        self.command_channel = None
+        if config.COMMAND_TRANSPORT == 'longpoll':
+            self.command_channel = LongPollTransport(self.api, self.on_pushed_commands)
+        self._commands_lock = threading.Lock()
+        self.outbox = Outbox()
+        self.status_reporter = StatusReporter(self.api, outbox=self.outbox)
+        self.poll_controller = AdaptivePollController()
+        self.sampler = MetricsSampler()
+        self.metrics_windows = WindowAggregator(self.sampler)
+        self.metrics_batch_supported = True
+        # Set once the server has answered on the batch endpoint; until then a batch is never parked
+        self.metrics_batch_confirmed = False
+        self.counter_rates = CounterRates()
+        self.hardware = get_hardware_inventory()
+        self.software_state = SoftwareInventoryState()
+        self.collectors = CollectorRegistry()
+        self.register_collectors()
+        self.metrics_encoder = SnapshotDeltaEncoder()
+        self._api_stats_acked = None
+        self.scheduler = Scheduler(max_workers=config.SCHEDULER_WORKERS)
+        self.api.add_circuit_listener(self.on_circuit_change)
 
     def get_current_version(self) -> str:
         """Get the current agent version."""
@@ -99,107 +139,350 @@ class AgentOrchestrator:
                 
         return False
 
+    def register_collectors(self):
+        """Probes used by metrics and reports; each runs with its own deadline."""
+        timeouts = config.COLLECTOR_TIMEOUTS
+        # Looked up at call time so the collectors can be swapped (e.g. in tests)
+        self.collectors.register('disks', lambda: get_disk_usage(), timeouts['disks'])
+        self.collectors.register('hardware', lambda: get_hardware_info(), timeouts['hardware'])
+        self.collectors.register('software', lambda: get_software_list(), timeouts['software'], cost=COST_HIGH)
+
+    def collect_metrics(self) -> dict:
+        """Build the lightweight metrics snapshot from the background sampler plus disk usage."""
+        import psutil
+        if not len(self.sampler.series['cpu_percent']):
+            self.sampler.sample_once()
+        latest = self.sampler.latest()
+        cpu_usage = self.sampler.mean('cpu_percent', config.METRICS_INTERVAL)
+        
+        disk_info = self.collectors.run(['disks']).get('disks', [])
+
+        counters = {
+            'net_sent': latest.get('net_bytes_sent', 0),
+            'net_recv': latest.get('net_bytes_recv', 0),
+            'disk_read': latest.get('disk_read_bytes', 0),
+            'disk_write': latest.get('disk_write_bytes', 0),
+        }
+        try:
+            for nic, io in psutil.net_io_counters(pernic=True).items():
+                counters[f"nic:{nic}:sent"] = io.bytes_sent
+                counters[f"nic:{nic}:recv"] = io.bytes_recv
+        except Exception:
+            pass
+        rates = self.counter_rates.update(counters)
+        interfaces = {}
+        for key, rate in rates.items():
+            if key.startswith('nic:'):
+                nic, direction = key[len('nic:'):].rsplit(':', 1)
+                interfaces.setdefault(nic, {})[f'{direction}_bytes_per_sec'] = rate
+
+        return {
+            'cpu_usage_percent': round(cpu_usage if cpu_usage is not None else latest['cpu_percent'], 1),
+            'memory_usage_percent': latest['memory_percent'],
+            'memory_total_gb': round(latest['memory_total'] / (1024**3), 2),
+            'memory_free_gb': round(latest['memory_available'] / (1024**3), 2),
+            'disk_usage': disk_info,
+            'network_stats': {
+                'bytes_sent': int(latest.get('net_bytes_sent', 0)),
+                'bytes_recv': int(latest.get('net_bytes_recv', 0)),
+                'sent_bytes_per_sec': rates.get('net_sent'),
+                'recv_bytes_per_sec': rates.get('net_recv'),
+                'interfaces': interfaces,
+            },
+            'disk_io': {
+                'read_bytes_per_sec': rates.get('disk_read'),
+                'write_bytes_per_sec': rates.get('disk_write'),
+            },
+            'unresponsive_mounts': get_disk_probe().unresponsive(),
+            'uptime_seconds': int(time.time() - psutil.boot_time()),
+            'processes_count': len(psutil.pids()),
+        }
+
+    def deliver(self, kind: str, endpoint: str, payload, compressed: bool = False, dedupe_key: str = None,
+                fallback: tuple = None):
+        """
+        POST a payload now, or keep it in the durable outbox when the backend is
+        unreachable or failing. Returns the response, or None if it was stored.
+        While a backlog exists new payloads queue behind it to keep their order.
+        fallback=(endpoint, payload, compressed) is stored instead of the payload.
+        """
+        if not len(self.outbox):
+            try:
+                if compressed:
+                    response = self.api.post_compressed(endpoint, payload)
+                else:
+                    response = self.api.post(endpoint, json=payload)
+                if response.status_code < 500 and response.status_code not in (408, 429):
+                    return response
+            except requests.exceptions.RequestException:
+                pass
+        if fallback:
+            endpoint, payload, compressed = fallback
+        self.outbox.enqueue(kind, 'POST', endpoint, payload, compressed=compressed, dedupe_key=dedupe_key)
+        self.request_outbox_drain(config.OUTBOX_DRAIN_INTERVAL)
+        return None
+
     def send_metrics_report(self) -> bool:
-        """Send lightweight metrics report to backend."""
+        """
+        Send the metrics snapshot plus the aggregated windows since the last upload,
+        in one compressed batch. The snapshot is delta-encoded against the last one
+        the server acknowledged; the legacy endpoint always gets it in full.
+        """
         if not self.api.computer_id:
             return False
             
-        import psutil
         try:
-            memory = psutil.virtual_memory()
-            
-            disk_info = []
-            for part in psutil.disk_partitions(all=False):
-                if 'cdrom' in part.opts or part.fstype == '': continue
-                try:
-                    usage = psutil.disk_usage(part.mountpoint)
-                    disk_info.append({
-                        'mount': part.mountpoint,
-                        'percent': usage.percent,
-                        'free_gb': round(usage.free / (1024**3), 2),
-                        'total_gb': round(usage.total / (1024**3), 2)
-                    })
-                except Exception:
-                    pass
-                    
-            metrics = {
-                'cpu_usage_percent': psutil.cpu_percent(interval=1),
-                'memory_usage_percent': memory.percent,
-                'memory_total_gb': round(memory.total / (1024**3), 2),
-                'memory_free_gb': round(memory.available / (1024**3), 2),
-                'disk_usage': disk_info,
-                'network_stats': {
-                    'bytes_sent': psutil.net_io_counters().bytes_sent,
-                    'bytes_recv': psutil.net_io_counters().bytes_recv,
-                },
-                'uptime_seconds': int(time.time() - psutil.boot_time()),
-                'processes_count': len(psutil.pids()),
-            }
-            response = self.api.post(f"/computers/{self.api.computer_id}/metrics", json=metrics)
-            return response.status_code == 200
+            metrics = self.collect_metrics()
+            if self.metrics_batch_supported:
+                self.metrics_windows.collect()
+                windows = self.metrics_windows.pending()
+                payload = self.metrics_encoder.encode(metrics)
+                api_counters = self.api.stats.counters()
+                payload.update({
+                    'window_seconds': self.metrics_windows.window,
+                    'windows': windows,
+                    # API health since the last upload that reached the server (or the outbox)
+                    'api_stats': ApiStats.window(api_counters, self._api_stats_acked),
+                })
+                # A backend that may lack the batch route gets the legacy snapshot parked instead:
+                # a stored batch replayed there would be rejected and lost
+                legacy = (f"/computers/{self.api.computer_id}/metrics", metrics, False)
+                response = self.deliver(
+                    'metrics',
+                    f"/computers/{self.api.computer_id}/metrics/batch",
+                    payload,
+                    compressed=True,
+                    fallback=None if self.metrics_batch_confirmed else legacy,
+                )
+                if response is None and not self.metrics_batch_confirmed:
+                    # The windows stay pending until a batch reaches the server
+                    return True
+                if response is not None and response.status_code in (200, 201, 202, 409):
+                    self.metrics_batch_confirmed = True
+                if response is None or response.status_code in (200, 201, 202):
+                    self.metrics_windows.acknowledge(len(windows))
+                    self._api_stats_acked = api_counters
+                    if response is not None:
+                        self.metrics_encoder.acknowledge()
+                    return True
+                if response.status_code == 409:
+                    # The server no longer has our delta base: resend in full
+                    logger.info("Servidor sem snapshot base; reenviando métricas completas")
+                    self.metrics_encoder.reset()
+                    return False
+                if response.status_code not in (404, 405, 415):
+                    return False
+                logger.info("Endpoint de métricas em lote indisponível; enviando apenas o snapshot")
+                self.metrics_batch_supported = False
+                
+            response = self.deliver('metrics', f"/computers/{self.api.computer_id}/metrics", metrics)
+            return response is None or response.status_code == 200
         except Exception as e:
             logger.error(f"Erro ao enviar métricas: {e}")
             return False
 
+    def build_detailed_report(self) -> dict:
+        """
+        Collect hardware and software inventory for the detailed report (blocking).
+        hardware_info is left out when it has not changed materially since the last upload,
+        and software is sent as a hash or a diff once the server holds an inventory.
+        """
+        collected = self.collectors.run(['hardware', 'software'])
+        report = {
+            'agent_version': self.get_current_version(),
+            'hostname': socket.gethostname()
+        }
+        if 'software' in collected.values:
+            report.update(self.software_state.build(collected.get('software')))
+        hardware_info = collected.get('hardware')
+        if hardware_info and self.hardware.has_changed(hardware_info):
+            report['hardware_info'] = hardware_info
+        if collected.partial:
+            # e.g. {'software': 'timeout'}: the server keeps its previous data for these
+            report['partial_collectors'] = collected.partial
+        return report
+
     def send_detailed_report(self) -> bool:
         """Send detailed hardware and software report to backend."""
         if not self.api.computer_id:
             return False
+        if self.api.circuit_open:
+            # Expensive to collect and not urgent: wait for the backend to recover
+            return False
             
         try:
-            hardware = get_hardware_info()
-            software = get_software_list()
-            
-            payload = {
-                'hardware_info': hardware,
-                'softwares': software,
-                'agent_version': self.get_current_version(),
-                'hostname': socket.gethostname()
-            }
-            
-            response = self.api.post(f"/computers/{self.api.computer_id}/report", json=payload)
-            return response.status_code in [200, 201]
+            payload = self.build_detailed_report()
+            # Only the latest report matters if several pile up offline
+            response = self.deliver('report', f"/computers/{self.api.computer_id}/report", payload,
+                                    dedupe_key='report')
+            # A report parked in the outbox may be replaced by a newer one, so only
+            # a confirmed delivery counts as uploading the hardware inventory
+            if response is not None and response.status_code in [200, 201]:
+                if 'hardware_info' in payload:
+                    self.hardware.mark_uploaded(payload['hardware_info'])
+                if 'softwares_hash' in payload:
+                    self.software_state.acknowledge(self._response_field(response, 'softwares_hash'))
+            elif response is not None and response.status_code == 409:
+                logger.info("Servidor fora de sincronia com o inventário de software; reenviando completo")
+                self.software_state.reset()
+            return response is None or response.status_code in [200, 201]
         except Exception as e:
             logger.error(f"Erro ao enviar relatório detalhado: {e}")
             return False
 
-    def check_commands(self):
-        """Check for pending remote commands."""
+    @staticmethod
+    def _response_field(response, field: str):
+        try:
+            data = response.json()
+        except ValueError:
+            return None
+        return data.get(field) if isinstance(data, dict) else None
+
+    @staticmethod
+    def parse_pending_commands(response) -> list:
+        """Extract the command list from a /commands/pending response."""
+        if response.status_code != 200:
+            return []
+        commands = response.json()
+        if not isinstance(commands, list):
+            commands = commands.get('data', [])
+        return commands
+
+    def should_poll_commands(self) -> bool:
+        """Regular polling is only needed while the push channel is not delivering commands."""
         if not self.api.computer_id:
-            return
+            return False
+        return not (self.command_channel and self.command_channel.is_active())
+
+    def check_commands(self):
+        """Check for pending remote commands and adapt the polling cadence."""
+        if self.should_poll_commands() and not self.api.circuit_open:
+            try:
+                response = self.api.get(f"/computers/{self.api.computer_id}/commands/pending")
+                commands = self.parse_pending_commands(response)
+                self.poll_controller.observe(response, len(commands))
+                self.process_commands(commands)
+            except Exception as e:
+                logger.error(f"Erro ao verificar comandos: {e}")
+        else:
+            self.poll_controller.on_idle()
+        self.scheduler.reschedule('commands', self.poll_controller.next_interval())
+
+    def on_pushed_commands(self, commands: list):
+        """Push channel callback: dispatch the commands and poll fast for a while, as after a poll."""
+        if commands:
+            self.poll_controller.on_activity()
+            self.scheduler.reschedule('commands', self.poll_controller.next_interval())
+        self.process_commands(commands)
+
+    def process_commands(self, commands: list):
+        """Dispatch the given pending commands to the executor pool; status is reported on completion."""
+        # Push channel and polling may deliver the same batch concurrently
+        with self._commands_lock:
+            self._dispatch_commands(commands)
+
+    def _dispatch_commands(self, commands: list):
+        for cmd in commands:
+            command_id = cmd.get('id')
             
-        try:
-            response = self.api.get(f"/computers/{self.api.computer_id}/commands/pending")
-            if response.status_code != 200:
-                return
-                
-            commands = response.json()
-            if not isinstance(commands, list):
-                commands = commands.get('data', [])
-                
-            for cmd in commands:
-                command_id = cmd.get('id')
+            # Already dispatched on a previous poll (still running or status not yet flushed)
+            if self.cmd_executor.is_inflight(command_id) or self.status_reporter.has_unsent(command_id):
+                continue
                 
-                if is_command_expired(cmd):
-                    self.update_command_status(command_id, 'failed', 'Comando expirado')
-                    continue
-                    
-                self.update_command_status(command_id, 'processing')
-                output = self.cmd_executor.execute(cmd)
-                self.update_command_status(command_id, 'completed', output)
+            if is_command_expired(cmd):
+                self.update_command_status(command_id, 'failed', 'Comando expirado')
+                continue
                 
-        except Exception as e:
-            logger.error(f"Erro ao verificar comandos: {e}")
+            self.update_command_status(command_id, 'processing')
+            self.cmd_executor.submit(cmd, self.on_command_done)
+
+    def on_command_done(self, cmd: dict, status: str, output: str):
+        """Executor callback: report the final status of a command."""
+        self.update_command_status(cmd.get('id'), status, output)
             
     def update_command_status(self, command_id: int, status: str, output: str = None):
+        """Queue a status transition; it is merged and flushed in a batch by the StatusReporter."""
+        self.status_reporter.report(command_id, status, output)
+
+    def drain_outbox(self) -> bool:
+        """Replay stored payloads in bounded passes; keep going while the backend accepts them."""
+        if not len(self.outbox) or self.api.circuit_open:
+            return True
+        delivered, ok = self.outbox.drain(self._send_outbox_entries, limit=config.OUTBOX_DRAIN_BATCH)
+        if delivered:
+            logger.info(f"Outbox: {delivered} payload(s) reenviado(s), {len(self.outbox)} pendente(s)")
+        if ok and len(self.outbox):
+            self.request_outbox_drain(config.OUTBOX_DRAIN_PAUSE)
+        return ok
+
+    def request_outbox_drain(self, delay: float = 0.0):
+        """Bring the next outbox drain forward so it runs after delay seconds."""
+        self.scheduler.trigger('outbox', delay=delay)
+
+    def _send_outbox_entries(self, kind: str, entries: list) -> list:
+        """Outbox sender: returns the ids delivered or permanently rejected by the server."""
+        if kind == 'command_status':
+            failed = {u['id'] for u in self.status_reporter.send_updates([e['payload'] for e in entries])}
+            return [e['id'] for e in entries if e['payload']['id'] not in failed]
+
+        done = []
+        for entry in entries:
+            try:
+                if entry['compressed']:
+                    response = self.api.post_compressed(entry['endpoint'], entry['payload'])
+                else:
+                    response = self.api.request(entry['method'], entry['endpoint'], json=entry['payload'])
+            except requests.exceptions.RequestException:
+                break
+            if response.status_code >= 500 or response.status_code in (408, 429):
+                break
+            if response.status_code >= 400:
+                logger.warning(f"Outbox: payload '{kind}' rejeitado pelo servidor (HTTP {response.status_code}), descartando")
+            done.append(entry['id'])
+        return done
+
+    def build_status(self) -> dict:
+        """Local health snapshot: circuit state, outbox backlog and per-endpoint API stats."""
+        return {
+            'updated_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+            'pid': os.getpid(),
+            'agent_version': self.get_current_version(),
+            'computer_id': self.api.computer_id,
+            'circuit': self.api.breaker.state,
+            'outbox_pending': len(self.outbox),
+            'api': self.api.stats.snapshot(),
+            'http': self.api.transport.stats_snapshot(),
+        }
+
+    def write_status(self):
         try:
-            payload = {'status': status}
-            if output is not None:
-                payload['output'] = output
-                
-            self.api.put(f"/commands/{command_id}/status", json=payload)
+            write_status_file(self.build_status())
         except Exception as e:
-            logger.error(f"Erro ao atualizar status do comando {command_id}: {e}")
+            logger.debug(f"Falha ao gravar arquivo de status: {e}")
+
+    def on_circuit_change(self, old_state: str, new_state: str):
+        """Circuit breaker hook: pause non-essential traffic while the backend is down."""
+        if new_state == CIRCUIT_CLOSED:
+            logger.info("Backend disponível novamente; retomando envios pendentes")
+            self.request_outbox_drain()
+        else:
+            logger.warning("Backend indisponível; suspendendo tarefas não essenciais")
+
+    def register_jobs(self):
+        """Register the periodic agent tasks with the scheduler."""
+        jitter = config.SCHEDULER_JITTER
+        self.scheduler.every('commands', config.POLL_INTERVAL, self.check_commands)
+        self.scheduler.every('kiosk', config.POLL_INTERVAL, self.kiosk_man.enforce_kiosk_process)
+        self.scheduler.every('wallpaper', config.POLL_INTERVAL, self.wallpaper_man.enforce_lab_wallpaper,
+                             jitter=config.POLL_INTERVAL * jitter, missed=MISSED_SKIP)
+        # Metrics and reports are retried on the poll cadence until they succeed
+        self.scheduler.every('metrics', config.METRICS_INTERVAL, self.send_metrics_report,
+                             jitter=config.METRICS_INTERVAL * jitter, retry_interval=config.POLL_INTERVAL)
+        self.scheduler.every('report', config.REPORT_INTERVAL, self.send_detailed_report,
+                             jitter=config.REPORT_INTERVAL * jitter, retry_interval=config.POLL_INTERVAL)
+        self.scheduler.every('outbox', config.OUTBOX_DRAIN_INTERVAL, self.drain_outbox,
+                             jitter=config.OUTBOX_DRAIN_INTERVAL * jitter)
+        self.scheduler.every('status', config.STATUS_FILE_INTERVAL, self.write_status, missed=MISSED_SKIP)
 
     def run(self):
         """Main orchestrator execution loop."""
@@ -207,34 +490,189 @@ class AgentOrchestrator:
         
         while True:
             try:
-                if not self.login():
-                    logger.warning(f"Login falhou. Retentando em {config.POLL_INTERVAL}s")
-                    time.sleep(config.POLL_INTERVAL)
-                    continue
-
-                # Kiosk & Wallpaper logic
-                self.kiosk_man.enforce_kiosk_process()
-                self.wallpaper_man.enforce_lab_wallpaper()
-                
-                # Check commands frequently
-                self.check_commands()
-                
-                # Setup timers
-                current_time = time.time()
-                if not hasattr(self, 'last_metrics_time') or (current_time - self.last_metrics_time) >= config.METRICS_INTERVAL:
-                    if self.send_metrics_report():
-                        self.last_metrics_time = current_time
-                        
-                if not hasattr(self, 'last_report_time') or (current_time - self.last_report_time) >= config.REPORT_INTERVAL:
-                    if self.send_detailed_report():
-                        self.last_report_time = current_time
-
+                if self.login():
+                    break
             except Exception as e:
-                 logger.error(f"Erro no loop principal: {e}")
-            
+                logger.error(f"Erro no login: {e}")
+            logger.warning(f"Login falhou. Retentando em {config.POLL_INTERVAL}s")
             time.sleep(config.POLL_INTERVAL)
 
+        self.register_jobs()
+        self.sampler.start()
+        self.status_reporter.start()
+        if self.command_channel:
+            self.command_channel.start()
+        try:
+            self.scheduler.run_forever()
+        finally:
+            if self.command_channel:
+                self.command_channel.stop(timeout=1)
+            self.scheduler.stop(wait=False)
+            self.sampler.stop(timeout=1)
+            self.status_reporter.stop(timeout=1)
+
+class AsyncAgentOrchestrator(AgentOrchestrator):
+    """
+    asyncio runtime mode.
+
+    Each stage is its own task on a single event loop, so command polling,
+    /agent/me sync, metrics and report uploads overlap instead of running
+    back to back. Blocking collectors and command handlers run on an executor.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.async_api = AsyncApiClient(self.api, max_workers=config.ASYNC_IO_WORKERS)
+        self.collector_executor = ThreadPoolExecutor(
+            max_workers=config.ASYNC_COLLECTOR_WORKERS, thread_name_prefix='collector'
+        )
+        self._loop = None
+        self._outbox_wake = None
+        self._outbox_delay = 0.0
+
+    async def run_blocking(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.collector_executor, func, *args)
+
+    async def check_commands_async(self):
+        if not self.should_poll_commands() or self.api.circuit_open:
+            self.poll_controller.on_idle()
+            return
+            
+        try:
+            response = await self.async_api.get(f"/computers/{self.api.computer_id}/commands/pending")
+            commands = self.parse_pending_commands(response)
+            self.poll_controller.observe(response, len(commands))
+            if commands:
+                await self.run_blocking(self.process_commands, commands)
+        except Exception as e:
+            logger.error(f"Erro ao verificar comandos: {e}")
+
+    async def enforce_lab_wallpaper_async(self):
+        if not self.api.computer_id:
+            return
+            
+        try:
+            self.wallpaper_man.update_lab_settings(await self.async_api.get_cached("/agent/me"))
+        except Exception as e:
+            logger.debug(f"Failed to sync lab wallpaper info: {e}")
+        await self.run_blocking(self.wallpaper_man.apply_lab_wallpaper)
+
+    async def enforce_kiosk_async(self):
+        await self.run_blocking(self.kiosk_man.enforce_kiosk_process)
+
+    async def send_metrics_report_async(self) -> bool:
+        # Batch/fallback negotiation lives in send_metrics_report; it still overlaps with the other stages
+        return await self.run_blocking(self.send_metrics_report)
+
+    async def drain_outbox_async(self) -> bool:
+        return await self.run_blocking(self.drain_outbox)
+
+    def request_outbox_drain(self, delay: float = 0.0):
+        # No scheduler jobs in this mode: wake the outbox stage (may be called from executor threads)
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wake_outbox, delay)
+
+    def _wake_outbox(self, delay: float):
+        self._outbox_delay = delay
+        self._outbox_wake.set()
+
+    async def run_outbox_async(self):
+        """Drain the outbox every OUTBOX_DRAIN_INTERVAL, or sooner when a drain is requested."""
+        jitter = config.OUTBOX_DRAIN_INTERVAL * config.SCHEDULER_JITTER
+        while True:
+            try:
+                await self.drain_outbox_async()
+            except Exception as e:
+                logger.error(f"Erro ao drenar outbox: {e}")
+            try:
+                await asyncio.wait_for(self._outbox_wake.wait(),
+                                       timeout=config.OUTBOX_DRAIN_INTERVAL + random.uniform(0, jitter))
+            except asyncio.TimeoutError:
+                continue
+            self._outbox_wake.clear()
+            await asyncio.sleep(self._outbox_delay)
+
+    async def write_status_async(self):
+        await self.run_blocking(self.write_status)
+
+    async def send_detailed_report_async(self) -> bool:
+        # Collection is blocking and delivery may fall back to the outbox: run it whole on the executor
+        return await self.run_blocking(self.send_detailed_report)
+
+    async def run_periodic(self, interval, stage, retry_interval: float = None, jitter: float = 0.0):
+        """
+        Run a stage forever on its own cadence; a stage returning False is retried sooner.
+        interval may be a callable returning the next interval.
+        """
+        loop = asyncio.get_running_loop()
+        while True:
+            started = loop.time()
+            try:
+                result = await stage()
+            except Exception as e:
+                logger.error(f"Erro no estágio {getattr(stage, '__name__', stage)}: {e}")
+                result = None
+            if result is False and retry_interval:
+                delay = retry_interval
+            else:
+                delay = interval() if callable(interval) else interval
+                delay += random.uniform(0, jitter) if jitter else 0.0
+            await asyncio.sleep(max(0.0, started + delay - loop.time()))
+
+    async def run_async(self):
+        self._loop = asyncio.get_running_loop()
+        self._outbox_wake = asyncio.Event()
+        while not await self.run_blocking(self.login):
+            logger.warning(f"Login falhou. Retentando em {config.POLL_INTERVAL}s")
+            await asyncio.sleep(config.POLL_INTERVAL)
+
+        self.sampler.start()
+        self.status_reporter.start()
+        if self.command_channel:
+            self.command_channel.start()
+        jitter = config.SCHEDULER_JITTER
+        await asyncio.gather(
+            self.run_periodic(self.poll_controller.next_interval, self.check_commands_async),
+            self.run_periodic(config.POLL_INTERVAL, self.enforce_kiosk_async),
+            self.run_periodic(config.POLL_INTERVAL, self.enforce_lab_wallpaper_async,
+                              jitter=config.POLL_INTERVAL * jitter),
+            self.run_periodic(config.METRICS_INTERVAL, self.send_metrics_report_async,
+                              retry_interval=config.POLL_INTERVAL, jitter=config.METRICS_INTERVAL * jitter),
+            self.run_periodic(config.REPORT_INTERVAL, self.send_detailed_report_async,
+                              retry_interval=config.POLL_INTERVAL, jitter=config.REPORT_INTERVAL * jitter),
+            self.run_outbox_async(),
+            self.run_periodic(config.STATUS_FILE_INTERVAL, self.write_status_async),
+        )
+
+    def run(self):
+        """Main orchestrator execution loop (asyncio runtime)."""
+        logger.info(f"Iniciando Coletty Agent V{self.get_current_version()} (Orquestrador asyncio)")
+        try:
+            asyncio.run(self.run_async())
+        finally:
+            if self.command_channel:
+                self.command_channel.stop(timeout=1)
+            self.sampler.stop(timeout=1)
+            self.status_reporter.stop(timeout=1)
+            self.async_api.close()
+            self.collector_executor.shutdown(wait=False)
+
 if __name__ == "__main__":
+    if "--status" in sys.argv:
+        import json
+        status = read_status_file()
+        if not status:
+            print("Nenhum status disponível (o agente está em execução?)")
+            sys.exit(1)
+        print(json.dumps(status, indent=2, ensure_ascii=False))
+        sys.exit(0)
+
+    if "--watch-wallpaper" in sys.argv:
+        from src.api_client import ApiClient
+        WallpaperManager(ApiClient()).watch_pending()
+        sys.exit(0)
+
     if "--apply-wallpaper" in sys.argv:
         from src.api_client import ApiClient
         api = ApiClient()
@@ -244,5 +682,8 @@ if __name__ == "__main__":
         else:
             sys.exit(1)
             
-    agent = AgentOrchestrator()
+    if "--async" in sys.argv or config.AGENT_RUNTIME == 'async':
+        agent = AsyncAgentOrchestrator()
+    else:
+        agent = AgentOrchestrator()
     agent.run()
@@ -1,22 +1,187 @@
+import asyncio
+import fnmatch
+import functools
+import gzip
+import json
+import random
+import threading
+import time
 import requests
-from typing import Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from src import config
 
 from src.utils.logger import setup_logger
 from src.security import load_api_key
+from src.http_transport import get_transport
+from src.api_stats import ApiStats
+from src.response_cache import ResponseCache, cache_ttl
 
 logger = setup_logger(__name__)
 
+# Circuit breaker states
+CIRCUIT_CLOSED = 'closed'
+CIRCUIT_OPEN = 'open'
+CIRCUIT_HALF_OPEN = 'half_open'
+
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS')
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised without touching the network while the backend is considered down."""
+
+
+class RetryPolicy:
+    """
+    How often a request is attempted. 429/503 (the server refused the work) are
+    retried for any method; connection errors and 502/504 only when
+    retry_errors is set, i.e. for requests that are safe to repeat.
+    """
+
+    def __init__(self, attempts: int = None, retry_errors: bool = True, backoff: float = None,
+                 max_backoff: float = None, max_wait: float = None):
+        self.attempts = attempts if attempts is not None else config.RETRY_MAX_ATTEMPTS
+        self.retry_errors = retry_errors
+        self.backoff = backoff if backoff is not None else config.RETRY_BACKOFF
+        self.max_backoff = max_backoff if max_backoff is not None else config.RETRY_MAX_BACKOFF
+        # Longer Retry-After values are not slept on: the breaker holds requests instead
+        self.max_wait = max_wait if max_wait is not None else config.RETRY_MAX_WAIT
+
+    def retry_statuses(self) -> Tuple[int, ...]:
+        return (429, 502, 503, 504) if self.retry_errors else (429, 503)
+
+    def delay(self, attempt: int) -> float:
+        """Full-jitter exponential backoff before attempt + 1."""
+        return random.uniform(0, min(self.max_backoff, self.backoff * (2 ** (attempt - 1))))
+
+
+# (method, endpoint pattern, policy); the first match wins
+DEFAULT_RETRY_POLICIES: List[Tuple[str, str, RetryPolicy]] = [
+    # Polling already repeats on its own cadence
+    ('GET', '/computers/*/commands/pending', RetryPolicy(attempts=1)),
+    # Status updates are idempotent (they set a state)
+    ('POST', config.STATUS_BATCH_ENDPOINT, RetryPolicy(retry_errors=True)),
+    ('POST', '*', RetryPolicy(retry_errors=False)),
+    ('PATCH', '*', RetryPolicy(retry_errors=False)),
+    ('*', '*', RetryPolicy()),
+]
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Retry-After as seconds (delta-seconds or HTTP-date), or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class CircuitBreaker:
+    """
+    Fails requests fast while the backend is down. After failure_threshold
+    consecutive failures (connection errors, 5xx, 429) the circuit opens for
+    reset_timeout seconds (doubling on each failed probe, up to
+    max_reset_timeout, and at least any Retry-After the server sent). Then one
+    probe request is let through: success closes the circuit, failure reopens it.
+    """
+
+    def __init__(self, failure_threshold: int = None, reset_timeout: float = None,
+                 max_reset_timeout: float = None, clock: Callable[[], float] = time.monotonic):
+        self.failure_threshold = failure_threshold or config.CIRCUIT_FAILURE_THRESHOLD
+        self.reset_timeout = reset_timeout or config.CIRCUIT_RESET_TIMEOUT
+        self.max_reset_timeout = max_reset_timeout or config.CIRCUIT_MAX_RESET_TIMEOUT
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CIRCUIT_CLOSED
+        self._failures = 0
+        self._trips = 0
+        self._open_until = 0.0
+        self._probing = False
+        self._listeners: List[Callable[[str, str], None]] = []
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._state == CIRCUIT_OPEN and self._clock() >= self._open_until:
+                return CIRCUIT_HALF_OPEN
+            return self._state
+
+    def add_listener(self, callback: Callable[[str, str], None]):
+        """callback(old_state, new_state) on open/close transitions."""
+        self._listeners.append(callback)
+
+    def before_request(self):
+        """Raise CircuitOpenError unless a request may go out now."""
+        with self._lock:
+            if self._state == CIRCUIT_CLOSED:
+                return
+            remaining = self._open_until - self._clock()
+            if remaining > 0:
+                raise CircuitOpenError(f"Backend circuit open, retrying in {remaining:.0f}s")
+            if self._probing:
+                raise CircuitOpenError("Backend circuit half-open, probe in progress")
+            self._probing = True
+
+    def record_success(self):
+        with self._lock:
+            previous = self._state
+            self._state = CIRCUIT_CLOSED
+            self._failures = 0
+            self._trips = 0
+            self._probing = False
+        if previous != CIRCUIT_CLOSED:
+            self._notify(previous, CIRCUIT_CLOSED)
+
+    def record_failure(self, retry_after: Optional[float] = None):
+        with self._lock:
+            previous = self._state
+            self._failures += 1
+            self._probing = False
+            tripped = self._failures >= self.failure_threshold
+            if previous == CIRCUIT_CLOSED and not tripped and not retry_after:
+                return
+            hold = retry_after or 0.0
+            if previous == CIRCUIT_OPEN:
+                # A failed probe: never let the backend be hammered again right away
+                hold = max(hold, self.reset_timeout)
+            if tripped:
+                self._trips += 1
+                hold = max(hold, min(self.max_reset_timeout, self.reset_timeout * (2 ** (self._trips - 1))))
+            self._open_until = self._clock() + hold
+            self._state = CIRCUIT_OPEN
+        if previous != CIRCUIT_OPEN:
+            self._notify(previous, CIRCUIT_OPEN)
+
+    def _notify(self, old: str, new: str):
+        for callback in list(self._listeners):
+            try:
+                callback(old, new)
+            except Exception as e:
+                logger.error(f"Circuit listener failed: {e}")
+
+
 class ApiClient:
     def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+        self.transport = get_transport()
+        self.session = self.transport.session({
             'Accept': 'application/json',
             'Content-Type': 'application/json'
         })
         self.computer_id: Optional[int] = None
         self.api_key: Optional[str] = None
         self.base_url: str = config.API_BASE_URL
+        self.breaker = CircuitBreaker()
+        self.retry_policies = list(DEFAULT_RETRY_POLICIES)
+        self.stats = ApiStats()
+        self.response_cache = ResponseCache()
+        self.cache_policies = dict(config.RESPONSE_CACHE_POLICIES)
+        self._sleep = time.sleep
         self._load_token()
 
     def _load_token(self):
@@ -25,22 +190,158 @@ class ApiClient:
             self.api_key = api_key
             self.computer_id = computer_id
             self.session.headers.update({'Authorization': f"Bearer {api_key}"})
+            # Cached responses belong to the previous identity
+            self.response_cache.invalidate()
+
+    @property
+    def circuit_open(self) -> bool:
+        """True while requests fail fast; callers can skip non-essential work."""
+        return self.breaker.state == CIRCUIT_OPEN
+
+    def add_circuit_listener(self, callback: Callable[[str, str], None]):
+        self.breaker.add_listener(callback)
+
+    def retry_policy_for(self, method: str, endpoint: str) -> RetryPolicy:
+        for policy_method, pattern, policy in self.retry_policies:
+            if policy_method in ('*', method) and fnmatch.fnmatchcase(endpoint, pattern):
+                return policy
+        return RetryPolicy(attempts=1)
 
     def request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
         url = f"{config.API_BASE_URL}{endpoint}"
-        try:
-            response = self.session.request(method, url, timeout=config.REQUEST_TIMEOUT, **kwargs)
-            return response
-        except requests.exceptions.RequestException as e:
-            logger.error(f"API Request failed to {url}: {e}")
-            raise
+        kwargs.setdefault('timeout', self.transport.default_timeout)
+        policy = self.retry_policy_for(method.upper(), endpoint)
+        stats_key = ApiStats.key(method, endpoint, long_poll='wait' in (kwargs.get('params') or {}))
+        attempt = 0
+        while True:
+            attempt += 1
+            if attempt > 1:
+                self.stats.record_retry(stats_key)
+            try:
+                self.breaker.before_request()
+            except CircuitOpenError:
+                self.stats.record_short_circuit(stats_key)
+                raise
+            started = time.perf_counter()
+            try:
+                response = self.session.request(method, url, **kwargs)
+            except requests.exceptions.RequestException as e:
+                self.stats.record(stats_key, time.perf_counter() - started, bytes_out=self._body_size(kwargs))
+                self.breaker.record_failure()
+                if policy.retry_errors and attempt < policy.attempts:
+                    self._sleep(policy.delay(attempt))
+                    continue
+                logger.error(f"API Request failed to {url}: {e}")
+                raise
+
+            self.stats.record(stats_key, time.perf_counter() - started, response.status_code,
+                              bytes_out=self._body_size(kwargs, response),
+                              bytes_in=self._response_size(response, kwargs.get('stream', False)))
+
+            retry_after = None
+            if response.status_code in (429, 503):
+                retry_after = parse_retry_after(response.headers.get('Retry-After'))
+            delay = None
+            if response.status_code in policy.retry_statuses() and attempt < policy.attempts:
+                delay = retry_after if retry_after is not None else policy.delay(attempt)
+                if delay > policy.max_wait:
+                    delay = None
+
+            if response.status_code >= 500 or response.status_code == 429:
+                # A Retry-After we are not waiting out here holds every request until it expires
+                self.breaker.record_failure(retry_after if delay is None else None)
+            else:
+                self.breaker.record_success()
+
+            if delay is None:
+                return response
+            response.close()
+            self._sleep(delay)
+
+    @staticmethod
+    def _body_size(kwargs: Dict[str, Any], response: requests.Response = None) -> int:
+        body = response.request.body if response is not None and response.request is not None else kwargs.get('data')
+        return len(body) if isinstance(body, (bytes, str)) else 0
+
+    @staticmethod
+    def _response_size(response: requests.Response, stream: bool) -> int:
+        length = response.headers.get('Content-Length')
+        if length and length.isdigit():
+            return int(length)
+        # Never consume a streamed body just to measure it
+        return 0 if stream else len(response.content or b'')
 
     def post(self, endpoint: str, **kwargs) -> requests.Response:
         return self.request('POST', endpoint, **kwargs)
 
+    def post_compressed(self, endpoint: str, payload: Any, **kwargs) -> requests.Response:
+        """POST a JSON payload gzip-compressed (Content-Encoding: gzip)."""
+        body = gzip.compress(json.dumps(payload, separators=(',', ':')).encode('utf-8'))
+        headers = dict(kwargs.pop('headers', None) or {})
+        headers['Content-Encoding'] = 'gzip'
+        return self.request('POST', endpoint, data=body, headers=headers, **kwargs)
+
     def get(self, endpoint: str, **kwargs) -> requests.Response:
         return self.request('GET', endpoint, **kwargs)
 
+    def get_cached(self, endpoint: str, **kwargs) -> requests.Response:
+        """
+        GET through the response cache. Within the endpoint's ttl the stored
+        response is returned without a request; within the following
+        stale-while-revalidate window it is returned at once while a background
+        conditional GET refreshes it; after that the conditional GET is made
+        inline and a 304 is answered from the cache. Cached responses carry
+        from_cache ('fresh', 'stale' or 'revalidated').
+        """
+        ttl, stale_window = self.cache_policies.get(endpoint, (0, 0))
+        key = ResponseCache.key(endpoint, kwargs.get('params'))
+        entry = self.response_cache.get(key)
+        if entry is not None:
+            age = entry.age(self.response_cache.now())
+            if age < entry.ttl:
+                self.stats.record_cache_hit(ApiStats.key('GET', endpoint))
+                return entry.to_response('fresh')
+            if age < entry.ttl + stale_window:
+                self.stats.record_cache_hit(ApiStats.key('GET', endpoint))
+                self._revalidate_in_background(endpoint, key, ttl, kwargs)
+                return entry.to_response('stale')
+        return self._revalidate(endpoint, key, ttl, kwargs)
+
+    def _revalidate(self, endpoint: str, key, ttl: float, kwargs: Dict[str, Any]) -> requests.Response:
+        entry = self.response_cache.get(key)
+        headers = dict(kwargs.get('headers') or {})
+        if entry is not None:
+            headers.update(entry.validators())
+        response = self.request('GET', endpoint, **{**kwargs, 'headers': headers})
+        if response.status_code == 304 and entry is not None:
+            lifetime = cache_ttl(response, ttl)
+            if lifetime is None:
+                self.response_cache.invalidate(key)
+            else:
+                entry = self.response_cache.refresh(key, response, lifetime) or entry
+            return entry.to_response('revalidated')
+        if response.status_code == 200:
+            lifetime = cache_ttl(response, ttl)
+            if lifetime is None:
+                self.response_cache.invalidate(key)
+            else:
+                self.response_cache.store(key, response, lifetime)
+        return response
+
+    def _revalidate_in_background(self, endpoint: str, key, ttl: float, kwargs: Dict[str, Any]):
+        if not self.response_cache.begin_revalidation(key):
+            return
+
+        def work():
+            try:
+                self._revalidate(endpoint, key, ttl, kwargs)
+            except Exception as e:
+                logger.debug(f"Background revalidation of {endpoint} failed: {e}")
+            finally:
+                self.response_cache.end_revalidation(key)
+
+        threading.Thread(target=work, name=f"revalidate-{endpoint}", daemon=True).start()
+
     def put(self, endpoint: str, **kwargs) -> requests.Response:
         return self.request('PUT', endpoint, **kwargs)
 
@@ -49,3 +350,49 @@ class ApiClient:
 
     def delete(self, endpoint: str, **kwargs) -> requests.Response:
         return self.request('DELETE', endpoint, **kwargs)
+
+
+class AsyncApiClient:
+    """
+    asyncio facade over ApiClient.
+
+    Each call runs the blocking request on a bounded thread pool, so several
+    round trips can be in flight at once while sharing the same session,
+    credentials and connection pool as the synchronous client.
+    """
+
+    def __init__(self, api_client: ApiClient, max_workers: int = 4):
+        self.api = api_client
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='api-io')
+
+    @property
+    def computer_id(self) -> Optional[int]:
+        return self.api.computer_id
+
+    async def request(self, method: str, endpoint: str, **kwargs) -> requests.Response:
+        loop = asyncio.get_running_loop()
+        call = functools.partial(self.api.request, method, endpoint, **kwargs)
+        return await loop.run_in_executor(self._executor, call)
+
+    async def post(self, endpoint: str, **kwargs) -> requests.Response:
+        return await self.request('POST', endpoint, **kwargs)
+
+    async def get(self, endpoint: str, **kwargs) -> requests.Response:
+        return await self.request('GET', endpoint, **kwargs)
+
+    async def get_cached(self, endpoint: str, **kwargs) -> requests.Response:
+        loop = asyncio.get_running_loop()
+        call = functools.partial(self.api.get_cached, endpoint, **kwargs)
+        return await loop.run_in_executor(self._executor, call)
+
+    async def put(self, endpoint: str, **kwargs) -> requests.Response:
+        return await self.request('PUT', endpoint, **kwargs)
+
+    async def patch(self, endpoint: str, **kwargs) -> requests.Response:
+        return await self.request('PATCH', endpoint, **kwargs)
+
+    async def delete(self, endpoint: str, **kwargs) -> requests.Response:
+        return await self.request('DELETE', endpoint, **kwargs)
+
+    def close(self):
+        self._executor.shutdown(wait=False)
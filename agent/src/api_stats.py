@@ -0,0 +1,187 @@
+import json
+import os
+import re
+import sys
+import threading
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src import config
+
+# Upper bounds (ms) of the latency histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS = (10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000)
+
+# Additive counters: window stats are the difference of two snapshots
+_COUNTERS = ('requests', 'errors', 'retries', 'short_circuited', 'cache_hits', 'bytes_out', 'bytes_in',
+             'latency_sum_ms')
+
+_ID_SEGMENT = re.compile(r'^(\d+|[0-9a-fA-F-]{32,36})$')
+
+
+def endpoint_template(endpoint: str) -> str:
+    """'/computers/3/commands/pending' -> '/computers/{id}/commands/pending'."""
+    path = endpoint.split('?', 1)[0]
+    return '/'.join('{id}' if _ID_SEGMENT.match(part) else part for part in path.split('/'))
+
+
+class EndpointStats:
+    """Fixed-size counters for one endpoint template (no per-request allocation)."""
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.retries = 0
+        self.short_circuited = 0
+        self.cache_hits = 0
+        self.bytes_out = 0
+        self.bytes_in = 0
+        self.latency_sum_ms = 0.0
+        self.latency_max_ms = 0.0
+        self.latency_buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.statuses: Dict[str, int] = {}
+
+    def counts(self) -> Dict[str, Any]:
+        data = {name: getattr(self, name) for name in _COUNTERS}
+        data['latency_buckets'] = list(self.latency_buckets)
+        data['statuses'] = dict(self.statuses)
+        return data
+
+
+def percentile_from_buckets(buckets, q: float) -> Optional[float]:
+    """Upper bound of the bucket holding the q-quantile (None for the open-ended bucket)."""
+    total = sum(buckets)
+    if not total:
+        return None
+    rank = q * total
+    seen = 0
+    for i, count in enumerate(buckets):
+        seen += count
+        if seen >= rank:
+            return LATENCY_BUCKETS_MS[i] if i < len(LATENCY_BUCKETS_MS) else None
+    return None
+
+
+def summarize(counts: Dict[str, Any]) -> Dict[str, Any]:
+    requests = counts['requests']
+    return {
+        'requests': requests,
+        'errors': counts['errors'],
+        'retries': counts['retries'],
+        'short_circuited': counts['short_circuited'],
+        'cache_hits': counts['cache_hits'],
+        'statuses': counts['statuses'],
+        'bytes_out': counts['bytes_out'],
+        'bytes_in': counts['bytes_in'],
+        'latency_ms': {
+            'mean': round(counts['latency_sum_ms'] / requests, 1) if requests else None,
+            'p50': percentile_from_buckets(counts['latency_buckets'], 0.5),
+            'p95': percentile_from_buckets(counts['latency_buckets'], 0.95),
+            'buckets': counts['latency_buckets'],
+        },
+    }
+
+
+class ApiStats:
+    """
+    Per-endpoint request instrumentation: latency histogram, status codes,
+    errors, retries and bytes in/out. Counters are cumulative; window() turns
+    two counters() snapshots into the stats for the period between them.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints: Dict[str, EndpointStats] = {}
+
+    @staticmethod
+    def key(method: str, endpoint: str, long_poll: bool = False) -> str:
+        # Held long-poll requests would swamp the latency of regular polls
+        return f"{method.upper()} {endpoint_template(endpoint)}{'?wait' if long_poll else ''}"
+
+    def record(self, key: str, latency_s: float, status: int = None, bytes_out: int = 0, bytes_in: int = 0):
+        latency_ms = latency_s * 1000.0
+        with self._lock:
+            stats = self._endpoints.get(key) or self._endpoints.setdefault(key, EndpointStats())
+            stats.requests += 1
+            stats.bytes_out += bytes_out
+            stats.bytes_in += bytes_in
+            stats.latency_sum_ms += latency_ms
+            stats.latency_max_ms = max(stats.latency_max_ms, latency_ms)
+            stats.latency_buckets[bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+            if status is None:
+                stats.errors += 1
+            else:
+                code = str(status)
+                stats.statuses[code] = stats.statuses.get(code, 0) + 1
+
+    def record_retry(self, key: str):
+        with self._lock:
+            (self._endpoints.get(key) or self._endpoints.setdefault(key, EndpointStats())).retries += 1
+
+    def record_short_circuit(self, key: str):
+        with self._lock:
+            (self._endpoints.get(key) or self._endpoints.setdefault(key, EndpointStats())).short_circuited += 1
+
+    def record_cache_hit(self, key: str):
+        """A GET answered from the response cache without touching the network."""
+        with self._lock:
+            (self._endpoints.get(key) or self._endpoints.setdefault(key, EndpointStats())).cache_hits += 1
+
+    def counters(self) -> Dict[str, Dict[str, Any]]:
+        """Raw cumulative counters per endpoint (a copy)."""
+        with self._lock:
+            return {key: stats.counts() for key, stats in self._endpoints.items()}
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Cumulative stats since start, for the local status view."""
+        with self._lock:
+            summary = {}
+            for key, stats in self._endpoints.items():
+                summary[key] = summarize(stats.counts())
+                summary[key]['latency_ms']['max'] = round(stats.latency_max_ms, 1)
+        return {'bucket_bounds_ms': list(LATENCY_BUCKETS_MS), 'endpoints': summary}
+
+    @staticmethod
+    def window(current: Dict[str, Dict[str, Any]], previous: Optional[Dict[str, Dict[str, Any]]]) -> Dict[str, Any]:
+        """Stats for the requests made between two counters() snapshots."""
+        previous = previous or {}
+        endpoints = {}
+        for key, counts in current.items():
+            before = previous.get(key)
+            if before:
+                counts = {
+                    **{name: counts[name] - before[name] for name in _COUNTERS},
+                    'latency_buckets': [a - b for a, b in zip(counts['latency_buckets'], before['latency_buckets'])],
+                    'statuses': {code: n - before['statuses'].get(code, 0)
+                                 for code, n in counts['statuses'].items()
+                                 if n - before['statuses'].get(code, 0)},
+                }
+            if counts['requests'] or counts['short_circuited'] or counts['cache_hits']:
+                endpoints[key] = summarize(counts)
+        return {'bucket_bounds_ms': list(LATENCY_BUCKETS_MS), 'endpoints': endpoints}
+
+
+def get_status_path() -> Path:
+    """Returns the absolute path of the local status file read by `main.py --status`."""
+    if getattr(sys, 'frozen', False):
+        base_dir = Path(sys.executable).resolve().parent
+    else:
+        base_dir = Path(__file__).resolve().parent.parent
+    return base_dir / config.STATUS_FILE
+
+
+def write_status_file(data: Dict[str, Any], path=None):
+    path = Path(path) if path else get_status_path()
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def read_status_file(path=None) -> Optional[Dict[str, Any]]:
+    path = Path(path) if path else get_status_path()
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
@@ -0,0 +1,76 @@
+import bisect
+import math
+import time
+from collections import deque
+from typing import Any, Dict, List, Sequence
+
+from src import config
+
+AGGREGATED_FIELDS = ('cpu_percent', 'memory_percent')
+
+
+def summarize(values: Sequence[float]) -> Dict[str, float]:
+    """min/max/mean/p95/last of a series of samples (nearest-rank p95)."""
+    ordered = sorted(values)
+    count = len(ordered)
+    p95_index = max(0, math.ceil(0.95 * count) - 1)
+    return {
+        'min': round(ordered[0], 2),
+        'max': round(ordered[-1], 2),
+        'mean': round(math.fsum(ordered) / count, 2),
+        'p95': round(ordered[p95_index], 2),
+        'last': round(values[-1], 2),
+    }
+
+
+class WindowAggregator:
+    """
+    Folds the sampler's high-frequency buffers into fixed windows of
+    per-field statistics and keeps them until an upload acknowledges them.
+    """
+
+    def __init__(self, sampler, window_seconds: float = None, fields: Sequence[str] = AGGREGATED_FIELDS,
+                 max_pending: int = None, clock=time.time):
+        self.sampler = sampler
+        self.window = window_seconds if window_seconds is not None else config.METRICS_WINDOW
+        self.fields = tuple(fields)
+        self._clock = clock
+        self._last_end = None
+        self._pending = deque(maxlen=max_pending if max_pending is not None else config.METRICS_MAX_PENDING_WINDOWS)
+
+    def collect(self) -> int:
+        """Aggregate every window completed since the last call. Returns how many were added."""
+        end = math.floor(self._clock() / self.window) * self.window
+        series = {field: self.sampler.series[field].items() for field in self.fields}
+        times = series[self.fields[0]][0]
+        if not times:
+            return 0
+
+        start = self._last_end
+        if start is None:
+            start = math.floor(times[0] / self.window) * self.window
+        added = 0
+        window_start = start
+        while window_start + self.window <= end:
+            window_end = window_start + self.window
+            window = {'start': int(window_start), 'end': int(window_end)}
+            for field, (field_times, values) in series.items():
+                lo = bisect.bisect_left(field_times, window_start)
+                hi = bisect.bisect_left(field_times, window_end)
+                if hi > lo:
+                    window[field] = summarize(values[lo:hi])
+            if len(window) > 2:
+                window['samples'] = bisect.bisect_left(times, window_end) - bisect.bisect_left(times, window_start)
+                self._pending.append(window)
+                added += 1
+            window_start = window_end
+        self._last_end = max(start, end)
+        return added
+
+    def pending(self) -> List[Dict[str, Any]]:
+        return list(self._pending)
+
+    def acknowledge(self, count: int):
+        """Drop the oldest count windows after a successful upload."""
+        for _ in range(min(count, len(self._pending))):
+            self._pending.popleft()
@@ -0,0 +1,238 @@
+import os
+import select
+import threading
+import time
+import psutil
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, List, Optional
+
+from src import config
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+MOUNTINFO_PATH = '/proc/self/mountinfo'
+
+
+class MountTableWatcher:
+    """
+    Tells whether the mount table changed since the last check. On Linux the
+    kernel flags /proc/self/mountinfo with POLLPRI on every mount/umount, so a
+    zero-timeout poll is enough; elsewhere the answer is "changed" once ttl
+    seconds have passed.
+    """
+
+    def __init__(self, path: str = MOUNTINFO_PATH, ttl: float = None, clock: Callable[[], float] = time.monotonic):
+        self.ttl = ttl if ttl is not None else config.DISK_PARTITIONS_TTL
+        self._clock = clock
+        self._checked_at: Optional[float] = None
+        self._file = None
+        self._poller = None
+        if hasattr(select, 'poll') and os.path.exists(path):
+            try:
+                self._file = open(path, 'rb')
+                self._file.read()
+                self._poller = select.poll()
+                self._poller.register(self._file.fileno(), select.POLLPRI | select.POLLERR)
+            except OSError as e:
+                logger.debug(f"Cannot watch {path}: {e}")
+                self._poller = None
+
+    def changed(self) -> bool:
+        if self._poller is not None:
+            if self._checked_at is None or self._poller.poll(0):
+                # Re-reading from the start acknowledges the event
+                self._file.seek(0)
+                self._file.read()
+                self._checked_at = self._clock()
+                return True
+            return False
+        now = self._clock()
+        if self._checked_at is None or now - self._checked_at >= self.ttl:
+            self._checked_at = now
+            return True
+        return False
+
+    def close(self):
+        if self._file:
+            self._file.close()
+            self._file = None
+            self._poller = None
+
+
+class MountHealth:
+    """Probe bookkeeping for one mount point."""
+
+    def __init__(self):
+        self.failures = 0
+        self.retry_at = 0.0
+        self.inflight: Optional[Future] = None
+
+
+class DiskProbe:
+    """
+    Disk usage that cannot hang the caller. Each statvfs runs on a daemon
+    thread with a timeout; a mount that times out is skipped until its backoff
+    expires (doubling up to backoff_max) and is never probed twice at once.
+    An abandoned probe gives its worker slot back, so hung mounts cannot
+    starve healthy ones. The partition list is cached until the mount table
+    changes.
+    """
+
+    def __init__(self, timeout: float = None, max_workers: int = None, backoff: float = None,
+                 backoff_max: float = None, watcher: MountTableWatcher = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.timeout = timeout if timeout is not None else config.DISK_PROBE_TIMEOUT
+        self.backoff = backoff if backoff is not None else config.DISK_PROBE_BACKOFF
+        self.backoff_max = backoff_max if backoff_max is not None else config.DISK_PROBE_MAX_BACKOFF
+        self._slots = threading.BoundedSemaphore(max_workers or config.DISK_PROBE_WORKERS)
+        self._watcher = watcher or MountTableWatcher(clock=clock)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._partitions: Optional[list] = None
+        self._health: Dict[str, MountHealth] = {}
+        # Running probes the collector gave up on: their slot is already back in the pool
+        self._abandoned: set = set()
+
+    def partitions(self) -> list:
+        """Mounted partitions worth reporting (CD-ROMs and pseudo filesystems skipped)."""
+        with self._lock:
+            if self._partitions is None or self._watcher.changed():
+                self._partitions = [
+                    part for part in psutil.disk_partitions(all=False)
+                    if 'cdrom' not in part.opts and part.fstype != ''
+                ]
+                mounts = {part.mountpoint for part in self._partitions}
+                # Forget health of mounts that went away (keep hung probes tracked)
+                for mount in list(self._health):
+                    health = self._health[mount]
+                    if mount not in mounts and (health.inflight is None or health.inflight.done()):
+                        del self._health[mount]
+            return list(self._partitions)
+
+    def usage(self, mountpoint: str):
+        """psutil.disk_usage(mountpoint), or None if the mount is unresponsive."""
+        pending = self._begin(mountpoint)
+        return self._collect(mountpoint, pending, self.timeout) if pending else None
+
+    def unresponsive(self) -> List[str]:
+        with self._lock:
+            now = self._clock()
+            return sorted(
+                mount for mount, health in self._health.items()
+                if (health.inflight is not None and not health.inflight.done()) or now < health.retry_at
+            )
+
+    def disk_usage(self) -> List[Dict[str, Any]]:
+        """Usage of every responsive partition; all mounts are probed in parallel."""
+        probes = [(part, self._begin(part.mountpoint)) for part in self.partitions()]
+        deadline = time.monotonic() + self.timeout
+        disk_info = []
+        for part, pending in probes:
+            if pending is None:
+                continue
+            usage = self._collect(part.mountpoint, pending, max(0.0, deadline - time.monotonic()))
+            if usage is None:
+                continue
+            disk_info.append({
+                'mount': part.mountpoint,
+                'percent': usage.percent,
+                'free_gb': round(usage.free / (1024**3), 2),
+                'total_gb': round(usage.total / (1024**3), 2)
+            })
+        return disk_info
+
+    # ==== Internals ====
+
+    def _begin(self, mountpoint: str):
+        """Start probing a mount unless it is hung or backing off. Returns (health, future) or None."""
+        with self._lock:
+            health = self._health.setdefault(mountpoint, MountHealth())
+            if health.inflight is not None and not health.inflight.done():
+                return None
+            if self._clock() < health.retry_at:
+                return None
+            health.inflight = self._start(mountpoint)
+            return health, health.inflight
+
+    def _collect(self, mountpoint: str, pending, timeout: float):
+        health, future = pending
+        try:
+            usage = future.result(timeout=timeout)
+        except FutureTimeout:
+            if future.cancel():
+                # Never got a slot: not the mount's fault, it is probed again next round
+                logger.debug(f"No free probe slot for {mountpoint}, skipped this round")
+                return None
+            if not self._abandon(future):
+                # Answered just as the wait ran out
+                return self._collect(mountpoint, pending, 0)
+            self._failed(mountpoint, health, "did not answer")
+            return None
+        except Exception as e:
+            # Permission errors and vanished mounts are not hangs: no backoff
+            logger.debug(f"Cannot stat {mountpoint}: {e}")
+            return None
+        with self._lock:
+            if health.failures:
+                logger.info(f"Mount {mountpoint} is responsive again")
+            health.failures = 0
+            health.retry_at = 0.0
+        return usage
+
+    def _failed(self, mountpoint: str, health: MountHealth, reason: str):
+        with self._lock:
+            health.failures += 1
+            delay = min(self.backoff * (2 ** (health.failures - 1)), self.backoff_max)
+            health.retry_at = self._clock() + delay
+        logger.warning(f"Mount {mountpoint} {reason} within {self.timeout}s, retrying in {delay:.0f}s")
+
+    def _start(self, mountpoint: str) -> Future:
+        future = Future()
+
+        def work():
+            self._slots.acquire()
+            if not future.set_running_or_notify_cancel():
+                self._slots.release()
+                return
+            try:
+                future.set_result(psutil.disk_usage(mountpoint))
+            except BaseException as e:
+                future.set_exception(e)
+            finally:
+                with self._lock:
+                    abandoned = future in self._abandoned
+                    self._abandoned.discard(future)
+                if not abandoned:
+                    self._slots.release()
+
+        # Daemon threads: a statvfs stuck on a dead NFS/SMB server must not block shutdown
+        threading.Thread(target=work, name=f"disk-probe-{mountpoint}", daemon=True).start()
+        return future
+
+    def _abandon(self, future: Future) -> bool:
+        """Give up on a probe stuck in statvfs: its thread no longer counts against the pool."""
+        with self._lock:
+            if future.done():
+                return False
+            self._abandoned.add(future)
+        self._slots.release()
+        return True
+
+
+_probe: Optional[DiskProbe] = None
+_probe_lock = threading.Lock()
+
+
+def get_disk_probe() -> DiskProbe:
+    """Process-wide probe, so mount health and the partition cache are shared."""
+    global _probe
+    with _probe_lock:
+        if _probe is None:
+            _probe = DiskProbe()
+        return _probe
+
+
+def get_disk_usage() -> List[Dict[str, Any]]:
+    """Usage of every mounted partition (CD-ROMs, pseudo filesystems and hung mounts skipped)."""
+    return get_disk_probe().disk_usage()
@@ -1,64 +1,176 @@
+import copy
+import hashlib
+import json
 import socket
 import platform
+import threading
+import time
 import psutil
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
+from src import config
+from src.collectors.disks import get_disk_probe
 from src.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
-def get_hardware_info() -> Dict[str, Any]:
-    """Collects hardware information including CPU, Memory, Disk, and Network."""
+
+def _collect_network_interfaces() -> list:
+    network_interfaces = []
     try:
-        cpu_count = psutil.cpu_count(logical=False)
-        cpu_count_logical = psutil.cpu_count(logical=True)
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        
-        # Network interfaces
-        network_interfaces = []
-        try:
-            if_addrs = psutil.net_if_addrs()
-            for interface_name, addresses in if_addrs.items():
-                interface_info = {'name': interface_name, 'ipv4': [], 'ipv6': [], 'mac': None}
-                for addr in addresses:
-                    if addr.family == socket.AF_INET:
-                        interface_info['ipv4'].append(addr.address)
-                    elif addr.family == socket.AF_INET6:
-                        # Filter out link-local ipv6 to reduce noise
-                        if '%' not in addr.address:
-                            interface_info['ipv6'].append(addr.address)
-                    elif addr.family == psutil.AF_LINK:
-                        interface_info['mac'] = addr.address
-                
-                # Only add if it has some address and skip loopback if desired
-                if interface_info['ipv4'] or interface_info['mac']:
-                    network_interfaces.append(interface_info)
-        except Exception as e:
-            logger.warning(f"Could not collect network interfaces: {e}")
+        if_addrs = psutil.net_if_addrs()
+        for interface_name, addresses in if_addrs.items():
+            interface_info = {'name': interface_name, 'ipv4': [], 'ipv6': [], 'mac': None}
+            for addr in addresses:
+                if addr.family == socket.AF_INET:
+                    interface_info['ipv4'].append(addr.address)
+                elif addr.family == socket.AF_INET6:
+                    # Filter out link-local ipv6 to reduce noise
+                    if '%' not in addr.address:
+                        interface_info['ipv6'].append(addr.address)
+                elif addr.family == psutil.AF_LINK:
+                    interface_info['mac'] = addr.address
+            
+            # Only add if it has some address and skip loopback if desired
+            if interface_info['ipv4'] or interface_info['mac']:
+                network_interfaces.append(interface_info)
+    except Exception as e:
+        logger.warning(f"Could not collect network interfaces: {e}")
+    return network_interfaces
+
+
+def _fingerprint(data: Any) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
 
+class HardwareInventory:
+    """
+    Hardware inventory split into static facts (CPU, OS, total memory), collected
+    once per process and fingerprinted, and volatile ones (memory/disk usage,
+    network addresses) collected on every call.
+
+    has_changed() tells whether the inventory differs materially from the last
+    one marked as uploaded, so unchanged inventories need not be re-sent.
+    When the root mount does not answer, the last known disk values are reused.
+    """
+
+    def __init__(self, disk_change_gb: float = None, resend_interval: float = None, clock=time.monotonic):
+        self.disk_change_gb = disk_change_gb if disk_change_gb is not None else config.HARDWARE_DISK_CHANGE_GB
+        self.resend_interval = resend_interval if resend_interval is not None else config.HARDWARE_RESEND_INTERVAL
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._static: Optional[Dict[str, Any]] = None
+        self._static_fingerprint: Optional[str] = None
+        self._uploaded: Optional[Dict[str, Any]] = None
+        self._uploaded_at: Optional[float] = None
+        self._last_disk: Optional[Dict[str, float]] = None
+
+    def static(self) -> Dict[str, Any]:
+        """Facts that do not change while the agent runs (cached)."""
+        with self._lock:
+            if self._static is None:
+                memory = psutil.virtual_memory()
+                self._static = {
+                    'cpu': {
+                        'physical_cores': psutil.cpu_count(logical=False),
+                        'logical_cores': psutil.cpu_count(logical=True),
+                        'processor': platform.processor(),
+                    },
+                    'memory_total_gb': round(memory.total / (1024**3), 2),
+                    'os': {
+                        'system': platform.system(),
+                        'release': platform.release(),
+                        'version': platform.version(),
+                    },
+                }
+                self._static_fingerprint = _fingerprint(self._static)
+            return self._static
+
+    @property
+    def static_fingerprint(self) -> str:
+        self.static()
+        return self._static_fingerprint
+
+    def collect(self) -> Dict[str, Any]:
+        """Full inventory, in the shape the backend expects for hardware_info."""
+        static = copy.deepcopy(self.static())
+        memory = psutil.virtual_memory()
+        disk = get_disk_probe().usage('/')
+        with self._lock:
+            if disk is not None:
+                self._last_disk = {
+                    'total_gb': round(disk.total / (1024**3), 2),
+                    'used_gb': round(disk.used / (1024**3), 2),
+                    'free_gb': round(disk.free / (1024**3), 2),
+                }
+            disk_info = dict(self._last_disk or {})
         return {
-            'cpu': {
-                'physical_cores': cpu_count,
-                'logical_cores': cpu_count_logical,
-                'processor': platform.processor(),
-            },
+            'cpu': static['cpu'],
             'memory': {
-                'total_gb': round(memory.total / (1024**3), 2),
+                'total_gb': static['memory_total_gb'],
                 'available_gb': round(memory.available / (1024**3), 2),
             },
-            'disk': {
-                'total_gb': round(disk.total / (1024**3), 2),
-                'used_gb': round(disk.used / (1024**3), 2),
-                'free_gb': round(disk.free / (1024**3), 2),
-            },
-            'network': network_interfaces,
-            'os': {
-                'system': platform.system(),
-                'release': platform.release(),
-                'version': platform.version(),
-            }
+            'disk': disk_info,
+            'network': _collect_network_interfaces(),
+            'os': static['os'],
         }
+
+    def has_changed(self, info: Dict[str, Any]) -> bool:
+        """
+        True if info should be uploaded: nothing was uploaded yet, the last upload
+        is older than resend_interval, or a material field changed (static facts,
+        network interfaces, disk size, or disk usage by at least disk_change_gb).
+        Free memory alone never counts. An inventory without disk values (root
+        mount never answered) is held back rather than blanking the server's.
+        """
+        if 'disk' in info and not info['disk']:
+            return False
+        with self._lock:
+            uploaded, uploaded_at = self._uploaded, self._uploaded_at
+        if uploaded is None or self._clock() - uploaded_at >= self.resend_interval:
+            return True
+        if self._material(info) != self._material(uploaded):
+            return True
+        used, previous = info.get('disk', {}).get('used_gb'), uploaded.get('disk', {}).get('used_gb')
+        if used is None or previous is None:
+            return used != previous
+        return abs(used - previous) >= self.disk_change_gb
+
+    def mark_uploaded(self, info: Dict[str, Any]):
+        """Record info as the inventory the server now holds."""
+        with self._lock:
+            self._uploaded = copy.deepcopy(info)
+            self._uploaded_at = self._clock()
+
+    def reset(self):
+        """Forget the last upload so the next inventory is sent in full."""
+        with self._lock:
+            self._uploaded = None
+            self._uploaded_at = None
+
+    @staticmethod
+    def _material(info: Dict[str, Any]) -> str:
+        return _fingerprint({
+            'cpu': info.get('cpu'),
+            'memory_total_gb': info.get('memory', {}).get('total_gb'),
+            'disk_total_gb': info.get('disk', {}).get('total_gb'),
+            'network': info.get('network'),
+            'os': info.get('os'),
+        })
+
+
+_inventory = HardwareInventory()
+
+
+def get_hardware_inventory() -> HardwareInventory:
+    """Process-wide inventory, so static facts are collected only once."""
+    return _inventory
+
+
+def get_hardware_info() -> Dict[str, Any]:
+    """Collects hardware information including CPU, Memory, Disk, and Network."""
+    try:
+        return _inventory.collect()
     except Exception as e:
         logger.error(f"Error collecting hardware info: {e}")
         return {}
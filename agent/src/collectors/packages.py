@@ -0,0 +1,272 @@
+import os
+import sqlite3
+import struct
+import threading
+from pathlib import Path
+from typing import Dict, Any, Iterator, List, Optional, Tuple
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+DPKG_STATUS = '/var/lib/dpkg/status'
+DPKG_INFO_DIR = '/var/lib/dpkg/info'
+RPM_SQLITE_DB = '/var/lib/rpm/rpmdb.sqlite'
+FLATPAK_DIRS = ('/var/lib/flatpak/app',)
+SNAPD_STATE = '/var/lib/snapd/state.json'
+SNAP_MOUNT_DIR = '/snap'
+
+# RPM header tags and types we read (see rpmtag.h)
+RPMTAG_NAME = 1000
+RPMTAG_VERSION = 1001
+RPMTAG_RELEASE = 1002
+RPMTAG_EPOCH = 1003
+RPMTAG_INSTALLTIME = 1008
+RPMTAG_SIZE = 1009
+RPMTAG_VENDOR = 1011
+RPMTAG_ARCH = 1022
+RPM_INT32_TYPE = 4
+RPM_STRING_TYPES = (6, 8, 9)
+
+
+def _record(name, version, vendor=None, architecture=None, size_kb=None, installed_at=None, source=None):
+    return {
+        'name': name,
+        'version': version,
+        'vendor': vendor,
+        'architecture': architecture,
+        'size_kb': size_kb,
+        'installed_at': installed_at,
+        'source': source,
+    }
+
+
+def _mtime(path) -> Optional[int]:
+    try:
+        return int(os.stat(path).st_mtime)
+    except OSError:
+        return None
+
+
+# ==== dpkg ====
+
+def iter_dpkg_packages(status_path: str = DPKG_STATUS, info_dir: str = DPKG_INFO_DIR) -> Iterator[Dict[str, Any]]:
+    """Stream installed packages from the dpkg status database, one stanza at a time."""
+    fields: Dict[str, str] = {}
+    with open(status_path, 'r', encoding='utf-8', errors='replace') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if not line:
+                record = _dpkg_record(fields, info_dir)
+                if record:
+                    yield record
+                fields = {}
+            elif line[0] in ' \t':
+                # Continuation lines only matter for multi-line fields we don't use
+                continue
+            else:
+                key, _, value = line.partition(':')
+                fields[key] = value.strip()
+    record = _dpkg_record(fields, info_dir)
+    if record:
+        yield record
+
+
+def _dpkg_record(fields: Dict[str, str], info_dir: str) -> Optional[Dict[str, Any]]:
+    if not fields.get('Package') or not fields.get('Status', '').endswith(' installed'):
+        return None
+    name, arch = fields['Package'], fields.get('Architecture')
+    # The file list is written when the package is unpacked: its mtime is the install time
+    installed_at = _mtime(os.path.join(info_dir, f"{name}:{arch}.list")) or _mtime(os.path.join(info_dir, f"{name}.list"))
+    size = fields.get('Installed-Size')
+    return _record(
+        name,
+        fields.get('Version'),
+        # vendor stays None as with 'dpkg -l': the Maintainer is a packager, not the publisher
+        architecture=arch,
+        size_kb=int(size) if size and size.isdigit() else None,
+        installed_at=installed_at,
+        source='dpkg',
+    )
+
+
+# ==== rpm ====
+
+def parse_rpm_header(blob: bytes) -> Dict[int, Any]:
+    """Decode the tags we need from an RPM header blob (as stored in rpmdb.sqlite)."""
+    index_count, data_length = struct.unpack('>II', blob[:8])
+    data_start = 8 + index_count * 16
+    data = blob[data_start:data_start + data_length]
+    wanted = (RPMTAG_NAME, RPMTAG_VERSION, RPMTAG_RELEASE, RPMTAG_EPOCH, RPMTAG_INSTALLTIME,
+              RPMTAG_SIZE, RPMTAG_VENDOR, RPMTAG_ARCH)
+    tags = {}
+    for i in range(index_count):
+        tag, kind, offset, count = struct.unpack('>IIII', blob[8 + i * 16:24 + i * 16])
+        if tag not in wanted:
+            continue
+        if kind == RPM_INT32_TYPE:
+            tags[tag] = struct.unpack('>I', data[offset:offset + 4])[0]
+        elif kind in RPM_STRING_TYPES:
+            end = data.index(b'\0', offset)
+            tags[tag] = data[offset:end].decode('utf-8', errors='replace')
+    return tags
+
+
+def iter_rpm_packages(db_path: str = RPM_SQLITE_DB) -> Iterator[Dict[str, Any]]:
+    """Stream installed packages from the rpm sqlite database (rpm >= 4.16)."""
+    conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    try:
+        for (blob,) in conn.execute('SELECT blob FROM Packages'):
+            try:
+                tags = parse_rpm_header(bytes(blob))
+            except (struct.error, ValueError, IndexError):
+                continue
+            name = tags.get(RPMTAG_NAME)
+            if not name or name == 'gpg-pubkey':
+                continue
+            version = tags.get(RPMTAG_VERSION)
+            if version and tags.get(RPMTAG_RELEASE):
+                version = f"{version}-{tags[RPMTAG_RELEASE]}"
+            if version and tags.get(RPMTAG_EPOCH):
+                version = f"{tags[RPMTAG_EPOCH]}:{version}"
+            size = tags.get(RPMTAG_SIZE)
+            yield _record(
+                name,
+                version,
+                vendor=tags.get(RPMTAG_VENDOR),
+                architecture=tags.get(RPMTAG_ARCH),
+                size_kb=size // 1024 if size is not None else None,
+                installed_at=tags.get(RPMTAG_INSTALLTIME),
+                source='rpm',
+            )
+    finally:
+        conn.close()
+
+
+# ==== flatpak ====
+
+def iter_flatpak_apps(app_dirs=FLATPAK_DIRS) -> Iterator[Dict[str, Any]]:
+    """System-wide flatpak apps: <app>/<arch>/<branch>/active is the deployed commit."""
+    for app_dir in app_dirs:
+        root = Path(app_dir)
+        if not root.is_dir():
+            continue
+        for app in sorted(root.iterdir()):
+            for active in app.glob('*/*/active'):
+                branch_dir = active.parent
+                yield _record(
+                    app.name,
+                    branch_dir.name,
+                    architecture=branch_dir.parent.name,
+                    installed_at=_mtime(active),
+                    source='flatpak',
+                )
+
+
+# ==== snap ====
+
+def iter_snap_packages(mount_dir: str = SNAP_MOUNT_DIR) -> Iterator[Dict[str, Any]]:
+    """Installed snaps, read from each snap's current/meta/snap.yaml."""
+    root = Path(mount_dir)
+    if not root.is_dir():
+        return
+    for snap in sorted(root.iterdir()):
+        meta = snap / 'current' / 'meta' / 'snap.yaml'
+        try:
+            with open(meta, 'r', encoding='utf-8', errors='replace') as f:
+                info = {}
+                for line in f:
+                    # Top-level scalar keys only; no YAML dependency needed
+                    if line[:1].isalpha() and ':' in line:
+                        key, _, value = line.partition(':')
+                        info[key.strip()] = value.strip().strip('\'"')
+        except OSError:
+            continue
+        yield _record(
+            info.get('name') or snap.name,
+            info.get('version'),
+            installed_at=_mtime(snap / 'current'),
+            source='snap',
+        )
+
+
+# ==== Cached collector ====
+
+class PackageSource:
+    """One package database: how to read it and which files tell whether it changed."""
+
+    def __init__(self, name: str, reader, signature_paths):
+        self.name = name
+        self.reader = reader
+        self.signature_paths = signature_paths
+
+    def signature(self) -> Optional[Tuple]:
+        """(path, mtime_ns, size) of the database files, or None when the source is absent."""
+        paths = self.signature_paths() if callable(self.signature_paths) else self.signature_paths
+        entries = []
+        for path in paths:
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue
+            entries.append((str(path), st.st_mtime_ns, st.st_size))
+        return tuple(entries) or None
+
+
+def _flatpak_signature_paths():
+    paths = list(FLATPAK_DIRS)
+    for app_dir in FLATPAK_DIRS:
+        root = Path(app_dir)
+        if root.is_dir():
+            # Updates swap the 'active' symlink inside each app's branch directory
+            paths.extend(str(p.parent) for p in root.glob('*/*/*/active'))
+    return paths
+
+
+def _snap_signature_paths():
+    return [SNAPD_STATE, SNAP_MOUNT_DIR]
+
+
+def default_sources() -> List[PackageSource]:
+    return [
+        PackageSource('dpkg', iter_dpkg_packages, [DPKG_STATUS]),
+        PackageSource('rpm', iter_rpm_packages, [RPM_SQLITE_DB, RPM_SQLITE_DB + '-wal']),
+        PackageSource('flatpak', iter_flatpak_apps, _flatpak_signature_paths),
+        PackageSource('snap', iter_snap_packages, _snap_signature_paths),
+    ]
+
+
+class PackageInventory:
+    """
+    Reads every package database present on the machine, re-parsing a source
+    only when the mtime/size of its database files changed since the last read.
+    """
+
+    def __init__(self, sources: List[PackageSource] = None):
+        self.sources = sources if sources is not None else default_sources()
+        self._cache: Dict[str, Tuple[Tuple, List[Dict[str, Any]]]] = {}
+        self._lock = threading.Lock()
+
+    def collect(self) -> List[Dict[str, Any]]:
+        packages = []
+        with self._lock:
+            for source in self.sources:
+                packages.extend(self._read(source))
+        return packages
+
+    def _read(self, source: PackageSource) -> List[Dict[str, Any]]:
+        signature = source.signature()
+        if signature is None:
+            self._cache.pop(source.name, None)
+            return []
+        cached = self._cache.get(source.name)
+        if cached and cached[0] == signature:
+            return cached[1]
+        try:
+            records = list(source.reader())
+        except Exception as e:
+            logger.warning(f"Could not read {source.name} package database: {e}")
+            return cached[1] if cached else []
+        self._cache[source.name] = (signature, records)
+        logger.debug(f"Parsed {len(records)} {source.name} packages")
+        return records
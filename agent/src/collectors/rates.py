@@ -0,0 +1,28 @@
+import time
+from typing import Dict, Optional
+
+
+class CounterRates:
+    """
+    Converts cumulative counters (bytes sent, disk reads...) into per-second
+    rates between successive updates. A counter that goes backwards (reboot,
+    interface reset, wrap) yields no rate for that update.
+    """
+
+    def __init__(self, clock=time.monotonic):
+        self._clock = clock
+        self._previous: Dict[str, float] = {}
+        self._previous_time: Optional[float] = None
+
+    def update(self, counters: Dict[str, float], now: float = None) -> Dict[str, float]:
+        now = self._clock() if now is None else now
+        rates = {}
+        elapsed = now - self._previous_time if self._previous_time is not None else 0.0
+        if elapsed > 0:
+            for key, value in counters.items():
+                previous = self._previous.get(key)
+                if previous is not None and value >= previous:
+                    rates[key] = round((value - previous) / elapsed, 1)
+        self._previous = dict(counters)
+        self._previous_time = now
+        return rates
@@ -0,0 +1,129 @@
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from src import config
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Collector cost: cheap collectors are started first so they get the free slots
+COST_LOW = 0
+COST_HIGH = 1
+
+# Partial-result markers
+PARTIAL_TIMEOUT = 'timeout'    # did not finish before its deadline
+PARTIAL_ERROR = 'error'        # raised an exception
+PARTIAL_STALE = 'stale'        # previous run still hung; last good value reused
+
+
+class Collector:
+    """A named probe with its own deadline and cadence."""
+
+    def __init__(self, name: str, func: Callable[[], Any], timeout: float, interval: float = 0.0,
+                 cost: int = COST_LOW):
+        self.name = name
+        self.func = func
+        self.timeout = timeout
+        # Results younger than interval are reused instead of probing again
+        self.interval = interval
+        self.cost = cost
+        self.inflight: Optional[Future] = None
+        self.last_value: Any = None
+        self.last_success: Optional[float] = None
+
+
+class CollectionResult:
+    """Values of the collectors that finished, plus a marker for each one that did not."""
+
+    def __init__(self):
+        self.values: Dict[str, Any] = {}
+        self.partial: Dict[str, str] = {}
+
+    def get(self, name: str, default=None):
+        return self.values.get(name, default)
+
+    @property
+    def complete(self) -> bool:
+        return not self.partial
+
+
+class CollectorRegistry:
+    """
+    Runs registered collectors concurrently, at most max_workers at a time,
+    each against its own deadline. A collector that hangs is left running in
+    its (daemon) thread and is not started again until it returns; meanwhile
+    its last good value is reused and marked stale.
+    """
+
+    def __init__(self, max_workers: int = None, clock: Callable[[], float] = time.monotonic):
+        self._slots = threading.BoundedSemaphore(max_workers or config.COLLECTOR_WORKERS)
+        self._clock = clock
+        self._collectors: Dict[str, Collector] = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, func: Callable[[], Any], timeout: float, interval: float = 0.0,
+                 cost: int = COST_LOW) -> Collector:
+        collector = Collector(name, func, timeout, interval, cost)
+        with self._lock:
+            self._collectors[name] = collector
+        return collector
+
+    def run(self, names: Iterable[str] = None) -> CollectionResult:
+        """Run the named collectors (default: all) and wait for each up to its deadline."""
+        result = CollectionResult()
+        started = self._clock()
+        with self._lock:
+            selected = [self._collectors[n] for n in names] if names is not None else list(self._collectors.values())
+            pending = []
+            for collector in sorted(selected, key=lambda c: c.cost):
+                if collector.last_success is not None and started - collector.last_success < collector.interval:
+                    result.values[collector.name] = collector.last_value
+                elif collector.inflight is not None and not collector.inflight.done():
+                    self._use_stale(collector, result)
+                else:
+                    collector.inflight = self._start(collector)
+                    pending.append(collector)
+
+        for collector in sorted(pending, key=lambda c: c.timeout):
+            remaining = started + collector.timeout - self._clock()
+            try:
+                value = collector.inflight.result(timeout=max(0.0, remaining))
+            except FutureTimeout:
+                logger.warning(f"Collector '{collector.name}' exceeded its {collector.timeout}s deadline")
+                result.partial[collector.name] = PARTIAL_TIMEOUT
+                continue
+            except Exception as e:
+                logger.error(f"Collector '{collector.name}' failed: {e}")
+                result.partial[collector.name] = PARTIAL_ERROR
+                continue
+            collector.last_value = value
+            collector.last_success = self._clock()
+            result.values[collector.name] = value
+        return result
+
+    # ==== Internals ====
+
+    def _use_stale(self, collector: Collector, result: CollectionResult):
+        if collector.last_success is not None:
+            result.values[collector.name] = collector.last_value
+            result.partial[collector.name] = PARTIAL_STALE
+        else:
+            result.partial[collector.name] = PARTIAL_TIMEOUT
+
+    def _start(self, collector: Collector) -> Future:
+        future = Future()
+
+        def work():
+            with self._slots:
+                if not future.set_running_or_notify_cancel():
+                    return
+                try:
+                    future.set_result(collector.func())
+                except BaseException as e:
+                    future.set_exception(e)
+
+        # Daemon threads: a probe stuck in the kernel must not block agent shutdown
+        threading.Thread(target=work, name=f"collector-{collector.name}", daemon=True).start()
+        return future
@@ -0,0 +1,144 @@
+import bisect
+import threading
+import time
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+import psutil
+
+from src import config
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+class RingBuffer:
+    """Fixed-size ring of (timestamp, value) pairs backed by preallocated arrays."""
+
+    def __init__(self, capacity: int):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self.capacity = capacity
+        self._times = array('d', bytes(8 * capacity))
+        self._values = array('d', bytes(8 * capacity))
+        self._next = 0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._count
+
+    def append(self, timestamp: float, value: float):
+        with self._lock:
+            self._times[self._next] = timestamp
+            self._values[self._next] = value
+            self._next = (self._next + 1) % self.capacity
+            if self._count < self.capacity:
+                self._count += 1
+
+    def latest(self) -> Optional[Tuple[float, float]]:
+        with self._lock:
+            if not self._count:
+                return None
+            i = (self._next - 1) % self.capacity
+            return self._times[i], self._values[i]
+
+    def items(self, since: float = None) -> Tuple[List[float], List[float]]:
+        """Return (timestamps, values) in chronological order, optionally only those after since."""
+        with self._lock:
+            start = (self._next - self._count) % self.capacity
+            if start + self._count <= self.capacity:
+                times = self._times[start:start + self._count]
+                values = self._values[start:start + self._count]
+            else:
+                times = self._times[start:] + self._times[:self._next]
+                values = self._values[start:] + self._values[:self._next]
+        if since is not None:
+            # Timestamps are appended in order, so the cut is a prefix
+            cut = bisect.bisect_right(times, since)
+            times, values = times[cut:], values[cut:]
+        return times.tolist(), values.tolist()
+
+
+class MetricsSampler:
+    """
+    Samples CPU, memory, disk I/O and network counters on a background thread.
+
+    Each series lives in a RingBuffer, so reading metrics never blocks on a
+    measurement (unlike psutil.cpu_percent(interval=1)).
+    """
+
+    FIELDS = (
+        'cpu_percent', 'memory_percent', 'memory_total', 'memory_available',
+        'net_bytes_sent', 'net_bytes_recv', 'disk_read_bytes', 'disk_write_bytes',
+    )
+
+    def __init__(self, interval: float = None, capacity: int = None, clock=time.time):
+        self.interval = interval if interval is not None else config.SAMPLER_INTERVAL
+        capacity = capacity if capacity is not None else config.SAMPLER_CAPACITY
+        self.series: Dict[str, RingBuffer] = {field: RingBuffer(capacity) for field in self.FIELDS}
+        self._clock = clock
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Prime the non-blocking CPU counter; the first call always returns 0.0
+        psutil.cpu_percent(interval=None)
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='metrics-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def sample_once(self):
+        now = self._clock()
+        memory = psutil.virtual_memory()
+        values = {
+            'cpu_percent': psutil.cpu_percent(interval=None),
+            'memory_percent': memory.percent,
+            'memory_total': memory.total,
+            'memory_available': memory.available,
+        }
+        net = psutil.net_io_counters()
+        if net:
+            values['net_bytes_sent'] = net.bytes_sent
+            values['net_bytes_recv'] = net.bytes_recv
+        try:
+            disk = psutil.disk_io_counters()
+        except Exception:
+            disk = None
+        if disk:
+            values['disk_read_bytes'] = disk.read_bytes
+            values['disk_write_bytes'] = disk.write_bytes
+        for field, value in values.items():
+            self.series[field].append(now, float(value))
+
+    def latest(self) -> Dict[str, float]:
+        """Most recent value of every series that has been sampled."""
+        result = {}
+        for field, buffer in self.series.items():
+            item = buffer.latest()
+            if item is not None:
+                result[field] = item[1]
+        return result
+
+    def mean(self, field: str, window: float) -> Optional[float]:
+        """Average of a series over the last window seconds."""
+        _, values = self.series[field].items(since=self._clock() - window)
+        if not values:
+            return None
+        return sum(values) / len(values)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            started = time.monotonic()
+            try:
+                self.sample_once()
+            except Exception as e:
+                logger.debug(f"Metrics sample failed: {e}")
+            self._stop.wait(max(0.0, self.interval - (time.monotonic() - started)))
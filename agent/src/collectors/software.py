@@ -1,11 +1,14 @@
 import platform
-import subprocess
 from typing import List, Dict, Any
 
+from src.collectors.packages import PackageInventory
 from src.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
+# Parsed package databases are reused until their files change
+_linux_packages = PackageInventory()
+
 def get_software_list() -> List[Dict[str, Any]]:
     """Collects installed software (Windows and Linux)."""
     softwares = []
@@ -56,10 +59,6 @@ def get_software_list() -> List[Dict[str, Any]]:
                                         'version': version,
                                         'vendor': vendor
                                     })
-                                    
-                                    # Limit to 200 entries total
-                                    if len(softwares) >= 200:
-                                        break
                             
                             except (FileNotFoundError, OSError):
                                 pass
@@ -71,30 +70,14 @@ def get_software_list() -> List[Dict[str, Any]]:
                             break
                     
                     winreg.CloseKey(key)
-                    
-                    if len(softwares) >= 200:
-                        break
                 
                 except (FileNotFoundError, OSError, PermissionError) as e:
                     logger.debug(f"Could not access registry path {path}: {e}")
                     continue
             
         elif current_os == 'Linux':
-            # Linux: Use dpkg
-            result = subprocess.run(['dpkg', '-l'], capture_output=True, text=True, timeout=10)
-            if result.returncode == 0:
-                lines = result.stdout.split('\n')
-                for line in lines:
-                    if line.startswith('ii'):
-                        parts = line.split()
-                        if len(parts) >= 3:
-                            softwares.append({
-                                'name': parts[1],
-                                'version': parts[2],
-                                'vendor': None
-                            })
-                # Limit to first 200 to avoid overwhelming the server
-                softwares = softwares[:200]
+            # Linux: read the dpkg/rpm/flatpak/snap databases directly
+            softwares = _linux_packages.collect()
     
     except Exception as e:
         logger.warning(f"Could not collect software list: {e}")
@@ -0,0 +1,154 @@
+import hashlib
+import json
+import os
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src import config
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def get_software_state_path() -> Path:
+    """Returns the absolute path of the acknowledged software inventory, next to the agent identity."""
+    if getattr(sys, 'frozen', False):
+        base_dir = Path(sys.executable).resolve().parent
+    else:
+        base_dir = Path(__file__).resolve().parent.parent.parent
+    return base_dir / config.SOFTWARE_STATE_FILE
+
+
+def _entry_key(entry: Dict[str, Any]) -> tuple:
+    return (entry.get('name') or '', entry.get('version') or '', entry.get('vendor') or '')
+
+
+def _as_entry(key: tuple) -> Dict[str, Any]:
+    return {'name': key[0], 'version': key[1] or None, 'vendor': key[2] or None}
+
+
+def inventory_hash(softwares: List[Dict[str, Any]]) -> str:
+    """Order-independent content hash of a software list."""
+    keys = sorted(_entry_key(s) for s in softwares)
+    return hashlib.sha256(json.dumps(keys, separators=(',', ':')).encode()).hexdigest()
+
+
+def diff_inventories(old: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> Dict[str, list]:
+    """
+    Compute added/removed/upgraded sets between two software lists. A package
+    that disappears and comes back with another version is an upgrade.
+    """
+    old_keys, new_keys = Counter(map(_entry_key, old)), Counter(map(_entry_key, new))
+    removed = sorted((old_keys - new_keys).elements())
+    added = sorted((new_keys - old_keys).elements())
+
+    removed_by_name = {}
+    for key in removed:
+        removed_by_name.setdefault(key[0], []).append(key)
+    upgraded, plain_added = [], []
+    for key in added:
+        previous = removed_by_name.get(key[0])
+        if previous:
+            old_key = previous.pop(0)
+            removed.remove(old_key)
+            upgraded.append({**_as_entry(key), 'from_version': old_key[1] or None})
+        else:
+            plain_added.append(_as_entry(key))
+    return {'added': plain_added, 'removed': [_as_entry(k) for k in removed], 'upgraded': upgraded}
+
+
+class SoftwareInventoryState:
+    """
+    Remembers the last software inventory the server acknowledged (persisted
+    across restarts) and builds the software part of the detailed report:
+
+    - unchanged inventory: only softwares_hash, so the server can confirm it is in sync;
+    - changed, server known to accept diffs: softwares_diff against softwares_base_hash;
+    - otherwise (first upload, legacy server, hash mismatch): the full softwares list.
+
+    A server that understands diffs echoes softwares_hash in its response; a
+    different hash means it drifted and the next report is a full resync.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else get_software_state_path()
+        self._lock = threading.Lock()
+        self.acked_hash: Optional[str] = None
+        self.acked: List[Dict[str, Any]] = []
+        self.diff_supported = False
+        self._pending: Optional[Dict[str, Any]] = None
+        self._load()
+
+    def build(self, softwares: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Return the report fields for softwares and remember them until acknowledge()."""
+        current_hash = inventory_hash(softwares)
+        with self._lock:
+            self._pending = {'hash': current_hash, 'softwares': softwares}
+            if self.acked_hash == current_hash:
+                return {'softwares_hash': current_hash}
+            if self.acked_hash and self.diff_supported:
+                return {
+                    'softwares_hash': current_hash,
+                    'softwares_base_hash': self.acked_hash,
+                    'softwares_diff': diff_inventories(self.acked, softwares),
+                }
+            return {'softwares_hash': current_hash, 'softwares': softwares}
+
+    def acknowledge(self, server_hash: Optional[str] = None):
+        """
+        The report built last was accepted. server_hash is the inventory hash the
+        server now holds (None for servers that do not report one).
+        """
+        with self._lock:
+            pending, self._pending = self._pending, None
+            if pending is None:
+                return
+            if server_hash is not None:
+                self.diff_supported = True
+                if server_hash != pending['hash']:
+                    logger.warning("Software inventory out of sync with the server, next report will resync")
+                    self.acked_hash, self.acked = None, []
+                    self._save()
+                    return
+            elif self.acked_hash != pending['hash'] and self.acked_hash is not None and self.diff_supported:
+                # A diff went to a server that no longer confirms hashes: play safe
+                self.diff_supported = False
+                self.acked_hash, self.acked = None, []
+                self._save()
+                return
+            self.acked_hash, self.acked = pending['hash'], pending['softwares']
+            self._save()
+
+    def reset(self):
+        """Force a full resync on the next report."""
+        with self._lock:
+            self._pending = None
+            self.acked_hash, self.acked = None, []
+            self._save()
+
+    # ==== Internals ====
+
+    def _load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            self.acked = data.get('softwares') or []
+            self.acked_hash = data.get('hash') if inventory_hash(self.acked) == data.get('hash') else None
+            self.diff_supported = bool(data.get('diff_supported'))
+        except FileNotFoundError:
+            pass
+        except Exception as e:
+            logger.warning(f"Could not read software inventory state: {e}")
+
+    def _save(self):
+        tmp_path = self.path.with_name(self.path.name + '.tmp')
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({'hash': self.acked_hash, 'softwares': self.acked,
+                           'diff_supported': self.diff_supported}, f)
+            os.replace(tmp_path, self.path)
+        except Exception as e:
+            logger.warning(f"Could not save software inventory state: {e}")
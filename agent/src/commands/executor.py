@@ -1,5 +1,8 @@
 import platform
-from typing import Dict, Any, Callable
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Dict, Any, Callable, Optional
+from src import config
 from src.utils.logger import setup_logger
 from src.commands.handlers import (
     handle_shutdown, handle_restart, handle_terminal, handle_receive_file,
@@ -10,6 +13,20 @@ from src.commands.handlers import (
 
 logger = setup_logger(__name__)
 
+# Callback invoked exactly once per submitted command: (cmd, status, output)
+CommandCallback = Callable[[Dict[str, Any], str, str], None]
+
+
+class _CommandTask:
+    def __init__(self, cmd: Dict[str, Any], lane: str, on_done: Optional[CommandCallback]):
+        self.cmd = cmd
+        self.lane = lane
+        self.on_done = on_done
+        self.result: Future = Future()
+        self.work: Optional[Future] = None
+        self.started = False
+
+
 class CommandExecutor:
     def __init__(self, agent_dir: str, api_client=None):
         self.os_name = platform.system()
@@ -32,6 +49,12 @@ class CommandExecutor:
             'install_software': lambda cmd: handle_install_software(cmd, self.agent_dir, self.api_client),
             'update_agent': lambda cmd: handle_update_agent(cmd, self.agent_dir, self.api_client),
         }
+        self._lanes = {
+            lane: ThreadPoolExecutor(max_workers=limit, thread_name_prefix=f"cmd-{lane}")
+            for lane, limit in config.COMMAND_LANES.items()
+        }
+        self._inflight: Dict[Any, _CommandTask] = {}
+        self._lock = threading.Lock()
 
     def execute(self, cmd: Dict[str, Any]) -> str:
         """Route the command to the appropriate handler."""
@@ -50,3 +73,99 @@ class CommandExecutor:
             msg = f"Erro fatal ao executar {command_type}: {e}"
             logger.error(msg)
             return msg
+
+    def lane_for(self, command_type: str) -> str:
+        lane = config.COMMAND_LANE_BY_TYPE.get(command_type, 'interactive')
+        return lane if lane in self._lanes else 'interactive'
+
+    def timeout_for(self, command_type: str) -> float:
+        return config.COMMAND_TIMEOUTS.get(command_type, config.COMMAND_DEFAULT_TIMEOUT)
+
+    def is_inflight(self, command_id) -> bool:
+        with self._lock:
+            return command_id in self._inflight
+
+    def submit(self, cmd: Dict[str, Any], on_done: Optional[CommandCallback] = None) -> Future:
+        """
+        Dispatch the command onto its lane and return a Future with its output.
+        on_done is called once with 'completed', or 'failed' on timeout/cancellation.
+        A power command cancels the commands still queued on other lanes; the
+        ones already running are not stopped (handlers cannot be interrupted).
+        """
+        command_id = cmd.get('id')
+        command_type = cmd.get('command') or ''
+        lane = self.lane_for(command_type)
+
+        with self._lock:
+            existing = self._inflight.get(command_id) if command_id is not None else None
+            if existing:
+                return existing.result
+            task = _CommandTask(cmd, lane, on_done)
+            if command_id is not None:
+                self._inflight[command_id] = task
+
+        if lane == 'power':
+            self._preempt_queued("Cancelado: desligamento/reinício solicitado.")
+
+        task.work = self._lanes[lane].submit(self._run_task, task)
+        return task.result
+
+    def cancel(self, command_id, reason: str = "Comando cancelado.") -> bool:
+        """Cancel a queued or running command. A running handler is abandoned, not killed."""
+        with self._lock:
+            task = self._inflight.get(command_id)
+        if not task:
+            return False
+        if task.work:
+            task.work.cancel()
+        self._finish(task, 'failed', reason)
+        return True
+
+    def shutdown(self, wait: bool = False):
+        for pool in self._lanes.values():
+            pool.shutdown(wait=wait, cancel_futures=True)
+
+    def _run_task(self, task: _CommandTask):
+        if task.result.done():
+            return
+        task.started = True
+        command_type = task.cmd.get('command') or ''
+        timeout = self.timeout_for(command_type)
+        # The handler gets its own thread so the lane slot is freed on timeout or cancel
+        # (except on exclusive lanes); an abandoned handler keeps running until it returns
+        handler = threading.Thread(
+            target=lambda: self._finish(task, 'completed', self.execute(task.cmd)),
+            name=f"cmd-{command_type or 'unknown'}-{task.cmd.get('id')}", daemon=True,
+        )
+        handler.start()
+        try:
+            task.result.result(timeout=timeout)
+        except FutureTimeout:
+            self._finish(task, 'failed', f"Tempo limite do comando excedido ({timeout}s).")
+        if task.lane in config.COMMAND_EXCLUSIVE_LANES and handler.is_alive():
+            logger.warning(f"Comando '{command_type}' ainda em execução; a fila '{task.lane}' aguarda o término")
+            handler.join()
+
+    def _preempt_queued(self, reason: str):
+        with self._lock:
+            queued = [t for t in self._inflight.values() if not t.started and t.lane != 'power']
+        for task in queued:
+            if task.work and task.work.cancel():
+                logger.info(f"Comando '{task.cmd.get('command')}' cancelado por comando de energia")
+                self._finish(task, 'failed', reason)
+
+    def _finish(self, task: _CommandTask, status: str, output: str):
+        with self._lock:
+            if task.result.done():
+                return
+            task.result.set_result(output)
+            command_id = task.cmd.get('id')
+            if self._inflight.get(command_id) is task:
+                del self._inflight[command_id]
+        if status != 'completed':
+            logger.warning(f"Comando '{task.cmd.get('command')}' finalizado como {status}: {output}")
+        if task.on_done:
+            try:
+                task.on_done(task.cmd, status, output)
+            except Exception as e:
+                logger.error(f"Erro no callback do comando {task.cmd.get('id')}: {e}")
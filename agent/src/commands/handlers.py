@@ -293,7 +293,11 @@ def handle_install_software(cmd: Dict[str, Any], agent_dir: str, api_client=None
                 cmd_args.extend(['/VERYSILENT', '/SUPPRESSMSGBOXES', '/NORESTART'])
             
             logger.info(f"Running software installer: {' '.join(cmd_args)}")
-            proc = subprocess.run(cmd_args, capture_output=True, text=True)
+            install_timeout = config.COMMAND_TIMEOUTS.get('install_software', config.COMMAND_DEFAULT_TIMEOUT)
+            try:
+                proc = subprocess.run(cmd_args, capture_output=True, text=True, timeout=install_timeout)
+            except subprocess.TimeoutExpired:
+                return f"Software: {software_name}\nTempo limite da instalação excedido ({install_timeout}s)."
             output = f"Software: {software_name}\nSTDOUT: {proc.stdout}\nSTDERR: {proc.stderr}"
             
             if reboot_after and proc.returncode == 0:
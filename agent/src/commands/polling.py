@@ -0,0 +1,71 @@
+import time
+from typing import Callable, Optional
+
+from src import config
+
+# Response headers the server may use to steer polling
+POLL_INTERVAL_HEADER = 'X-Poll-Interval'  # seconds until the next poll
+ACTIVITY_HEADER = 'X-Agent-Activity'      # '1' when an operator is working with this machine
+
+MIN_HINT = 0.25
+MAX_HINT = 3600
+
+
+class AdaptivePollController:
+    """
+    Picks the next command-poll interval.
+
+    Polling drops to POLL_FAST_INTERVAL for POLL_FAST_WINDOW seconds after a
+    command arrives or the server signals activity, and backs off
+    exponentially up to POLL_MAX_INTERVAL while idle. An interval hinted by
+    the server always wins.
+    """
+
+    def __init__(self, base_interval: float = None, fast_interval: float = None, fast_window: float = None,
+                 max_interval: float = None, backoff_factor: float = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.base_interval = base_interval if base_interval is not None else config.POLL_INTERVAL
+        self.fast_interval = fast_interval if fast_interval is not None else config.POLL_FAST_INTERVAL
+        self.fast_window = fast_window if fast_window is not None else config.POLL_FAST_WINDOW
+        self.max_interval = max_interval if max_interval is not None else config.POLL_MAX_INTERVAL
+        self.backoff_factor = backoff_factor if backoff_factor is not None else config.POLL_BACKOFF_FACTOR
+        self._clock = clock
+        self._fast_until = 0.0
+        self._idle_polls = 0
+        self._hint: Optional[float] = None
+
+    def on_activity(self):
+        """A command arrived (by any channel): poll fast for a while."""
+        self._idle_polls = 0
+        self._fast_until = self._clock() + self.fast_window
+
+    def on_idle(self):
+        self._idle_polls += 1
+
+    def observe(self, response, commands_received: int = 0):
+        """Update state from a /commands/pending response."""
+        headers = getattr(response, 'headers', None) or {}
+        self._hint = self._parse_hint(headers.get(POLL_INTERVAL_HEADER))
+        if commands_received or str(headers.get(ACTIVITY_HEADER, '')).strip() == '1':
+            self.on_activity()
+        else:
+            self.on_idle()
+
+    def next_interval(self) -> float:
+        if self._hint is not None:
+            return self._hint
+        if self._clock() < self._fast_until:
+            return self.fast_interval
+        exponent = min(max(0, self._idle_polls - 1), 32)
+        backoff = self.base_interval * (self.backoff_factor ** exponent)
+        return max(self.fast_interval, min(self.max_interval, backoff))
+
+    @staticmethod
+    def _parse_hint(value) -> Optional[float]:
+        if value is None:
+            return None
+        try:
+            hint = float(value)
+        except (TypeError, ValueError):
+            return None
+        return min(MAX_HINT, max(MIN_HINT, hint))
@@ -0,0 +1,163 @@
+import threading
+from typing import Any, Dict, List, Optional
+
+from src import config
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+TERMINAL_STATUSES = ('completed', 'failed')
+
+
+class StatusReporter:
+    """
+    Buffers command status transitions and flushes them as one batched request.
+
+    Transitions for the same command within a flush window are merged (a
+    terminal status supersedes 'processing'). Terminal statuses that fail to
+    reach the server are kept (in the durable outbox when one is given), so
+    they are delivered at least once. Servers without the batch endpoint get
+    one PUT per merged transition.
+    """
+
+    def __init__(self, api_client, flush_interval: float = None, max_batch: int = None, outbox=None):
+        self.api = api_client
+        self.outbox = outbox
+        self.flush_interval = flush_interval if flush_interval is not None else config.STATUS_FLUSH_INTERVAL
+        self.max_batch = max_batch if max_batch is not None else config.STATUS_BATCH_SIZE
+        self.batch_supported = True
+        self._buffer: Dict[Any, Dict[str, Any]] = {}
+        self._sending: set = set()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def report(self, command_id, status: str, output: str = None):
+        update = {'id': command_id, 'status': status}
+        if output is not None:
+            update['output'] = output
+        with self._lock:
+            self._merge(update)
+            full = len(self._buffer) >= self.max_batch
+        if full or not self._thread:
+            if self._thread:
+                self._wake.set()
+            else:
+                # No flusher running (e.g. one-off use): deliver right away
+                self.flush()
+
+    def has_unsent(self, command_id) -> bool:
+        """True while a transition for this command has not been acknowledged by the server."""
+        with self._lock:
+            if command_id in self._buffer or command_id in self._sending:
+                return True
+        return self.outbox is not None and self.outbox.contains(self.outbox_key(command_id))
+
+    @staticmethod
+    def outbox_key(command_id) -> str:
+        return f"status:{command_id}"
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='status-reporter', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        self._wake.set()
+        if self._thread:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def flush(self) -> bool:
+        """Send every buffered transition. Returns False if anything had to be re-queued."""
+        with self._flush_lock:
+            with self._lock:
+                updates = list(self._buffer.values())
+                self._buffer.clear()
+                self._sending = {u['id'] for u in updates}
+            if not updates:
+                return True
+            try:
+                failed = self.send_updates(updates)
+            except Exception as e:
+                logger.error(f"Erro ao enviar status de {len(updates)} comando(s): {e}")
+                failed = updates
+            terminal = [u for u in failed if u['status'] in TERMINAL_STATUSES]
+            if self.outbox is not None:
+                for update in terminal:
+                    self._store(update)
+            with self._lock:
+                self._sending = set()
+                if self.outbox is None:
+                    for update in terminal:
+                        self._merge(update, newer=False)
+            return not failed
+
+    def send_updates(self, updates: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Deliver updates (batched when possible). Returns the ones that should be retried."""
+        if self.batch_supported:
+            response = self.api.post(config.STATUS_BATCH_ENDPOINT, json={'updates': updates})
+            if response.status_code in (404, 405):
+                logger.info("Endpoint de status em lote indisponível; usando atualização individual")
+                self.batch_supported = False
+            elif self._retryable(response.status_code):
+                return updates
+            else:
+                if response.status_code >= 400:
+                    logger.warning(f"Status de {len(updates)} comando(s) rejeitado pelo servidor "
+                                   f"(HTTP {response.status_code}), descartando")
+                return []
+
+        failed = []
+        for update in updates:
+            payload = {k: v for k, v in update.items() if k != 'id'}
+            try:
+                response = self.api.put(f"/commands/{update['id']}/status", json=payload)
+            except Exception as e:
+                logger.error(f"Erro ao atualizar status do comando {update['id']}: {e}")
+                failed.append(update)
+                continue
+            if self._retryable(response.status_code):
+                failed.append(update)
+            elif response.status_code >= 400:
+                logger.warning(f"Status do comando {update['id']} rejeitado pelo servidor "
+                               f"(HTTP {response.status_code}), descartando")
+        return failed
+
+    # ==== Internals ====
+
+    @staticmethod
+    def _retryable(status_code: int) -> bool:
+        """Server errors and throttling are worth retrying; other 4xx will never be accepted."""
+        return status_code >= 500 or status_code in (408, 429)
+
+    def _merge(self, update: Dict[str, Any], newer: bool = True):
+        current = self._buffer.get(update['id'])
+        if current:
+            current_terminal = current['status'] in TERMINAL_STATUSES
+            update_terminal = update['status'] in TERMINAL_STATUSES
+            # Never let a stale or 'processing' transition override a terminal one
+            if current_terminal and (not update_terminal or not newer):
+                return
+        self._buffer[update['id']] = update
+
+    def _store(self, update: Dict[str, Any]):
+        try:
+            self.outbox.enqueue('command_status', 'PUT', f"/commands/{update['id']}/status", update,
+                                dedupe_key=self.outbox_key(update['id']))
+        except Exception as e:
+            logger.error(f"Erro ao guardar status do comando {update['id']} na outbox: {e}")
+            with self._lock:
+                self._merge(update, newer=False)
+
+    def _loop(self):
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
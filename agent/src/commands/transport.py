@@ -0,0 +1,101 @@
+import random
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from src import config
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Header the server sets when it actually held the request (long-poll aware backend)
+LONG_POLL_HEADER = 'X-Long-Poll-Wait'
+
+
+class LongPollTransport:
+    """
+    Push-style command channel over HTTP long polling.
+
+    A background thread keeps a GET /computers/{id}/commands/pending?wait=N
+    open; the server answers as soon as a command is queued or after N
+    seconds (the answer doubles as a heartbeat). Commands are handed to
+    on_commands. While the channel is not active (server without long-poll
+    support, network errors) the caller keeps using regular polling.
+    """
+
+    def __init__(self, api_client, on_commands: Callable[[List[Dict[str, Any]]], None],
+                 wait_seconds: float = None, grace_seconds: float = None,
+                 max_backoff: float = None, probe_interval: float = None):
+        self.api = api_client
+        self.on_commands = on_commands
+        self.wait_seconds = wait_seconds if wait_seconds is not None else config.LONG_POLL_WAIT
+        self.grace_seconds = grace_seconds if grace_seconds is not None else config.LONG_POLL_GRACE
+        self.max_backoff = max_backoff if max_backoff is not None else config.LONG_POLL_MAX_BACKOFF
+        self.probe_interval = probe_interval if probe_interval is not None else config.LONG_POLL_PROBE_INTERVAL
+        self.supported: Optional[bool] = None
+        self.failures = 0
+        self.last_contact: Optional[float] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='command-longpoll', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = None):
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+
+    def is_active(self) -> bool:
+        """True while the server holds our requests and the last heartbeat is recent."""
+        if not self.supported or self.failures or self.last_contact is None:
+            return False
+        return time.monotonic() - self.last_contact <= self.wait_seconds + self.grace_seconds
+
+    def poll_once(self) -> List[Dict[str, Any]]:
+        """Issue one long-poll request. Returns the commands delivered (possibly empty)."""
+        started = time.monotonic()
+        response = self.api.get(
+            f"/computers/{self.api.computer_id}/commands/pending",
+            params={'wait': int(self.wait_seconds)},
+            timeout=(config.HTTP_CONNECT_TIMEOUT, self.wait_seconds + self.grace_seconds),
+        )
+        if response.status_code != 200:
+            raise ConnectionError(f"HTTP {response.status_code}")
+
+        held = LONG_POLL_HEADER in response.headers
+        if self.supported is not held:
+            logger.info("Canal de comandos long-poll %s", "ativo" if held else "não suportado pelo servidor, usando polling")
+        self.supported = held
+        self.failures = 0
+        self.last_contact = time.monotonic()
+
+        commands = response.json()
+        if not isinstance(commands, list):
+            commands = commands.get('data', [])
+        if commands:
+            logger.info(f"{len(commands)} comando(s) recebido(s) via long-poll em {self.last_contact - started:.2f}s")
+        return commands
+
+    def _loop(self):
+        while not self._stop.is_set():
+            if not self.api.computer_id:
+                self._stop.wait(config.POLL_INTERVAL)
+                continue
+            try:
+                commands = self.poll_once()
+                if commands:
+                    self.on_commands(commands)
+                if not self.supported:
+                    # Server answered immediately: leave delivery to regular polling and probe again later
+                    self._stop.wait(self.probe_interval)
+            except Exception as e:
+                self.failures += 1
+                delay = min(self.max_backoff, 2 ** min(self.failures, 10))
+                delay = random.uniform(delay / 2, delay)
+                logger.warning(f"Falha no canal long-poll ({e}); reconectando em {delay:.1f}s")
+                self._stop.wait(delay)
@@ -22,10 +22,145 @@ INSTALLATION_TOKEN = os.environ.get('INSTALLATION_TOKEN', '')
 LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO').upper()
 
 # Timeouts and intervals
-REQUEST_TIMEOUT = 30
+REQUEST_TIMEOUT = 30  # seconds, read timeout for backend requests
 POLL_INTERVAL = 5  # seconds
+POLL_FAST_INTERVAL = 0.5  # seconds, right after a command arrives
+POLL_FAST_WINDOW = 30  # seconds fast polling lasts after the last activity
+POLL_MAX_INTERVAL = 30  # seconds, cap for the idle backoff
+POLL_BACKOFF_FACTOR = 2.0
 METRICS_INTERVAL = 60  # seconds
 REPORT_INTERVAL = 3600  # seconds
+HARDWARE_DISK_CHANGE_GB = 1.0  # disk usage change that makes the inventory worth re-sending
+HARDWARE_RESEND_INTERVAL = 86400  # seconds, re-send an unchanged inventory at least this often
+SOFTWARE_STATE_FILE = 'software_inventory.json'  # last software inventory the server acknowledged
+
+# Shared HTTP transport (connection pools used by every network path)
+HTTP_CONNECT_TIMEOUT = 5  # seconds to establish a TCP/TLS connection
+HTTP_DOWNLOAD_READ_TIMEOUT = 60  # seconds between bytes on installer/update downloads
+HTTP_POOL_CONNECTIONS = 4  # hosts with a cached pool
+HTTP_POOL_MAXSIZE = 12  # keep-alive connections per host (scheduler + async workers + long-poll)
+HTTP_KEEPALIVE_IDLE = 60  # seconds before TCP keep-alive probes on idle connections
+HTTP2_ENABLED = os.environ.get('AGENT_HTTP2', '').lower() in ('1', 'true', 'yes')  # needs httpx[http2]
+
+# Local status snapshot (API stats, circuit state) read by `main.py --status`
+STATUS_FILE = 'agent_status.json'
+STATUS_FILE_INTERVAL = 60  # seconds between status snapshot writes
+
+# Conditional-request cache for config GETs: endpoint -> (ttl, stale_while_revalidate) in seconds.
+# Fresh responses are reused without a request; stale ones are served while a background
+# If-None-Match/If-Modified-Since revalidation runs. A Cache-Control max-age overrides the ttl.
+RESPONSE_CACHE_POLICIES = {
+    '/agent/me': (60, 300),
+}
+
+# Retries and circuit breaker for backend requests
+RETRY_MAX_ATTEMPTS = 3
+RETRY_BACKOFF = 0.5  # seconds, doubled per attempt (full jitter)
+RETRY_MAX_BACKOFF = 5
+RETRY_MAX_WAIT = 5  # seconds; a longer Retry-After is left to the circuit breaker
+CIRCUIT_FAILURE_THRESHOLD = 5  # consecutive failures before failing fast
+CIRCUIT_RESET_TIMEOUT = 30  # seconds before the first probe (doubles per failed probe)
+CIRCUIT_MAX_RESET_TIMEOUT = 300
+
+# Collectors run concurrently, each against its own deadline (seconds)
+COLLECTOR_WORKERS = 4
+COLLECTOR_TIMEOUTS = {
+    'disks': 10,
+    'hardware': 30,
+    'software': 120,
+}
+
+# Disk probes: statvfs on a dead NFS/SMB mount can block forever
+DISK_PROBE_TIMEOUT = 2  # seconds to wait for a mount's usage
+DISK_PROBE_WORKERS = 4
+DISK_PROBE_BACKOFF = 30  # seconds before retrying an unresponsive mount (doubles)
+DISK_PROBE_MAX_BACKOFF = 900
+DISK_PARTITIONS_TTL = 60  # seconds the partition list is cached where the mount table cannot be watched
+
+# Background metrics sampler
+SAMPLER_INTERVAL = 1.0  # seconds between samples
+SAMPLER_CAPACITY = 1024  # samples kept per series (~17 min at 1s)
+
+# Aggregated metric windows, uploaded in one compressed batch per METRICS_INTERVAL
+METRICS_WINDOW = 15  # seconds per aggregated window
+METRICS_MAX_PENDING_WINDOWS = 240  # windows kept while uploads fail (1h at 15s)
+METRICS_FULL_SNAPSHOT_EVERY = 30  # delta-encoded uploads between full snapshots
+
+# Runtime mode: 'threaded' (scheduler worker pool) or 'async' (asyncio event loop)
+AGENT_RUNTIME = os.environ.get('AGENT_RUNTIME', 'threaded').lower()
+ASYNC_IO_WORKERS = 4  # concurrent HTTP round trips in async mode
+ASYNC_COLLECTOR_WORKERS = 4  # blocking collectors/handlers in async mode
+
+# Scheduler
+SCHEDULER_WORKERS = None  # None: one worker per registered job, so polling never queues behind slow jobs
+SCHEDULER_JITTER = 0.1  # fraction of a job's interval, spreads the load of a whole lab
+
+# Command delivery: 'longpoll' holds a request open until a command arrives,
+# falling back to POLL_INTERVAL polling when the server does not support it
+COMMAND_TRANSPORT = os.environ.get('COMMAND_TRANSPORT', 'longpoll').lower()
+LONG_POLL_WAIT = 25  # seconds the server may hold the request
+LONG_POLL_GRACE = 10  # extra read timeout before the connection is considered dead
+LONG_POLL_MAX_BACKOFF = 60  # seconds between reconnect attempts at most
+LONG_POLL_PROBE_INTERVAL = 600  # seconds before re-probing a server without long-poll support
+
+# Command execution: each lane is a worker pool with its own concurrency limit
+COMMAND_LANES = {
+    'install': 1,      # installers and agent updates run one at a time
+    'transfer': 2,
+    'terminal': 2,
+    'interactive': 4,  # screenshot, ps_list, lock, message...
+    'power': 1,        # shutdown/restart, preempts queued work
+}
+COMMAND_LANE_BY_TYPE = {
+    'install_software': 'install',
+    'update_agent': 'install',
+    'receive_file': 'transfer',
+    'terminal': 'terminal',
+    'shutdown': 'power',
+    'restart': 'power',
+}
+# Lanes whose timed-out handler keeps its slot until it really exits (never two installers at once)
+COMMAND_EXCLUSIVE_LANES = ('install',)
+COMMAND_DEFAULT_TIMEOUT = 60  # seconds
+COMMAND_TIMEOUTS = {
+    'install_software': 1800,
+    'update_agent': 900,
+    'receive_file': 900,
+    'terminal': 75,
+}
+
+# Command status reporting
+STATUS_FLUSH_INTERVAL = 1.0  # seconds transitions are buffered before a batched flush
+STATUS_BATCH_SIZE = 20  # flush early once this many commands are buffered
+STATUS_BATCH_ENDPOINT = '/commands/status/batch'
+
+# Offline outbox (store-and-forward for metrics, reports and command results)
+OUTBOX_FILE = 'outbox.db'
+OUTBOX_MAX_ITEMS = 5000
+OUTBOX_MAX_BYTES = 50 * 1024 * 1024
+OUTBOX_MAX_AGE = 7 * 24 * 3600  # seconds
+OUTBOX_DRAIN_INTERVAL = 30  # seconds between drain attempts
+OUTBOX_DRAIN_BATCH = 50  # entries sent per drain pass
+OUTBOX_DRAIN_PAUSE = 1.0  # seconds between passes while a backlog is being drained
+
+# Lab wallpaper (content-addressed download cache)
+WALLPAPER_CACHE_KEEP = 3  # image versions kept on disk
+WALLPAPER_REVALIDATE_INTERVAL = 300  # seconds between conditional GETs for an unchanged URL
+WALLPAPER_PROBE_TTL = 60  # seconds the desktop's current wallpaper is cached when it cannot be monitored
+WALLPAPER_MONITOR_RESTART_INTERVAL = 300  # seconds between restarts of a gsettings monitor that exited
+WALLPAPER_RESOLUTION_TTL = 600  # seconds the detected screen resolution is cached
+WALLPAPER_MAX_RESOLUTION = (3840, 2160)  # used when the screen resolution cannot be detected
+WALLPAPER_VARIANT_FORMAT = 'JPEG'  # re-encoding format of screen-sized variants (JPEG, PNG or WEBP)
+WALLPAPER_VARIANT_QUALITY = 90
+WALLPAPER_VARIANT_KEEP = 6  # screen-sized variants kept on disk
+WALLPAPER_WATCH_POLL_INTERVAL = 5  # seconds between checks of pending_wallpaper.txt without inotify
+WALLPAPER_WATCH_RESCAN_INTERVAL = 300  # seconds between safety checks when inotify is used
+WALLPAPER_WATCH_RETRY_INTERVAL = 5  # seconds before retrying a failed apply (doubles)
+WALLPAPER_WATCH_MAX_RETRY_INTERVAL = 300
+
+# Kiosk supervision
+KIOSK_RESTART_BACKOFF = 10  # seconds before relaunching a kiosk that did not come up (doubles)
+KIOSK_MAX_RESTART_BACKOFF = 300
 
 # Legacy constants
 MACHINE_ID_FILE = '.agent_identity'
@@ -1,83 +1,19 @@
+import hashlib
 import os
 import subprocess
+import sys
 import time
 from pathlib import Path
+from typing import Optional
 
+import psutil
+
+from src import config
 from src.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
 
-class KioskManager:
-    def __init__(self, agent_dir: str):
-        self.agent_dir = Path(agent_dir)
-        self.active_file = r"C:\ProgramData\IFLabAgent\kiosk_active.txt"
-        self.unlock_file = r"C:\ProgramData\IFLabAgent\unlock_kiosk.txt"
-
-    def enforce_kiosk_process(self):
-        """Monitor kiosk_active.txt and ensure the kiosk process is running in user session."""
-        if not os.path.exists(self.active_file):
-            return
-
-        try:
-            # Check if kiosk is already running in user session
-            kiosk_running = False
-            import psutil
-            for p in psutil.process_iter(['name', 'cmdline']):
-                try:
-                    if p.info['name'] and 'python' in p.info['name'].lower():
-                        cmdline = p.info.get('cmdline') or []
-                        if any('kiosk.py' in arg for arg in cmdline):
-                            kiosk_running = True
-                            break
-                except (psutil.NoSuchProcess, psutil.AccessDenied):
-                    pass
-
-            if not kiosk_running:
-                logger.debug("Kiosk is active but process not running. Attempting to launch in user session...")
-                import sys
-                script_path = self.ensure_kiosk_script()
-                if script_path:
-                    python_exe = sys.executable.replace('python.exe', 'pythonw.exe')
-                    if not os.path.exists(python_exe):
-                        python_exe = sys.executable
-                        
-                    ps_script = f'''
-$cs = Get-WmiObject -Class Win32_ComputerSystem
-$user = $cs.UserName
-if (-not $user) {{ exit 1 }}
-if ($user -match '^(.+)\\\\(.+)$') {{
-    $domain = $matches[1]
-    $username = $matches[2]
-}} else {{
-    $domain = $env:COMPUTERNAME
-    $username = $user
-}}
-$taskName = "IFLabKiosk_" + [System.Guid]::NewGuid().ToString("N").Substring(0,8)
-cmd /c "schtasks /Create /TN `"$taskName`" /TR `"{python_exe} `"{script_path}`"`" /SC ONCE /ST 23:59 /F /RU `"$domain\\$username`" /RL HIGHEST" 2>&1 | Out-Null
-cmd /c "schtasks /Run /TN `"$taskName`"" 2>&1 | Out-Null
-Start-Sleep -Milliseconds 800
-cmd /c "schtasks /Delete /TN `"$taskName`" /F" 2>&1 | Out-Null
-exit 0
-'''
-                    try:
-                        subprocess.run(
-                            ['powershell.exe', '-ExecutionPolicy', 'Bypass', '-NoProfile', '-WindowStyle', 'Hidden', '-Command', ps_script],
-                            capture_output=True, timeout=15
-                        )
-                    except Exception as e:
-                        logger.error(f"Failed to launch kiosk task: {e}")
-        except Exception as e:
-            logger.debug(f"Error checking kiosk process: {e}")
-
-
-
-    def ensure_kiosk_script(self) -> str:
-        """Returns the path to the kiosk lock script, generating it if necessary."""
-        script_path = self.agent_dir / "src" / "kiosk.py"
-        try:
-            os.makedirs(script_path.parent, exist_ok=True)
-            with open(script_path, "w", encoding="utf-8") as f:
-                f.write("""import tkinter as tk
+KIOSK_SCRIPT = """import tkinter as tk
 import os, time, sys
 import ctypes
 from ctypes import wintypes
@@ -85,10 +21,18 @@ import atexit
 
 unlock_file = r"C:\\ProgramData\\IFLabAgent\\unlock_kiosk.txt"
 active_file = r"C:\\ProgramData\\IFLabAgent\\kiosk_active.txt"
+pid_file = r"C:\\ProgramData\\IFLabAgent\\kiosk.pid"
 
 if not os.path.exists(active_file):
     sys.exit(0)
 
+# Lets the agent supervise this process by PID instead of scanning every process
+try:
+    with open(pid_file, "w") as f:
+        f.write(str(os.getpid()))
+except OSError:
+    pass
+
 # Low-Level Keyboard Hook
 WH_KEYBOARD_LL = 13
 WM_KEYDOWN = 0x0100
@@ -163,8 +107,174 @@ install_hook()
 atexit.register(uninstall_hook)
 
 root.after(1000, check_unlock, root)
-root.mainloop()""")
+root.mainloop()"""
+KIOSK_SCRIPT_HASH = hashlib.sha256(KIOSK_SCRIPT.encode("utf-8")).hexdigest()
+
+class KioskManager:
+    """
+    Keeps the kiosk lock screen running while kiosk_active.txt exists. The
+    kiosk writes its PID on start; the manager adopts that process once
+    (checking its cmdline, so a reused PID is not mistaken for it) and from
+    then on liveness is a single is_running() call, which also compares the
+    process create time. Before each relaunch (which backs off exponentially)
+    the process list is scanned, in case the kiosk runs but could not write
+    its PID file.
+    """
+
+    def __init__(self, agent_dir: str):
+        self.agent_dir = Path(agent_dir)
+        self.active_file = r"C:\ProgramData\IFLabAgent\kiosk_active.txt"
+        self.unlock_file = r"C:\ProgramData\IFLabAgent\unlock_kiosk.txt"
+        self.pid_file = r"C:\ProgramData\IFLabAgent\kiosk.pid"
+        self._process: Optional[psutil.Process] = None
+        self._launches = 0
+        self._retry_at = 0.0
+        self._script_signature = None
+        self._clock = time.monotonic
+
+    def enforce_kiosk_process(self):
+        """Monitor kiosk_active.txt and ensure the kiosk process is running in user session."""
+        if not os.path.exists(self.active_file):
+            if self._process is not None or self._launches:
+                self._forget()
+            return
+
+        try:
+            if self._process is not None and self._process.is_running():
+                return
+            self._process = self._adopt()
+            if self._process is not None:
+                self._launches = 0
+                return
+
+            now = self._clock()
+            if now < self._retry_at:
+                return
+            self._process = self._scan()
+            if self._process is not None:
+                self._launches = 0
+                return
+            self._launches += 1
+            delay = min(config.KIOSK_RESTART_BACKOFF * (2 ** (self._launches - 1)), config.KIOSK_MAX_RESTART_BACKOFF)
+            self._retry_at = now + delay
+            logger.debug("Kiosk is active but process not running. Attempting to launch in user session...")
+            script_path = self.ensure_kiosk_script()
+            if script_path:
+                self.ensure_pid_file()
+                self._launch(script_path)
+        except Exception as e:
+            logger.debug(f"Error checking kiosk process: {e}")
+
+    def ensure_kiosk_script(self) -> str:
+        """Returns the path to the kiosk lock script, writing it only if its content differs."""
+        script_path = self.agent_dir / "src" / "kiosk.py"
+        try:
+            signature = self._file_signature(script_path)
+            if signature is not None and signature == self._script_signature:
+                return str(script_path)
+            if signature is None or self._file_hash(script_path) != KIOSK_SCRIPT_HASH:
+                os.makedirs(script_path.parent, exist_ok=True)
+                tmp_path = script_path.with_name(script_path.name + ".tmp")
+                with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+                    f.write(KIOSK_SCRIPT)
+                os.replace(tmp_path, script_path)
+                signature = self._file_signature(script_path)
+            self._script_signature = signature
             return str(script_path)
         except Exception as e:
             logger.error(f"Error generating kiosk script: {e}")
             return None
+
+    def ensure_pid_file(self):
+        """
+        Creates kiosk.pid writable by the Users group. The kiosk runs as the
+        logged-in user, who cannot create files in the service's ProgramData
+        directory, only write to ones that grant it access.
+        """
+        try:
+            if not os.path.exists(self.pid_file):
+                os.makedirs(os.path.dirname(self.pid_file), exist_ok=True)
+                open(self.pid_file, "a").close()
+            if sys.platform == "win32":
+                # *S-1-5-32-545 is the built-in Users group SID, works in any language
+                subprocess.run(["icacls", self.pid_file, "/grant", "*S-1-5-32-545:M", "/q"],
+                               capture_output=True, timeout=5, creationflags=0x08000000)
+        except Exception as e:
+            logger.debug(f"Could not prepare kiosk PID file: {e}")
+
+    # ==== Internals ====
+
+    def _adopt(self) -> Optional[psutil.Process]:
+        """The running kiosk named by its PID file, if any."""
+        try:
+            with open(self.pid_file, "r", encoding="utf-8") as f:
+                pid = int(f.read().strip())
+            process = psutil.Process(pid)
+            if self._is_kiosk(process.cmdline()):
+                return process
+        except (OSError, ValueError, psutil.Error):
+            pass
+        return None
+
+    def _scan(self) -> Optional[psutil.Process]:
+        """The running kiosk found in the process list (PID file missing, stale or not writable)."""
+        for p in psutil.process_iter(['name', 'cmdline']):
+            try:
+                if p.info['name'] and 'python' in p.info['name'].lower() and self._is_kiosk(p.info.get('cmdline')):
+                    return p
+            except (psutil.NoSuchProcess, psutil.AccessDenied):
+                pass
+        return None
+
+    @staticmethod
+    def _is_kiosk(cmdline) -> bool:
+        return any('kiosk.py' in arg for arg in cmdline or [])
+
+    def _forget(self):
+        self._process = None
+        self._launches = 0
+        self._retry_at = 0.0
+
+    @staticmethod
+    def _file_signature(path: Path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_ino, st.st_size, st.st_mtime_ns)
+
+    @staticmethod
+    def _file_hash(path: Path) -> str:
+        with open(path, "rb") as f:
+            return hashlib.sha256(f.read()).hexdigest()
+
+    def _launch(self, script_path: str):
+        python_exe = sys.executable.replace('python.exe', 'pythonw.exe')
+        if not os.path.exists(python_exe):
+            python_exe = sys.executable
+
+        ps_script = f'''
+$cs = Get-WmiObject -Class Win32_ComputerSystem
+$user = $cs.UserName
+if (-not $user) {{ exit 1 }}
+if ($user -match '^(.+)\\\\(.+)$') {{
+    $domain = $matches[1]
+    $username = $matches[2]
+}} else {{
+    $domain = $env:COMPUTERNAME
+    $username = $user
+}}
+$taskName = "IFLabKiosk_" + [System.Guid]::NewGuid().ToString("N").Substring(0,8)
+cmd /c "schtasks /Create /TN `"$taskName`" /TR `"{python_exe} `"{script_path}`"`" /SC ONCE /ST 23:59 /F /RU `"$domain\\$username`" /RL HIGHEST" 2>&1 | Out-Null
+cmd /c "schtasks /Run /TN `"$taskName`"" 2>&1 | Out-Null
+Start-Sleep -Milliseconds 800
+cmd /c "schtasks /Delete /TN `"$taskName`" /F" 2>&1 | Out-Null
+exit 0
+'''
+        try:
+            subprocess.run(
+                ['powershell.exe', '-ExecutionPolicy', 'Bypass', '-NoProfile', '-WindowStyle', 'Hidden', '-Command', ps_script],
+                capture_output=True, timeout=15
+            )
+        except Exception as e:
+            logger.error(f"Failed to launch kiosk task: {e}")
@@ -0,0 +1,106 @@
+import subprocess
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def parse_picture_uri(text: str) -> Optional[str]:
+    """"'file:///usr/share/a.png'" (gsettings output) -> '/usr/share/a.png'."""
+    value = (text or "").strip().strip("'\"")
+    if not value:
+        return None
+    if value.startswith("file://"):
+        return value[7:]
+    return value
+
+
+class ProbeCache:
+    """
+    Memoized environment facts (service context, current wallpaper...). A
+    value is kept forever when stored without ttl, otherwise until ttl seconds
+    pass or it is invalidated/overwritten by whoever watches it change.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._values: Dict[str, Tuple[Any, Optional[float]]] = {}
+
+    def get(self, name: str, probe: Callable[[], Any], ttl: Optional[float] = None) -> Any:
+        with self._lock:
+            cached = self._values.get(name)
+            if cached is not None and (cached[1] is None or self._clock() < cached[1]):
+                return cached[0]
+        value = probe()
+        self.set(name, value, ttl)
+        return value
+
+    def set(self, name: str, value: Any, ttl: Optional[float] = None):
+        with self._lock:
+            self._values[name] = (value, None if ttl is None else self._clock() + ttl)
+
+    def invalidate(self, name: str = None):
+        with self._lock:
+            if name is None:
+                self._values.clear()
+            else:
+                self._values.pop(name, None)
+
+
+class GsettingsMonitor:
+    """
+    One long-lived `gsettings monitor <schema> <key>` process whose output
+    lines ("key: 'value'") are passed to on_change. Replaces spawning
+    `gsettings get` on every check; alive turns False if the monitor cannot
+    run (no gsettings, no session bus), so callers can fall back to polling.
+    """
+
+    def __init__(self, schema: str, key: str, on_change: Callable[[str], None],
+                 on_exit: Callable[[], None] = None, popen: Callable[..., Any] = None):
+        self.schema = schema
+        self.key = key
+        self.on_change = on_change
+        self.on_exit = on_exit
+        self._popen = popen or subprocess.Popen
+        self._process = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def alive(self) -> bool:
+        return self._process is not None and self._process.poll() is None
+
+    def start(self) -> bool:
+        try:
+            self._process = self._popen(
+                ["gsettings", "monitor", self.schema, self.key],
+                stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, stdin=subprocess.DEVNULL, text=True,
+            )
+        except OSError as e:
+            logger.debug("Cannot start gsettings monitor: %s", e)
+            self._process = None
+            return False
+        self._thread = threading.Thread(target=self._read, name=f"gsettings-monitor-{self.key}", daemon=True)
+        self._thread.start()
+        return True
+
+    def stop(self):
+        if self._process is not None and self._process.poll() is None:
+            self._process.terminate()
+
+    def _read(self):
+        process = self._process
+        for line in process.stdout:
+            _, sep, value = line.partition(":")
+            if sep:
+                try:
+                    self.on_change(value)
+                except Exception as e:
+                    logger.debug("gsettings monitor callback failed: %s", e)
+        process.wait()
+        logger.debug("gsettings monitor for %s exited", self.key)
+        if self.on_exit:
+            self.on_exit()
@@ -4,8 +4,9 @@ import subprocess
 import time
 from pathlib import Path
 from urllib.parse import urlparse
-import requests
 
+from src import config
+from src.http_transport import get_transport
 from src.utils.logger import setup_logger
 
 logger = setup_logger(__name__)
@@ -27,7 +28,8 @@ def download_from_url(url: str, output_path: str, api_key: str = None) -> str:
     try:
         logger.info(f"Downloading from {url}...")
         headers = {"Authorization": f"Bearer {api_key}"} if api_key else {}
-        response = requests.get(url, stream=True, timeout=30, headers=headers)
+        response = get_transport().get(url, stream=True, headers=headers,
+                                       timeout=(config.HTTP_CONNECT_TIMEOUT, config.HTTP_DOWNLOAD_READ_TIMEOUT))
         response.raise_for_status()
         
         # Try to get filename from Content-Disposition header
@@ -1,12 +1,15 @@
 import os
 import subprocess
-import tempfile
 import platform
+import time
 from src import config
 from pathlib import Path
 
 from src.utils.logger import setup_logger
 from src.api_client import ApiClient
+from src.features.wallpaper_cache import WallpaperCache
+from src.features.session_probes import GsettingsMonitor, ProbeCache, parse_picture_uri
+from src.features.wallpaper_transcode import WallpaperVariants, drm_resolution, mss_resolution
 
 logger = setup_logger(__name__)
 
@@ -21,6 +24,12 @@ class WallpaperManager:
         self._cached_lab_wallpaper_url = None
         self._cached_lab_wallpaper_enabled = True
         self._wallpaper_task_checked = False
+        self._wallpaper_cache = WallpaperCache()
+        self._wallpaper_variants = WallpaperVariants(self._wallpaper_cache.directory / "variants")
+        self._last_applied_key = None
+        self._probes = ProbeCache()
+        self._wallpaper_monitor = None
+        self._wallpaper_monitor_retry_at = 0.0
 
     def enforce_lab_wallpaper(self):
         """Verifica o wallpaper padrão do lab no servidor e, se o atual for diferente, aplica o padrão."""
@@ -28,16 +37,23 @@ class WallpaperManager:
             return
             
         try:
-            response = self.api.get("/agent/me")
-            if response.status_code == 200:
-                pc_data = response.json()
-                lab_data = pc_data.get('lab')
-                if lab_data:
-                    self._cached_lab_wallpaper_url = lab_data.get('default_wallpaper_url')
-                    self._cached_lab_wallpaper_enabled = lab_data.get('default_wallpaper_enabled', True)
+            self.update_lab_settings(self.api.get_cached("/agent/me"))
         except Exception as e:
             logger.debug(f"Failed to sync lab wallpaper info: {e}")
 
+        self.apply_lab_wallpaper()
+
+    def update_lab_settings(self, response):
+        """Atualiza as configurações de wallpaper do lab a partir da resposta de /agent/me."""
+        if response.status_code == 200:
+            pc_data = response.json()
+            lab_data = pc_data.get('lab')
+            if lab_data:
+                self._cached_lab_wallpaper_url = lab_data.get('default_wallpaper_url')
+                self._cached_lab_wallpaper_enabled = lab_data.get('default_wallpaper_enabled', True)
+
+    def apply_lab_wallpaper(self):
+        """Aplica o wallpaper do lab em cache, se habilitado e diferente do atual."""
         if not getattr(self, '_cached_lab_wallpaper_enabled', True):
             return
             
@@ -65,63 +81,107 @@ class WallpaperManager:
                     logger.info(f"Rewrote local wallpaper URL from {old_url} to {url}")
             
         try:
-            current_path = self._get_current_wallpaper_path()
-            local_path = self._download_wallpaper(url)
-            if not local_path:
+            wallpaper = self._download_wallpaper(url)
+            if not wallpaper:
                 return
-                
-            normalized_current = (current_path or "").replace("\\", "/").rstrip("/")
-            normalized_local = local_path.replace("\\", "/").rstrip("/")
-            
-            if self._is_windows_service():
-                if getattr(self, '_last_applied_url', None) == url:
+            image_path = self._wallpaper_variant(wallpaper)
+            # Source and variant files are named after their content (and resolution)
+            applied_key = os.path.basename(image_path)
+
+            if self._is_windows_service() or self._is_linux_service():
+                # A service cannot see the session's wallpaper; it only hands over new images
+                if self._last_applied_key == applied_key:
                     return
             else:
+                current_path = self._get_current_wallpaper_path()
+                normalized_current = (current_path or "").replace("\\", "/").rstrip("/")
+                normalized_local = image_path.replace("\\", "/").rstrip("/")
                 if normalized_current and normalized_current == normalized_local:
+                    self._last_applied_key = applied_key
                     return
-                
-            final_path = self._set_wallpaper(local_path)
+
+            final_path = self._set_wallpaper(image_path)
             if final_path:
-                self._last_applied_url = url
+                self._last_applied_key = applied_key
                 logger.info("Lab default wallpaper applied: %s", final_path)
         except Exception as e:
             logger.debug("Lab wallpaper enforcement skipped or failed: %s", e)
 
-    def _download_wallpaper(self, url: str) -> str:
-        """Baixa imagem da URL para um arquivo local. Retorna path absoluto ou None em erro."""
+    def _download_wallpaper(self, url: str):
+        """Obtém a imagem da URL pelo cache local (GET condicional). Retorna WallpaperFile ou None em erro."""
         try:
-            cache_dir = Path(tempfile.gettempdir()) / "iflab_agent_wallpaper"
-            cache_dir.mkdir(parents=True, exist_ok=True)
-            ext = "jpg"
-            if "." in url.split("?")[0]:
-                ext = url.split("?")[0].rsplit(".", 1)[-1].lower()
-                if ext not in ("jpg", "jpeg", "png", "gif", "webp"):
-                    ext = "jpg"
-            file_path = cache_dir / f"lab_wallpaper.{ext}"
-            r = self.api.session.get(url, stream=True, timeout=30)
-            r.raise_for_status()
-            with open(file_path, "wb") as f:
-                for chunk in r.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            return str(file_path.resolve())
+            return self._wallpaper_cache.fetch(url, self.api.session)
         except Exception as e:
             logger.warning("Failed to download lab wallpaper from %s: %s", url, e)
             return None
 
+    def _wallpaper_variant(self, wallpaper):
+        """Caminho da imagem a aplicar: variante redimensionada para a tela, ou o original se não precisar."""
+        try:
+            return self._wallpaper_variants.variant(wallpaper.path, wallpaper.sha256, self._screen_resolution())
+        except Exception as e:
+            logger.warning("Failed to transcode lab wallpaper, using the original: %s", e)
+            return wallpaper.path
+
+    def _screen_resolution(self):
+        return self._probes.get("screen_resolution", self._probe_screen_resolution,
+                                ttl=config.WALLPAPER_RESOLUTION_TTL)
+
+    def _probe_screen_resolution(self):
+        if platform.system() == "Linux":
+            resolution = drm_resolution()
+            if resolution:
+                return resolution
+        if self._is_windows_service():
+            # Session 0 has no real display; the wallpaper is only capped at WALLPAPER_MAX_RESOLUTION
+            return None
+        return mss_resolution()
+
     def _get_current_wallpaper_path(self):
-        """Retorna o caminho/URI do wallpaper atual do SO, ou None."""
+        """Retorna o caminho/URI do wallpaper atual do SO, ou None. No Linux o valor vem do cache de probes."""
+        if platform.system() == "Windows":
+            # In-process registry read: cheap enough not to cache
+            return self._read_current_wallpaper()
+        self._ensure_wallpaper_monitor()
+        return self._probes.get("current_wallpaper", self._read_current_wallpaper,
+                                ttl=self._current_wallpaper_ttl())
+
+    def _current_wallpaper_ttl(self):
+        # With a live monitor the cached value is replaced on every change; otherwise re-read periodically
+        if self._wallpaper_monitor is not None and self._wallpaper_monitor.alive:
+            return None
+        return config.WALLPAPER_PROBE_TTL
+
+    def _ensure_wallpaper_monitor(self):
+        # Without a session bus GSettings falls back to a memory backend and the monitor would never
+        # fire; such processes (e.g. the root service) re-read every WALLPAPER_PROBE_TTL instead
+        if not os.environ.get("DBUS_SESSION_BUS_ADDRESS"):
+            return
+        monitor = self._wallpaper_monitor
+        if monitor is not None and (monitor.alive or time.monotonic() < self._wallpaper_monitor_retry_at):
+            return
+        if monitor is None:
+            monitor = self._wallpaper_monitor = GsettingsMonitor(
+                "org.gnome.desktop.background", "picture-uri",
+                on_change=lambda value: self._probes.set("current_wallpaper", parse_picture_uri(value)),
+                on_exit=lambda: self._probes.invalidate("current_wallpaper"),
+            )
+        else:
+            logger.debug("gsettings monitor is not running, restarting it")
+        # A monitor that keeps dying is restarted at most this often
+        self._wallpaper_monitor_retry_at = time.monotonic() + config.WALLPAPER_MONITOR_RESTART_INTERVAL
+        monitor.start()
+
+    def _read_current_wallpaper(self):
         try:
             if platform.system() == "Windows":
-                ps_script = r"Get-ItemProperty -Path 'HKCU:\Control Panel\Desktop' -Name Wallpaper -ErrorAction SilentlyContinue | Select-Object -ExpandProperty Wallpaper"
-                result = run_silent(
-                    ["powershell.exe", "-ExecutionPolicy", "Bypass", "-NoProfile", "-Command", ps_script],
-                    capture_output=True,
-                    text=True,
-                    timeout=10,
-                )
-                if result.returncode == 0 and result.stdout and result.stdout.strip():
-                    return result.stdout.strip()
-                return None
+                import winreg
+                try:
+                    with winreg.OpenKey(winreg.HKEY_CURRENT_USER, r"Control Panel\Desktop") as key:
+                        value, _ = winreg.QueryValueEx(key, "Wallpaper")
+                except FileNotFoundError:
+                    return None
+                return (value or "").strip() or None
             else:
                 result = run_silent(
                     ["gsettings", "get", "org.gnome.desktop.background", "picture-uri"],
@@ -130,10 +190,7 @@ class WallpaperManager:
                     timeout=5,
                 )
                 if result.returncode == 0 and result.stdout and result.stdout.strip():
-                    uri = result.stdout.strip().strip("'\"")
-                    if uri.startswith("file://"):
-                        return uri[7:]
-                    return uri
+                    return parse_picture_uri(result.stdout)
                 return None
         except Exception as e:
             logger.debug("Could not get current wallpaper path: %s", e)
@@ -147,25 +204,23 @@ class WallpaperManager:
                 logger.warning("Wallpaper file does not exist, skipping: %s", abs_path)
                 return None
                 
+            if self._is_windows_service() or self._is_linux_service():
+                # A service has no desktop session: hand the image over to the session-side applier
+                logger.info("Wallpaper: running as service, using shared dir and notification")
+                dest_path = self._copy_wallpaper_to_shared_dir(abs_path)
+                if not dest_path:
+                    return None
+                if not self._write_pending_wallpaper(dest_path):
+                    return None
+
+                if platform.system() == "Windows":
+                    self._ensure_wallpaper_script()
+                    self._run_wallpaper_task()
+                # On Linux the session watcher (main.py --watch-wallpaper) applies it on write
+
+                return dest_path
+
             if platform.system() == "Windows":
-                if self._is_windows_service() or self._is_linux_service():
-                    logger.info("Wallpaper: running as service, using shared dir and notification")
-                    dest_path = self._copy_wallpaper_to_shared_dir(abs_path)
-                    if not dest_path:
-                        return None
-                    if not self._write_pending_wallpaper(dest_path):
-                        return None
-                    
-                    if platform.system() == "Windows":
-                        self._ensure_wallpaper_script()
-                        self._run_wallpaper_task()
-                    else:
-                        # On Linux, the autostart component will pick it up.
-                        # We could also try to notify via DBUS if we find sessions.
-                        pass
-                        
-                    return dest_path
-                    
                 path_escaped = abs_path.replace("'", "''")
                 ps_script = f'''
 $path = '{path_escaped}'
@@ -203,6 +258,7 @@ if ($ret -eq 0) {{ throw "SystemParametersInfo failed" }}
                 )
                 if result.returncode != 0:
                     raise RuntimeError(result.stderr or result.stdout or "Unknown error")
+                self._probes.set("current_wallpaper", abs_path, ttl=self._current_wallpaper_ttl())
                 return abs_path
         except Exception as e:
             logger.warning("Failed to set wallpaper: %s", e)
@@ -213,6 +269,17 @@ if ($ret -eq 0) {{ throw "SystemParametersInfo failed" }}
     def _is_windows_service(self):
         if platform.system() != "Windows":
             return False
+        # The session a process runs in never changes
+        return self._probes.get("windows_service", self._probe_windows_service)
+
+    def _probe_windows_service(self):
+        try:
+            import ctypes
+            session_id = ctypes.c_ulong()
+            if ctypes.windll.kernel32.ProcessIdToSessionId(os.getpid(), ctypes.byref(session_id)):
+                return session_id.value == 0
+        except Exception as e:
+            logger.debug("ProcessIdToSessionId failed, asking PowerShell: %s", e)
         try:
             ps_script = "(Get-Process -Id $PID).SessionId -eq 0"
             result = run_silent(
@@ -226,6 +293,9 @@ if ($ret -eq 0) {{ throw "SystemParametersInfo failed" }}
     def _is_linux_service(self):
         if platform.system() != "Linux":
             return False
+        return self._probes.get("linux_service", self._probe_linux_service)
+
+    def _probe_linux_service(self):
         # If UID is 0 (root) or it's running as a service user (like iflab), 
         # it likely doesn't have a DISPLAY/DBUS_SESSION_BUS_ADDRESS
         return os.getuid() == 0 or os.environ.get("USER") == "iflab"
@@ -281,8 +351,11 @@ if ($ret -eq 0) {{ throw "SystemParametersInfo failed" }}
             dest_dir = self._wallpaper_shared_dir()
             dest_dir.mkdir(parents=True, exist_ok=True)
             pending_file = dest_dir / "pending_wallpaper.txt"
-            pending_file.write_text(abs_path, encoding="utf-8")
-            self._grant_users_read(str(pending_file))
+            # Written aside and renamed in, so session watchers never read a half-written path
+            tmp_file = dest_dir / "pending_wallpaper.txt.tmp"
+            tmp_file.write_text(abs_path, encoding="utf-8")
+            self._grant_users_read(str(tmp_file))
+            os.replace(tmp_file, pending_file)
             return True
         except Exception as e:
             logger.warning("Failed to write pending wallpaper path: %s", e)
@@ -307,6 +380,15 @@ if ($ret -eq 0) {{ throw "SystemParametersInfo failed" }}
             logger.error("Failed to apply pending wallpaper: %s", e)
             return False
 
+    def watch_pending(self):
+        """Aplica cada wallpaper pendente assim que o serviço o grava (processo de longa duração na sessão)."""
+        from src.features.wallpaper_watcher import PendingWallpaperWatcher
+        watcher = PendingWallpaperWatcher(self._wallpaper_shared_dir(), self.apply_from_pending)
+        try:
+            watcher.run()
+        except KeyboardInterrupt:
+            watcher.stop()
+
     def _set_wallpaper_direct(self, abs_path):
         """Internal helper to set wallpaper without checking if service."""
         path_escaped = abs_path.replace("'", "''")
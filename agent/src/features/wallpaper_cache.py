@@ -0,0 +1,171 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from src import config
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+IMAGE_EXTENSIONS = ("jpg", "jpeg", "png", "gif", "webp")
+INDEX_FILE = "index.json"
+
+
+def url_extension(url: str) -> str:
+    path = url.split("?")[0]
+    if "." in path:
+        ext = path.rsplit(".", 1)[-1].lower()
+        if ext in IMAGE_EXTENSIONS:
+            return ext
+    return "jpg"
+
+
+class WallpaperFile:
+    """A cached image: absolute path plus the sha256 of its content."""
+
+    def __init__(self, path: str, sha256: str, changed: bool):
+        self.path = path
+        self.sha256 = sha256
+        # True when this fetch produced content different from the previous one for the URL
+        self.changed = changed
+
+
+class WallpaperCache:
+    """
+    Content-addressed store for downloaded wallpapers. Files are named after
+    the sha256 of their content and written via a temp file + os.replace, so a
+    reader never sees a partial image. Each URL remembers its ETag /
+    Last-Modified and is revalidated with a conditional GET at most every
+    revalidate_interval seconds; a 304 costs no body transfer. Only the keep
+    most recently used versions stay on disk.
+    """
+
+    def __init__(self, directory: Path = None, keep: int = None, revalidate_interval: float = None,
+                 clock: Callable[[], float] = time.monotonic):
+        self.directory = Path(directory) if directory else Path(tempfile.gettempdir()) / "iflab_agent_wallpaper"
+        self.keep = keep if keep is not None else config.WALLPAPER_CACHE_KEEP
+        self.revalidate_interval = (revalidate_interval if revalidate_interval is not None
+                                    else config.WALLPAPER_REVALIDATE_INTERVAL)
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._checked_at: Dict[str, float] = {}
+        self._index: Optional[Dict[str, Dict[str, str]]] = None
+
+    def fetch(self, url: str, session, timeout=None) -> Optional[WallpaperFile]:
+        """Path of the current image for url, downloading it only if it changed."""
+        with self._lock:
+            self.directory.mkdir(parents=True, exist_ok=True)
+            index = self._load_index()
+            entry = index.get(url)
+            cached = self._path(entry) if entry else None
+            if cached is not None and not cached.exists():
+                entry, cached = None, None
+
+            now = self._clock()
+            checked_at = self._checked_at.get(url)
+            if cached is not None and checked_at is not None and now - checked_at < self.revalidate_interval:
+                return WallpaperFile(str(cached), entry["sha256"], changed=False)
+
+            headers = {}
+            if cached is not None:
+                if entry.get("etag"):
+                    headers["If-None-Match"] = entry["etag"]
+                if entry.get("last_modified"):
+                    headers["If-Modified-Since"] = entry["last_modified"]
+
+            r = session.get(url, stream=True, headers=headers,
+                            timeout=timeout or (config.HTTP_CONNECT_TIMEOUT, config.REQUEST_TIMEOUT))
+            try:
+                if r.status_code == 304 and cached is not None:
+                    self._checked_at[url] = now
+                    os.utime(cached)
+                    return WallpaperFile(str(cached), entry["sha256"], changed=False)
+                r.raise_for_status()
+                sha256, path = self._store(r, url_extension(url))
+            finally:
+                r.close()
+
+            previous = entry["sha256"] if entry else None
+            index[url] = {
+                "sha256": sha256,
+                "file": path.name,
+                "etag": r.headers.get("ETag"),
+                "last_modified": r.headers.get("Last-Modified"),
+            }
+            self._checked_at[url] = now
+            self._save_index(index)
+            self._evict(index)
+            return WallpaperFile(str(path), sha256, changed=sha256 != previous)
+
+    # ==== Internals ====
+
+    def _path(self, entry: Dict[str, str]) -> Path:
+        return (self.directory / entry["file"]).resolve()
+
+    def _store(self, response, ext: str):
+        """Stream the body to a temp file while hashing it, then move it to <sha256>.<ext>."""
+        digest = hashlib.sha256()
+        fd, tmp_name = tempfile.mkstemp(prefix=".download-", dir=self.directory)
+        try:
+            with os.fdopen(fd, "wb") as f:
+                for chunk in response.iter_content(chunk_size=65536):
+                    digest.update(chunk)
+                    f.write(chunk)
+            sha256 = digest.hexdigest()
+            path = (self.directory / f"{sha256}.{ext}").resolve()
+            if path.exists():
+                # Same content under a new URL/ETag: keep the existing file (and its path)
+                os.unlink(tmp_name)
+                os.utime(path)
+            else:
+                # mkstemp creates 0600; the desktop session may not be the agent's user
+                os.chmod(tmp_name, 0o644)
+                os.replace(tmp_name, path)
+            return sha256, path
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+
+    def _evict(self, index: Dict[str, Dict[str, str]]):
+        images = sorted(
+            (p for p in self.directory.iterdir() if p.suffix.lstrip(".") in IMAGE_EXTENSIONS),
+            key=lambda p: p.stat().st_mtime,
+            reverse=True,
+        )
+        for stale in images[self.keep:]:
+            try:
+                stale.unlink()
+            except OSError as e:
+                logger.debug("Could not evict cached wallpaper %s: %s", stale, e)
+        kept = {p.name for p in images[:self.keep]}
+        dropped = [url for url, entry in index.items() if entry["file"] not in kept]
+        for url in dropped:
+            del index[url]
+            self._checked_at.pop(url, None)
+        if dropped:
+            self._save_index(index)
+
+    def _load_index(self) -> Dict[str, Dict[str, str]]:
+        if self._index is None:
+            try:
+                with open(self.directory / INDEX_FILE, "r", encoding="utf-8") as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _save_index(self, index: Dict[str, Dict[str, str]]):
+        path = self.directory / INDEX_FILE
+        tmp_path = path.with_name(path.name + ".tmp")
+        try:
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(index, f)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            logger.debug("Could not save wallpaper cache index: %s", e)
@@ -0,0 +1,161 @@
+import os
+import tempfile
+from pathlib import Path
+from typing import Optional, Tuple
+
+from src import config
+from src.utils.logger import setup_logger
+
+try:
+    from PIL import Image, ImageOps
+    HAS_PILLOW = True
+except ImportError:
+    HAS_PILLOW = False
+
+try:
+    import mss
+    HAS_MSS = True
+except ImportError:
+    HAS_MSS = False
+
+logger = setup_logger(__name__)
+
+DRM_ROOT = '/sys/class/drm'
+EXIF_ORIENTATION = 0x0112
+
+# Pillow format -> file extension of the variant
+VARIANT_EXTENSIONS = {'JPEG': 'jpg', 'PNG': 'png', 'WEBP': 'webp'}
+
+
+def drm_resolution(root: str = DRM_ROOT) -> Optional[Tuple[int, int]]:
+    """Largest preferred mode of the connected outputs, from sysfs (works without a display session)."""
+    best = None
+    try:
+        connectors = sorted(os.listdir(root))
+    except OSError:
+        return None
+    for name in connectors:
+        try:
+            with open(os.path.join(root, name, 'status')) as f:
+                if f.read().strip() != 'connected':
+                    continue
+            with open(os.path.join(root, name, 'modes')) as f:
+                mode = f.readline().strip()
+        except OSError:
+            continue
+        width, sep, height = mode.partition('x')
+        if sep and width.isdigit() and height.rstrip('i').isdigit():
+            size = (int(width), int(height.rstrip('i')))
+            if best is None or size[0] * size[1] > best[0] * best[1]:
+                best = size
+    return best
+
+
+def mss_resolution() -> Optional[Tuple[int, int]]:
+    """Largest monitor of the current display session."""
+    if not HAS_MSS:
+        return None
+    try:
+        with mss.mss() as sct:
+            monitors = sct.monitors[1:] or sct.monitors[:1]
+            widest = max(monitors, key=lambda m: m['width'] * m['height'])
+            return widest['width'], widest['height']
+    except Exception as e:
+        logger.debug("Could not read monitor geometry: %s", e)
+        return None
+
+
+def target_size(source: Tuple[int, int], screen: Tuple[int, int]) -> Tuple[int, int]:
+    """Smallest size that still covers the screen with the source aspect ratio; never upscales."""
+    scale = max(screen[0] / source[0], screen[1] / source[1])
+    if scale >= 1:
+        return source
+    return max(1, round(source[0] * scale)), max(1, round(source[1] * scale))
+
+
+def transcode(source_path: str, dest_path: str, screen: Tuple[int, int], fmt: str = None,
+              quality: int = None) -> Tuple[int, int]:
+    """Decode, orient, resize to cover screen and re-encode source_path. Returns the output size."""
+    fmt = fmt or config.WALLPAPER_VARIANT_FORMAT
+    quality = quality or config.WALLPAPER_VARIANT_QUALITY
+    with Image.open(source_path) as img:
+        # JPEG can decode straight at 1/2, 1/4 or 1/8 scale: far less work than a full decode + resize.
+        # Not for rotated photos, whose target is computed on the transposed size.
+        if img.getexif().get(EXIF_ORIENTATION, 1) in (1, 2, 3, 4):
+            img.draft('RGB', target_size(img.size, screen))
+        img = ImageOps.exif_transpose(img)
+        if fmt == 'JPEG' and img.mode != 'RGB':
+            img = img.convert('RGB')
+        size = target_size(img.size, screen)
+        if size != img.size:
+            img = img.resize(size, Image.Resampling.LANCZOS)
+        options = {'quality': quality, 'optimize': True}
+        if fmt == 'JPEG':
+            options['progressive'] = True
+        img.save(dest_path, format=fmt, **options)
+        return img.size
+
+
+class WallpaperVariants:
+    """
+    Screen-sized copies of cached wallpapers, one file per (content hash,
+    resolution, format). A lab with mixed monitors downloads the source once
+    and each machine decodes only what its screen needs. Sources that already
+    fit the screen are used as they are.
+    """
+
+    def __init__(self, directory: Path, keep: int = None, fmt: str = None):
+        self.directory = Path(directory)
+        self.keep = keep if keep is not None else config.WALLPAPER_VARIANT_KEEP
+        self.fmt = (fmt or config.WALLPAPER_VARIANT_FORMAT).upper()
+        # (sha256, screen) pairs whose source is used as is, so it is not reopened every pass
+        self._passthrough = set()
+
+    def variant(self, source_path: str, sha256: str, screen: Optional[Tuple[int, int]]) -> str:
+        """Path of the image to apply for this screen (the source itself if no variant is needed)."""
+        if not HAS_PILLOW:
+            return source_path
+        screen = screen or tuple(config.WALLPAPER_MAX_RESOLUTION)
+        if (sha256, screen) in self._passthrough:
+            return source_path
+        ext = VARIANT_EXTENSIONS.get(self.fmt, 'jpg')
+        path = self.directory / f"{sha256}-{screen[0]}x{screen[1]}.{ext}"
+        if path.exists():
+            os.utime(path)
+            return str(path.resolve())
+
+        with Image.open(source_path) as img:
+            upright = img.getexif().get(EXIF_ORIENTATION, 1) == 1
+            if upright and target_size(img.size, screen) == img.size:
+                self._passthrough.add((sha256, screen))
+                return source_path
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(prefix='.variant-', suffix=f'.{ext}', dir=self.directory)
+        os.close(fd)
+        try:
+            size = transcode(source_path, tmp_name, screen, fmt=self.fmt)
+            os.chmod(tmp_name, 0o644)
+            os.replace(tmp_name, path)
+        except BaseException:
+            if os.path.exists(tmp_name):
+                os.unlink(tmp_name)
+            raise
+        logger.info("Wallpaper variant %sx%s created (%d -> %d bytes)", size[0], size[1],
+                    os.path.getsize(source_path), os.path.getsize(path))
+        self._evict()
+        return str(path.resolve())
+
+    # ==== Internals ====
+
+    def _evict(self):
+        variants = sorted(
+            (p for p in self.directory.iterdir() if not p.name.startswith('.')),
+            key=lambda p: p.stat().st_mtime,
+            reverse=True,
+        )
+        for stale in variants[self.keep:]:
+            try:
+                stale.unlink()
+            except OSError as e:
+                logger.debug("Could not evict wallpaper variant %s: %s", stale, e)
@@ -0,0 +1,167 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import threading
+import time
+from pathlib import Path
+from typing import Callable, List, Optional, Tuple
+
+from src import config
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+PENDING_FILE = "pending_wallpaper.txt"
+
+# <sys/inotify.h>
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_IGNORED = 0x00008000
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, len
+
+
+class Inotify:
+    """Minimal ctypes binding: watch one directory for files written or moved into it."""
+
+    def __init__(self, directory: str, mask: int = IN_CLOSE_WRITE | IN_MOVED_TO):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available")
+        self._fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        if libc.inotify_add_watch(self._fd, os.fsencode(directory), mask) < 0:
+            errno = ctypes.get_errno()
+            os.close(self._fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+        # Set when the watched directory goes away or events were lost
+        self.broken = False
+
+    def read(self, timeout: float) -> List[str]:
+        """Names of the files touched, waiting up to timeout seconds for the first event."""
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        names, offset = [], 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            _, mask, _, length = _EVENT_HEADER.unpack_from(data, offset)
+            offset += _EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0").decode("utf-8", "replace")
+            offset += length
+            if mask & (IN_IGNORED | IN_Q_OVERFLOW):
+                self.broken = True
+            elif name:
+                names.append(name)
+        return names
+
+    def close(self):
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+class PendingWallpaperWatcher:
+    """
+    Long-lived user-session applier: applies pending_wallpaper.txt as soon as
+    the service rewrites it. Uses inotify on the shared directory when it can;
+    otherwise (other OS, NFS home, directory missing) it polls the file's
+    stat signature every poll_interval seconds. With inotify a slow rescan
+    still runs every rescan_interval in case an event was lost. A failed apply
+    (e.g. at login, before the desktop is ready) is retried with a backoff
+    starting at retry_interval.
+    """
+
+    def __init__(self, directory: Path, apply: Callable[[], bool], poll_interval: float = None,
+                 rescan_interval: float = None, use_inotify: bool = True, retry_interval: float = None):
+        self.directory = Path(directory)
+        self.pending_file = self.directory / PENDING_FILE
+        self.apply = apply
+        self.poll_interval = poll_interval if poll_interval is not None else config.WALLPAPER_WATCH_POLL_INTERVAL
+        self.rescan_interval = (rescan_interval if rescan_interval is not None
+                                else config.WALLPAPER_WATCH_RESCAN_INTERVAL)
+        self.use_inotify = use_inotify
+        self.retry_interval = retry_interval if retry_interval is not None else config.WALLPAPER_WATCH_RETRY_INTERVAL
+        self._stop = threading.Event()
+        self._inotify: Optional[Inotify] = None
+        self._watch_retry_at = 0.0
+        self._applied_signature: Optional[Tuple[int, int, int]] = None
+        self._failed_signature: Optional[Tuple[int, int, int]] = None
+        self._failures = 0
+        self._retry_at = 0.0
+
+    def stop(self):
+        self._stop.set()
+
+    def check(self) -> bool:
+        """Apply the pending wallpaper if the file changed since the last apply."""
+        try:
+            st = os.stat(self.pending_file)
+        except OSError:
+            return False
+        signature = (st.st_ino, st.st_size, st.st_mtime_ns)
+        if signature == self._applied_signature:
+            return False
+        if signature == self._failed_signature and time.monotonic() < self._retry_at:
+            return False
+        if self.apply():
+            self._applied_signature = signature
+            self._failed_signature = None
+            self._failures = 0
+            return True
+        # Not remembered as applied: retried, but not in a tight loop
+        self._failures = self._failures + 1 if signature == self._failed_signature else 1
+        self._failed_signature = signature
+        delay = min(self.retry_interval * (2 ** (self._failures - 1)), config.WALLPAPER_WATCH_MAX_RETRY_INTERVAL)
+        self._retry_at = time.monotonic() + delay
+        logger.debug("Applying the pending wallpaper failed, retrying in %.0fs", delay)
+        return False
+
+    def run(self):
+        self.check()
+        last_scan = time.monotonic()
+        while not self._stop.is_set():
+            inotify = self._watch()
+            if inotify is None:
+                self._stop.wait(self.poll_interval)
+                self.check()
+                continue
+            timeout = min(self.rescan_interval, 1.0)
+            if self._failed_signature is not None:
+                timeout = min(timeout, max(0.0, self._retry_at - time.monotonic()))
+            names = inotify.read(timeout=timeout)
+            retry_due = self._failed_signature is not None and time.monotonic() >= self._retry_at
+            if PENDING_FILE in names or retry_due or time.monotonic() - last_scan >= self.rescan_interval:
+                self.check()
+                last_scan = time.monotonic()
+            if inotify.broken:
+                logger.debug("inotify watch on %s lost, re-arming", self.directory)
+                self._close_watch()
+                self.check()
+        self._close_watch()
+
+    # ==== Internals ====
+
+    def _watch(self) -> Optional[Inotify]:
+        if self._inotify is None and self.use_inotify and time.monotonic() >= self._watch_retry_at:
+            try:
+                self._inotify = Inotify(str(self.directory))
+            except (OSError, AttributeError) as e:
+                # The directory may be created later: try again after a rescan interval
+                self._watch_retry_at = time.monotonic() + self.rescan_interval
+                logger.debug("inotify unavailable for %s, polling every %ss: %s",
+                             self.directory, self.poll_interval, e)
+        return self._inotify
+
+    def _close_watch(self):
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
@@ -0,0 +1,286 @@
+import os
+import socket
+import ssl
+import threading
+from typing import Any, Dict, Optional
+
+import requests
+from requests.adapters import BaseAdapter, HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from src import config
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+
+def _keepalive_socket_options() -> list:
+    """TCP keep-alive probes so idle pooled (and long-poll) connections survive NAT/firewalls."""
+    options = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    idle = config.HTTP_KEEPALIVE_IDLE
+    if hasattr(socket, 'TCP_KEEPIDLE'):
+        options += [
+            (socket.IPPROTO_TCP, socket.TCP_KEEPIDLE, idle),
+            (socket.IPPROTO_TCP, socket.TCP_KEEPINTVL, max(1, idle // 3)),
+            (socket.IPPROTO_TCP, socket.TCP_KEEPCNT, 3),
+        ]
+    elif hasattr(socket, 'TCP_KEEPALIVE'):  # macOS
+        options.append((socket.IPPROTO_TCP, socket.TCP_KEEPALIVE, idle))
+    return options
+
+
+class TransportStats:
+    """Request and connection counters; reused = requests served on an already open connection."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.connections = 0
+
+    def request_sent(self):
+        with self._lock:
+            self.requests += 1
+
+    def connection_opened(self):
+        with self._lock:
+            self.connections += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            reused = max(0, self.requests - self.connections)
+            return {
+                'requests': self.requests,
+                'connections_opened': self.connections,
+                'connections_reused': reused,
+                'reuse_ratio': round(reused / self.requests, 3) if self.requests else None,
+            }
+
+
+class PooledAdapter(HTTPAdapter):
+    """HTTP/1.1 keep-alive adapter shared by every session; counts new connections."""
+
+    def __init__(self, stats: TransportStats, pool_connections: int, pool_maxsize: int):
+        self.stats = stats
+        super().__init__(pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+
+    def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+        pool_kwargs.setdefault('socket_options', HTTPConnectionPool.ConnectionCls.default_socket_options
+                               + _keepalive_socket_options())
+        super().init_poolmanager(connections, maxsize, block=block, **pool_kwargs)
+        stats = self.stats
+
+        class CountingHTTPConnectionPool(HTTPConnectionPool):
+            def _new_conn(self):
+                stats.connection_opened()
+                return super()._new_conn()
+
+        class CountingHTTPSConnectionPool(HTTPSConnectionPool):
+            def _new_conn(self):
+                stats.connection_opened()
+                return super()._new_conn()
+
+        self.poolmanager.pool_classes_by_scheme = {
+            'http': CountingHTTPConnectionPool,
+            'https': CountingHTTPSConnectionPool,
+        }
+
+    def send(self, request, **kwargs):
+        self.stats.request_sent()
+        return super().send(request, **kwargs)
+
+    def close(self):
+        # Sessions come and go; the pools belong to the transport
+        pass
+
+    def shutdown(self):
+        super().close()
+
+
+def _requests_error(httpx, error: Exception, request) -> requests.exceptions.RequestException:
+    """The requests exception callers already handle for an httpx failure."""
+    if isinstance(error, httpx.ConnectTimeout):
+        return requests.exceptions.ConnectTimeout(error, request=request)
+    if isinstance(error, httpx.TimeoutException):
+        return requests.exceptions.ReadTimeout(error, request=request)
+    return requests.exceptions.ConnectionError(error, request=request)
+
+
+def _ssl_context(verify, cert) -> ssl.SSLContext:
+    """TLS context for requests' verify/cert arguments (CA bundle path or directory, client cert)."""
+    if isinstance(verify, str):
+        if os.path.isdir(verify):
+            context = ssl.create_default_context(capath=verify)
+        else:
+            context = ssl.create_default_context(cafile=verify)
+    else:
+        context = ssl.create_default_context(cafile=requests.certs.where())
+        if not verify:
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+    if cert:
+        if isinstance(cert, (tuple, list)):
+            context.load_cert_chain(cert[0], cert[1])
+        else:
+            context.load_cert_chain(cert)
+    return context
+
+
+class _HttpxRaw:
+    """File-like view of a streamed httpx response, enough for requests' iter_content()."""
+
+    def __init__(self, httpx, response, request):
+        self._httpx = httpx
+        self._response = response
+        self._request = request
+        # Decoded like urllib3 does for the HTTP/1.1 adapter (gzip/deflate/br bodies)
+        self._chunks = response.iter_bytes()
+        self._buffer = b''
+
+    def read(self, amt=None, **kwargs):
+        while amt is None or len(self._buffer) < amt:
+            try:
+                self._buffer += next(self._chunks)
+            except StopIteration:
+                break
+            except self._httpx.HTTPError as e:
+                raise _requests_error(self._httpx, e, self._request) from e
+        if amt is None:
+            data, self._buffer = self._buffer, b''
+        else:
+            data, self._buffer = self._buffer[:amt], self._buffer[amt:]
+        return data
+
+    def close(self):
+        self._response.close()
+
+
+class Http2Adapter(BaseAdapter):
+    """
+    requests adapter backed by httpx clients with HTTP/2 (used only if
+    httpx[http2] is installed). TLS settings are fixed per httpx client, so
+    there is one client per (verify, cert) combination callers use.
+    """
+
+    def __init__(self, stats: TransportStats, pool_maxsize: int):
+        import httpx
+        super().__init__()
+        self.stats = stats
+        self._httpx = httpx
+        self._limits = httpx.Limits(max_connections=pool_maxsize, max_keepalive_connections=pool_maxsize)
+        self._clients: Dict[tuple, Any] = {}
+        self._lock = threading.Lock()
+
+    def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+        self.stats.request_sent()
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+        else:
+            connect = read = timeout
+        client = self._client(verify, cert)
+        try:
+            upstream = client.send(
+                client.build_request(
+                    request.method, request.url, headers=dict(request.headers), content=request.body,
+                    timeout=self._httpx.Timeout(connect=connect, read=read, write=read, pool=connect),
+                ),
+                stream=True,
+            )
+        except self._httpx.HTTPError as e:
+            raise _requests_error(self._httpx, e, request) from e
+        response = requests.Response()
+        response.status_code = upstream.status_code
+        response.headers = requests.structures.CaseInsensitiveDict(upstream.headers)
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers)
+        response.raw = _HttpxRaw(self._httpx, upstream, request)
+        response.reason = upstream.reason_phrase
+        response.url = request.url
+        response.request = request
+        response.connection = self
+        if not stream:
+            response.content
+        return response
+
+    def close(self):
+        pass
+
+    def shutdown(self):
+        with self._lock:
+            clients, self._clients = list(self._clients.values()), {}
+        for client in clients:
+            client.close()
+
+    # ==== Internals ====
+
+    def _client(self, verify, cert):
+        key = (verify, tuple(cert) if isinstance(cert, list) else cert)
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._httpx.Client(http2=True, limits=self._limits, follow_redirects=False,
+                                            verify=_ssl_context(verify, cert))
+                self._clients[key] = client
+            return client
+
+
+class HttpTransport:
+    """
+    Connection pools shared by every network path of the agent (API calls,
+    long-poll, wallpaper, installer and update downloads). Each consumer gets
+    its own Session (so headers such as Authorization never leak between
+    them) with the same adapters mounted, so TCP/TLS connections are reused
+    across all of them.
+    """
+
+    def __init__(self, pool_connections: int = None, pool_maxsize: int = None, http2: bool = None):
+        self.stats = TransportStats()
+        pool_connections = pool_connections or config.HTTP_POOL_CONNECTIONS
+        pool_maxsize = pool_maxsize or config.HTTP_POOL_MAXSIZE
+        self.http_adapter = PooledAdapter(self.stats, pool_connections, pool_maxsize)
+        self.https_adapter = self.http_adapter
+        self.http2 = False
+        if config.HTTP2_ENABLED if http2 is None else http2:
+            try:
+                self.https_adapter = Http2Adapter(self.stats, pool_maxsize)
+                self.http2 = True
+            except ImportError:
+                logger.warning("HTTP/2 requested but httpx[http2] is not installed; using HTTP/1.1 keep-alive")
+
+    @property
+    def default_timeout(self) -> tuple:
+        """(connect, read) timeout used when a caller does not pass one."""
+        return (config.HTTP_CONNECT_TIMEOUT, config.REQUEST_TIMEOUT)
+
+    def session(self, headers: Optional[Dict[str, str]] = None) -> requests.Session:
+        session = requests.Session()
+        session.mount('http://', self.http_adapter)
+        session.mount('https://', self.https_adapter)
+        if headers:
+            session.headers.update(headers)
+        return session
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        """One-off GET through the shared pools (no session state)."""
+        kwargs.setdefault('timeout', self.default_timeout)
+        with self.session() as session:
+            return session.get(url, **kwargs)
+
+    def stats_snapshot(self) -> Dict[str, Any]:
+        return {**self.stats.snapshot(), 'http2': self.http2}
+
+    def close(self):
+        self.http_adapter.shutdown()
+        if self.https_adapter is not self.http_adapter:
+            self.https_adapter.shutdown()
+
+
+_transport: Optional[HttpTransport] = None
+_transport_lock = threading.Lock()
+
+
+def get_transport() -> HttpTransport:
+    """Process-wide transport."""
+    global _transport
+    with _transport_lock:
+        if _transport is None:
+            _transport = HttpTransport()
+        return _transport
@@ -0,0 +1,184 @@
+import json
+import sqlite3
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from src import config
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Kinds that are never evicted by the size/count caps (small and must be delivered)
+PROTECTED_KINDS = ('command_status',)
+
+# sender(kind, entries) -> ids of the entries that were delivered (or rejected for good)
+OutboxSender = Callable[[str, List[Dict[str, Any]]], List[int]]
+
+
+def get_outbox_path() -> Path:
+    """Returns the absolute path of the outbox database, next to the agent identity."""
+    if getattr(sys, 'frozen', False):
+        base_dir = Path(sys.executable).resolve().parent
+    else:
+        base_dir = Path(__file__).resolve().parent.parent
+    return base_dir / config.OUTBOX_FILE
+
+
+class Outbox:
+    """
+    Durable SQLite queue for outbound payloads the backend could not take.
+
+    Entries survive agent restarts and are drained oldest-first in bounded
+    passes; a pass stops at the first failure so an unhealthy backend is not
+    flooded with the whole backlog at once.
+    """
+
+    def __init__(self, path=None, max_items: int = None, max_bytes: int = None, max_age: float = None,
+                 clock=time.time):
+        self.path = Path(path) if path else get_outbox_path()
+        self.max_items = max_items if max_items is not None else config.OUTBOX_MAX_ITEMS
+        self.max_bytes = max_bytes if max_bytes is not None else config.OUTBOX_MAX_BYTES
+        self.max_age = max_age if max_age is not None else config.OUTBOX_MAX_AGE
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._count = 0
+        self._db = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS outbox (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                kind TEXT NOT NULL,
+                method TEXT NOT NULL,
+                endpoint TEXT NOT NULL,
+                body TEXT NOT NULL,
+                compressed INTEGER NOT NULL DEFAULT 0,
+                dedupe_key TEXT UNIQUE,
+                created_at REAL NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0
+            )
+        """)
+        with self._lock:
+            self._prune()
+            self._count = self._db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def __len__(self) -> int:
+        return self._count
+
+    def enqueue(self, kind: str, method: str, endpoint: str, payload: Any,
+                compressed: bool = False, dedupe_key: str = None):
+        """Store a payload. An entry with the same dedupe_key is replaced (only the latest matters)."""
+        body = json.dumps(payload, separators=(',', ':'))
+        with self._lock:
+            self._db.execute("BEGIN")
+            try:
+                if dedupe_key is not None:
+                    self._db.execute("DELETE FROM outbox WHERE dedupe_key = ?", (dedupe_key,))
+                self._db.execute(
+                    "INSERT INTO outbox (kind, method, endpoint, body, compressed, dedupe_key, created_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (kind, method, endpoint, body, int(compressed), dedupe_key, self._clock()),
+                )
+                self._prune()
+                self._db.execute("COMMIT")
+            except Exception:
+                self._db.execute("ROLLBACK")
+                raise
+            self._count = self._db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+        logger.info(f"Payload '{kind}' guardado na outbox ({self._count} pendente(s))")
+
+    def contains(self, dedupe_key: str) -> bool:
+        if not self._count:
+            return False
+        with self._lock:
+            row = self._db.execute("SELECT 1 FROM outbox WHERE dedupe_key = ?", (dedupe_key,)).fetchone()
+        return row is not None
+
+    def peek(self, limit: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT id, kind, method, endpoint, body, compressed, attempts, created_at"
+                " FROM outbox ORDER BY id LIMIT ?", (limit,)
+            ).fetchall()
+        return [
+            {
+                'id': row[0], 'kind': row[1], 'method': row[2], 'endpoint': row[3],
+                'payload': json.loads(row[4]), 'compressed': bool(row[5]),
+                'attempts': row[6], 'created_at': row[7],
+            }
+            for row in rows
+        ]
+
+    def ack(self, ids: List[int]):
+        if not ids:
+            return
+        with self._lock:
+            self._db.executemany("DELETE FROM outbox WHERE id = ?", [(i,) for i in ids])
+            self._count = self._db.execute("SELECT COUNT(*) FROM outbox").fetchone()[0]
+
+    def drain(self, sender: OutboxSender, limit: int = None) -> Tuple[int, bool]:
+        """
+        Deliver up to limit entries, grouping consecutive entries of the same kind.
+        A failed group holds back the rest of its kind (to keep order) but not other
+        kinds. Returns (delivered, ok); ok is False when any group failed.
+        """
+        entries = self.peek(limit if limit is not None else config.OUTBOX_DRAIN_BATCH)
+        delivered = 0
+        groups: List[List[Dict[str, Any]]] = []
+        for entry in entries:
+            if groups and groups[-1][0]['kind'] == entry['kind']:
+                groups[-1].append(entry)
+            else:
+                groups.append([entry])
+
+        failed_kinds = set()
+        for group in groups:
+            kind = group[0]['kind']
+            if kind in failed_kinds:
+                continue
+            try:
+                done = set(sender(kind, group))
+            except Exception as e:
+                logger.warning(f"Falha ao drenar outbox: {e}")
+                done = set()
+            self.ack([e['id'] for e in group if e['id'] in done])
+            delivered += len(done)
+            if len(done) < len(group):
+                with self._lock:
+                    self._db.executemany(
+                        "UPDATE outbox SET attempts = attempts + 1 WHERE id = ?",
+                        [(e['id'],) for e in group if e['id'] not in done],
+                    )
+                failed_kinds.add(kind)
+        return delivered, not failed_kinds
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def _prune(self):
+        """Apply the age, count and size caps (oldest entries go first)."""
+        self._db.execute("DELETE FROM outbox WHERE created_at < ?", (self._clock() - self.max_age,))
+        protected = ",".join("?" * len(PROTECTED_KINDS))
+        count, size = self._db.execute(
+            f"SELECT COUNT(*), COALESCE(SUM(LENGTH(body)), 0) FROM outbox WHERE kind NOT IN ({protected})",
+            PROTECTED_KINDS,
+        ).fetchone()
+        if count <= self.max_items and size <= self.max_bytes:
+            return
+        rows = self._db.execute(
+            f"SELECT id, LENGTH(body) FROM outbox WHERE kind NOT IN ({protected}) ORDER BY id",
+            PROTECTED_KINDS,
+        ).fetchall()
+        evict = []
+        for row_id, length in rows:
+            if count <= self.max_items and size <= self.max_bytes:
+                break
+            evict.append((row_id,))
+            count -= 1
+            size -= length
+        self._db.executemany("DELETE FROM outbox WHERE id = ?", evict)
+        logger.warning(f"Outbox cheia: {len(evict)} entrada(s) antiga(s) descartada(s)")
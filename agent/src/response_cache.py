@@ -0,0 +1,129 @@
+import re
+import threading
+import time
+from typing import Callable, Dict, Optional, Tuple
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+_MAX_AGE = re.compile(r'max-age=(\d+)')
+
+# Cache-Control the backend framework sends by default, i.e. no caching decision at all
+FRAMEWORK_DEFAULT_CACHE_CONTROL = {'no-cache', 'private'}
+
+
+class CachedResponse:
+    """A stored GET response plus what is needed to revalidate it."""
+
+    def __init__(self, status_code: int, headers, content: bytes, url: str, stored_at: float, ttl: float):
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.url = url
+        self.stored_at = stored_at
+        self.ttl = ttl
+
+    @property
+    def etag(self) -> Optional[str]:
+        return self.headers.get('ETag')
+
+    @property
+    def last_modified(self) -> Optional[str]:
+        return self.headers.get('Last-Modified')
+
+    def validators(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers['If-None-Match'] = self.etag
+        if self.last_modified:
+            headers['If-Modified-Since'] = self.last_modified
+        return headers
+
+    def age(self, now: float) -> float:
+        return now - self.stored_at
+
+    def to_response(self, source: str) -> requests.Response:
+        """Rebuild a requests.Response; source is 'fresh', 'stale' or 'revalidated'."""
+        response = requests.Response()
+        response.status_code = self.status_code
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.content
+        response.encoding = requests.utils.get_encoding_from_headers(response.headers) or 'utf-8'
+        response.url = self.url
+        response.from_cache = source
+        return response
+
+
+def cache_ttl(response: requests.Response, default_ttl: float) -> Optional[float]:
+    """Lifetime of a response: Cache-Control max-age wins over the default; None if it must not be stored."""
+    cache_control = response.headers.get('Cache-Control', '').lower()
+    directives = {d.strip() for d in cache_control.split(',') if d.strip()}
+    if 'no-store' in directives:
+        return None
+    match = _MAX_AGE.search(cache_control)
+    if match:
+        return float(match.group(1))
+    # Laravel stamps "no-cache, private" on every response that sets nothing else; only a
+    # no-cache the endpoint chose (alongside other directives) overrides the configured ttl
+    if 'no-cache' in directives and not directives <= FRAMEWORK_DEFAULT_CACHE_CONTROL:
+        return 0.0
+    return default_ttl
+
+
+class ResponseCache:
+    """In-memory store of GET responses keyed by URL and query, with single-flight revalidation."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: Dict[Tuple, CachedResponse] = {}
+        self._revalidating = set()
+
+    @staticmethod
+    def key(url: str, params=None) -> Tuple:
+        return (url, tuple(sorted((params or {}).items())))
+
+    def now(self) -> float:
+        return self._clock()
+
+    def get(self, key: Tuple) -> Optional[CachedResponse]:
+        with self._lock:
+            return self._entries.get(key)
+
+    def store(self, key: Tuple, response: requests.Response, ttl: float):
+        entry = CachedResponse(response.status_code, response.headers, response.content, response.url,
+                               self._clock(), ttl)
+        with self._lock:
+            self._entries[key] = entry
+        return entry
+
+    def refresh(self, key: Tuple, response: requests.Response, ttl: float) -> Optional[CachedResponse]:
+        """A 304 arrived: the stored body is current again (headers may carry new validators)."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                for header in ('ETag', 'Last-Modified', 'Cache-Control'):
+                    if header in response.headers:
+                        entry.headers[header] = response.headers[header]
+                entry.stored_at = self._clock()
+                entry.ttl = ttl
+            return entry
+
+    def invalidate(self, key: Tuple = None):
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def begin_revalidation(self, key: Tuple) -> bool:
+        """True if the caller should revalidate key (nobody else is already doing it)."""
+        with self._lock:
+            if key in self._revalidating:
+                return False
+            self._revalidating.add(key)
+            return True
+
+    def end_revalidation(self, key: Tuple):
+        with self._lock:
+            self._revalidating.discard(key)
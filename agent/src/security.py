@@ -4,11 +4,19 @@ import platform
 import subprocess
 import hashlib
 import json
+import threading
 from pathlib import Path
 from base64 import urlsafe_b64encode
 from cryptography.fernet import Fernet, InvalidToken
 
 def get_hardware_fingerprint():
+    """
+    Fingerprint do hardware, calculada uma única vez por processo.
+    Ver _compute_hardware_fingerprint.
+    """
+    return get_identity().fingerprint()
+
+def _compute_hardware_fingerprint():
     """
     Gera uma string imutável baseada nas características únicas do hardware.
     Usada como entropia para derivar a chave de criptografia local.
@@ -68,8 +76,7 @@ def _get_encryption_key():
     Deriva a chave Fernet a partir da fingerprint do hardware.
     A chave Fernet requer 32 url-safe base64-encoded bytes.
     """
-    hardware_hash = get_hardware_fingerprint()
-    return urlsafe_b64encode(hardware_hash)
+    return get_identity().encryption_key()
 
 def get_identity_file_path():
     """
@@ -83,61 +90,139 @@ def get_identity_file_path():
         
     return base_dir / '.agent_identity'
 
-def save_api_key(api_key, computer_id=None):
+class AgentIdentity:
     """
-    Criptografa e salva a API_KEY vinculada a essa máquina no disco.
+    Serviço de identidade do processo: calcula a fingerprint uma única vez e
+    mantém as credenciais descriptografadas em memória. O arquivo
+    .agent_identity só é relido (e descriptografado) quando muda no disco.
     """
-    try:
-        key = _get_encryption_key()
-        f = Fernet(key)
-        
-        data = {
-            'api_key': api_key,
-            'computer_id': computer_id
-        }
-        
-        encrypted_data = f.encrypt(json.dumps(data).encode('utf-8'))
-        
-        identity_path = get_identity_file_path()
-        with open(identity_path, 'wb') as file:
-            file.write(encrypted_data)
+
+    def __init__(self, path_provider=None):
+        self._path_provider = path_provider or get_identity_file_path
+        self._lock = threading.RLock()
+        self._fingerprint = None
+        self._fernet = None
+        self._credentials = None
+        self._signature = None
+
+    def fingerprint(self):
+        with self._lock:
+            if self._fingerprint is None:
+                self._fingerprint = _compute_hardware_fingerprint()
+            return self._fingerprint
+
+    def encryption_key(self):
+        """
+        Deriva a chave Fernet a partir da fingerprint do hardware.
+        A chave Fernet requer 32 url-safe base64-encoded bytes.
+        """
+        return urlsafe_b64encode(self.fingerprint())
+
+    def load(self):
+        """
+        Retorna (api_key, computer_id) ou (None, None). Usa o cache enquanto o
+        arquivo de identidade não mudar (mtime/tamanho/inode).
+        """
+        identity_path = self._path_provider()
+        signature = self._file_signature(identity_path)
+        with self._lock:
+            if self._credentials is not None and signature == self._signature:
+                return self._credentials
+            credentials = self._read(identity_path) if signature else (None, None)
+            self._credentials, self._signature = credentials, signature
+            return credentials
+
+    def save(self, api_key, computer_id=None):
+        """
+        Criptografa e salva a API_KEY vinculada a essa máquina no disco.
+        """
+        try:
+            data = {
+                'api_key': api_key,
+                'computer_id': computer_id
+            }
             
-        # Tenta restringir a permissão do arquivo (Linux/Mac)
-        if platform.system().lower() != 'windows':
-            os.chmod(identity_path, 0o600)
+            encrypted_data = self._get_fernet().encrypt(json.dumps(data).encode('utf-8'))
+            
+            identity_path = self._path_provider()
+            with self._lock:
+                with open(identity_path, 'wb') as file:
+                    file.write(encrypted_data)
+                    
+                # Tenta restringir a permissão do arquivo (Linux/Mac)
+                if platform.system().lower() != 'windows':
+                    os.chmod(identity_path, 0o600)
+
+                self._credentials = (api_key, computer_id)
+                self._signature = self._file_signature(identity_path)
+                
+            return True
+        except Exception as e:
+            print(f"Erro ao salvar api key localmente: {e}")
+            return False
+
+    def invalidate(self):
+        """Descarta as credenciais em cache; a próxima leitura vai ao disco."""
+        with self._lock:
+            self._credentials = None
+            self._signature = None
+
+    def _get_fernet(self):
+        with self._lock:
+            if self._fernet is None:
+                self._fernet = Fernet(self.encryption_key())
+            return self._fernet
+
+    @staticmethod
+    def _file_signature(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+    def _read(self, identity_path):
+        try:
+            with open(identity_path, 'rb') as file:
+                encrypted_data = file.read()
+                
+            decrypted_data = self._get_fernet().decrypt(encrypted_data).decode('utf-8')
+            data = json.loads(decrypted_data)
             
-        return True
-    except Exception as e:
-        print(f"Erro ao salvar api key localmente: {e}")
-        return False
+            return data.get('api_key'), data.get('computer_id')
+        except InvalidToken:
+            print("Erro Crítico: Identidade do Agente corrompida ou hardware alterado. O token de descriptografia não confere.")
+            return None, None
+        except Exception as e:
+            print(f"Erro ao ler a identidade do agente: {e}")
+            return None, None
+
+
+_identity = None
+_identity_lock = threading.Lock()
+
+def get_identity():
+    """
+    Retorna o serviço de identidade compartilhado pelo processo.
+    """
+    global _identity
+    with _identity_lock:
+        if _identity is None:
+            _identity = AgentIdentity()
+        return _identity
+
+def save_api_key(api_key, computer_id=None):
+    """
+    Criptografa e salva a API_KEY vinculada a essa máquina no disco.
+    """
+    return get_identity().save(api_key, computer_id)
 
 def load_api_key():
     """
     Lê localmente e tenta descriptografar a API Key e computer_id.
     Retorna uma tupla (api_key, computer_id) ou (None, None) se falhar.
     """
-    identity_path = get_identity_file_path()
-    
-    if not identity_path.exists():
-        return None, None
-        
-    try:
-        with open(identity_path, 'rb') as file:
-            encrypted_data = file.read()
-            
-        key = _get_encryption_key()
-        f = Fernet(key)
-        
-        decrypted_data = f.decrypt(encrypted_data).decode('utf-8')
-        data = json.loads(decrypted_data)
-        
-        return data.get('api_key'), data.get('computer_id')
-    except InvalidToken:
-        print("Erro Crítico: Identidade do Agente corrompida ou hardware alterado. O token de descriptografia não confere.")
-        return None, None
-    except Exception as e:
-        print(f"Erro ao ler a identidade do agente: {e}")
-        return None, None
+    return get_identity().load()
 
 def clear_legacy_credentials(env_path):
     """
@@ -0,0 +1,104 @@
+from typing import Any, Dict, Optional
+
+from src import config
+
+# Lists of dicts that are diffed item by item, keyed by this field
+KEYED_LISTS = {'disk_usage': 'mount'}
+
+# Delta field listing the keys removed at that level (null is a legitimate value)
+REMOVED_KEY = '_removed'
+
+
+def _normalize(data: Any, key: str = None) -> Any:
+    if isinstance(data, dict):
+        return {k: _normalize(v, k) for k, v in data.items()}
+    if isinstance(data, list) and key in KEYED_LISTS:
+        id_field = KEYED_LISTS[key]
+        if all(isinstance(item, dict) and id_field in item for item in data):
+            return {str(item[id_field]): _normalize(item) for item in data}
+    return data
+
+
+def delta_encode(base: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Return only what changed from base to current. Nested dicts are diffed
+    recursively, removed keys are listed under REMOVED_KEY and keyed lists
+    (see KEYED_LISTS) become dicts keyed by their id field.
+    """
+    base, current = _normalize(base), _normalize(current)
+    return _diff(base, current)
+
+
+def _diff(base: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    delta = {}
+    for key, value in current.items():
+        if key not in base:
+            delta[key] = value
+        elif isinstance(value, dict) and isinstance(base[key], dict):
+            nested = _diff(base[key], value)
+            if nested:
+                delta[key] = nested
+        elif value != base[key]:
+            delta[key] = value
+    removed = [key for key in base if key not in current]
+    if removed:
+        delta[REMOVED_KEY] = removed
+    return delta
+
+
+def delta_apply(base: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """Inverse of delta_encode (on the normalized form); mirrors what the server does."""
+    result = dict(_normalize(base))
+    for key in delta.get(REMOVED_KEY, []):
+        result.pop(key, None)
+    for key, value in delta.items():
+        if key == REMOVED_KEY:
+            continue
+        if isinstance(value, dict) and isinstance(result.get(key), dict):
+            result[key] = delta_apply(result[key], value)
+        else:
+            result[key] = value
+    return result
+
+
+class SnapshotDeltaEncoder:
+    """
+    Encodes successive snapshots as deltas against the last snapshot the
+    server acknowledged, with a full snapshot every full_every uploads or
+    whenever there is no acknowledged base.
+    """
+
+    def __init__(self, full_every: int = None):
+        self.full_every = full_every if full_every is not None else config.METRICS_FULL_SNAPSHOT_EVERY
+        self._seq = 0
+        self._base: Optional[Dict[str, Any]] = None
+        self._base_seq: Optional[int] = None
+        self._since_full = 0
+        self._pending = None
+
+    def encode(self, snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        self._seq += 1
+        self._pending = (self._seq, snapshot)
+        if self._base is None or self._since_full >= self.full_every:
+            return {'snapshot_seq': self._seq, 'snapshot_encoding': 'full', 'snapshot': snapshot}
+        return {
+            'snapshot_seq': self._seq,
+            'snapshot_encoding': 'delta',
+            'snapshot_base': self._base_seq,
+            'snapshot': delta_encode(self._base, snapshot),
+        }
+
+    def acknowledge(self):
+        """The last encoded snapshot reached the server: it becomes the new base."""
+        if self._pending is None:
+            return
+        seq, snapshot = self._pending
+        self._since_full = 0 if self._base is None or self._since_full >= self.full_every else self._since_full + 1
+        self._base_seq, self._base = seq, snapshot
+        self._pending = None
+
+    def reset(self):
+        """Forget the base (e.g. the server lost it); the next snapshot is sent in full."""
+        self._base = None
+        self._base_seq = None
+        self._pending = None
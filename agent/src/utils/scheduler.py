@@ -0,0 +1,254 @@
+import heapq
+import itertools
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from src.utils.logger import setup_logger
+
+logger = setup_logger(__name__)
+
+# Missed-run policies: what to do when a job is dispatched later than its deadline
+MISSED_RUN_ONCE = 'run_once'  # run a single late execution, then continue from now
+MISSED_SKIP = 'skip'          # drop the late execution and wait for the next slot
+
+
+class Job:
+    """A named unit of work registered with the Scheduler."""
+
+    def __init__(self, name: str, func: Callable, interval: Optional[float], jitter: float = 0.0,
+                 deadline: Optional[float] = None, missed: str = MISSED_RUN_ONCE,
+                 retry_interval: Optional[float] = None):
+        if missed not in (MISSED_RUN_ONCE, MISSED_SKIP):
+            raise ValueError(f"Unknown missed-run policy: {missed}")
+        self.name = name
+        self.func = func
+        self.interval = interval
+        self.jitter = jitter
+        # Without an explicit deadline a run may be up to one interval late
+        self.deadline_follows_interval = deadline is None
+        self.deadline = deadline if deadline is not None else interval
+        self.missed = missed
+        self.retry_interval = retry_interval
+        self.next_run: float = 0.0
+        self.running = False
+        self.cancelled = False
+        self.generation = 0
+        self.run_count = 0
+        self.missed_count = 0
+        self.last_duration: Optional[float] = None
+
+    @property
+    def one_shot(self) -> bool:
+        return self.interval is None
+
+
+class Scheduler:
+    """
+    Priority-heap scheduler for periodic and one-shot jobs.
+
+    Due jobs are dispatched onto a small worker pool, so a slow job only delays
+    itself: a job never overlaps with its own previous run, but other jobs keep
+    their timing. With max_workers=None the pool is sized at the first dispatch
+    to one worker per registered job, so no job ever waits for a free worker.
+    """
+
+    def __init__(self, max_workers: Optional[int] = 4, clock: Callable[[], float] = time.monotonic,
+                 executor=None):
+        self._clock = clock
+        self._executor = executor
+        if executor is None and max_workers is not None:
+            self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='scheduler')
+        self._jobs: Dict[str, Job] = {}
+        self._heap: List[tuple] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._stopped = False
+        # SystemExit/KeyboardInterrupt raised by a job, re-raised on the run_forever thread
+        self._fatal: Optional[BaseException] = None
+
+    def every(self, name: str, interval: float, func: Callable, jitter: float = 0.0,
+              deadline: Optional[float] = None, missed: str = MISSED_RUN_ONCE,
+              retry_interval: Optional[float] = None, run_now: bool = True) -> Job:
+        """Register (or replace) a periodic job. A job returning False is retried after retry_interval."""
+        if interval <= 0:
+            raise ValueError("interval must be positive")
+        job = Job(name, func, interval, jitter, deadline, missed, retry_interval)
+        first_delay = 0.0 if run_now else interval + self._jitter(job)
+        self._register(job, self._clock() + first_delay)
+        return job
+
+    def once(self, name: str, func: Callable, delay: float = 0.0, deadline: Optional[float] = None) -> Job:
+        """Register (or replace) a job that runs a single time after delay seconds."""
+        job = Job(name, func, None, deadline=deadline, missed=MISSED_RUN_ONCE if deadline is None else MISSED_SKIP)
+        self._register(job, self._clock() + delay)
+        return job
+
+    def cancel(self, name: str) -> bool:
+        with self._cond:
+            job = self._jobs.pop(name, None)
+            if not job:
+                return False
+            job.cancelled = True
+            job.generation += 1
+            self._cond.notify_all()
+            return True
+
+    def trigger(self, name: str, delay: float = 0.0) -> bool:
+        """Bring a job forward so it runs after delay seconds (as soon as a worker is free)."""
+        return self._move(name, self._clock() + delay)
+
+    def reschedule(self, name: str, interval: float, delay: Optional[float] = None) -> bool:
+        """Change a periodic job's interval; the next run happens after delay (default: interval)."""
+        with self._cond:
+            job = self._jobs.get(name)
+            if not job or job.one_shot:
+                return False
+            job.interval = interval
+            if job.deadline_follows_interval:
+                job.deadline = interval
+        return self._move(name, self._clock() + (interval if delay is None else delay))
+
+    def get_job(self, name: str) -> Optional[Job]:
+        return self._jobs.get(name)
+
+    def run_pending(self) -> Optional[float]:
+        """Dispatch every due job. Returns seconds until the next due job, or None if idle."""
+        with self._cond:
+            now = self._clock()
+            while self._heap and self._heap[0][0] <= now:
+                due, _, generation, job = heapq.heappop(self._heap)
+                if job.cancelled or generation != job.generation:
+                    continue
+                if job.running:
+                    # Never overlap with itself: it is re-queued when the current run finishes
+                    continue
+                if job.deadline is not None and now - due > job.deadline:
+                    job.missed_count += 1
+                    if job.missed == MISSED_SKIP:
+                        logger.debug(f"Job '{job.name}' missed its deadline by {now - due:.1f}s, skipping")
+                        if job.one_shot:
+                            self._jobs.pop(job.name, None)
+                        else:
+                            self._push(job, self._next_slot(job, due, now, now))
+                        continue
+                job.running = True
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=max(1, len(self._jobs)),
+                                                        thread_name_prefix='scheduler')
+                self._executor.submit(self._run_job, job, due)
+            return self._time_until_next(now)
+
+    def run_forever(self):
+        """Block dispatching jobs until stop() is called, or re-raise a job's SystemExit/KeyboardInterrupt."""
+        while True:
+            wait = self.run_pending()
+            with self._cond:
+                if self._fatal is not None:
+                    raise self._fatal
+                if self._stopped:
+                    break
+                # Sleep exactly until the next job is due; add/trigger/finish wake us early
+                self._cond.wait(timeout=wait)
+                if self._fatal is not None:
+                    raise self._fatal
+                if self._stopped:
+                    break
+
+    def stop(self, wait: bool = True):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+
+    # ==== Internals ====
+
+    def _register(self, job: Job, first_run: float):
+        with self._cond:
+            old = self._jobs.get(job.name)
+            if old:
+                old.cancelled = True
+                old.generation += 1
+            self._jobs[job.name] = job
+            self._push(job, first_run)
+
+    def _move(self, name: str, when: float) -> bool:
+        with self._cond:
+            job = self._jobs.get(name)
+            if not job:
+                return False
+            self._push(job, when)
+            return True
+
+    def _push(self, job: Job, when: float):
+        # Bumping the generation invalidates any older heap entry for this job
+        job.generation += 1
+        job.next_run = when
+        heapq.heappush(self._heap, (when, next(self._seq), job.generation, job))
+        self._cond.notify_all()
+
+    def _jitter(self, job: Job) -> float:
+        return random.uniform(0, job.jitter) if job.jitter else 0.0
+
+    def _next_slot(self, job: Job, due: float, started: float, now: float) -> float:
+        next_run = due + job.interval
+        if next_run <= now:
+            if job.missed == MISSED_SKIP:
+                # Stay aligned to the original grid
+                skipped = int((now - next_run) // job.interval) + 1
+                next_run += skipped * job.interval
+            else:
+                # Realign on the late run; an overrunning job goes again right away
+                next_run = max(started + job.interval, now)
+        return next_run + self._jitter(job)
+
+    def _time_until_next(self, now: float) -> Optional[float]:
+        while self._heap:
+            due, _, generation, job = self._heap[0]
+            if job.cancelled or generation != job.generation:
+                heapq.heappop(self._heap)
+                continue
+            return max(0.0, due - now)
+        return None
+
+    def _run_job(self, job: Job, due: float):
+        started = self._clock()
+        result = None
+        try:
+            result = job.func()
+        except Exception as e:
+            logger.error(f"Job '{job.name}' failed: {e}")
+        except BaseException as e:
+            # A worker thread cannot stop the process: hand it to the thread running run_forever
+            logger.error(f"Job '{job.name}' raised {type(e).__name__}, stopping the scheduler")
+            with self._cond:
+                self._fatal = e
+                self._cond.notify_all()
+            raise
+        finally:
+            finished = self._clock()
+            with self._cond:
+                job.running = False
+                job.run_count += 1
+                job.last_duration = finished - started
+        self._reschedule(job, due, started, finished, result)
+
+    def _reschedule(self, job: Job, due: float, started: float, finished: float, result):
+        with self._cond:
+            if job.cancelled:
+                return
+            if job.one_shot:
+                if self._jobs.get(job.name) is job:
+                    self._jobs.pop(job.name)
+                self._cond.notify_all()
+                return
+            # A requeue requested while running (trigger/reschedule) takes precedence
+            if job.next_run > due:
+                self._push(job, max(job.next_run, finished))
+            elif result is False and job.retry_interval:
+                self._push(job, finished + job.retry_interval)
+            else:
+                self._push(job, self._next_slot(job, due, started, finished))
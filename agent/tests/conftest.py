@@ -0,0 +1,22 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def isolated_outbox(tmp_path, monkeypatch):
+    """Keep the orchestrator's durable outbox out of the agent directory during tests."""
+    monkeypatch.setattr('src.config.OUTBOX_FILE', str(tmp_path / 'outbox.db'))
+
+
+@pytest.fixture(autouse=True)
+def fresh_hardware_inventory():
+    """The hardware inventory is process-wide; forget uploads between tests."""
+    from src.collectors.hardware import get_hardware_inventory
+    get_hardware_inventory().reset()
+    yield
+    get_hardware_inventory().reset()
+
+
+@pytest.fixture(autouse=True)
+def isolated_software_state(tmp_path, monkeypatch):
+    """Keep the acknowledged software inventory out of the agent directory during tests."""
+    monkeypatch.setattr('src.config.SOFTWARE_STATE_FILE', str(tmp_path / 'software_inventory.json'))
@@ -0,0 +1,92 @@
+import gzip
+import json
+
+import responses
+
+from src.collectors.aggregation import WindowAggregator, summarize
+from src.collectors.sampler import RingBuffer
+from src.config import API_BASE_URL
+
+
+class FakeSampler:
+    def __init__(self):
+        self.series = {'cpu_percent': RingBuffer(64), 'memory_percent': RingBuffer(64)}
+
+
+def test_summarize_statistics():
+    """Windows carry min/max/mean/p95/last of their samples."""
+    stats = summarize([float(v) for v in range(1, 21)])
+    assert stats == {'min': 1.0, 'max': 20.0, 'mean': 10.5, 'p95': 19.0, 'last': 20.0}
+
+
+def test_aggregator_emits_complete_windows_until_acknowledged():
+    """Short spikes survive aggregation and windows stay pending until uploaded."""
+    sampler = FakeSampler()
+    for t in range(30):
+        sampler.series['cpu_percent'].append(1000.0 + t, 95.0 if t == 7 else 5.0)
+        sampler.series['memory_percent'].append(1000.0 + t, 40.0)
+    now = [1032.0]
+    aggregator = WindowAggregator(sampler, window_seconds=10, clock=lambda: now[0])
+
+    assert aggregator.collect() == 3
+    windows = aggregator.pending()
+    assert [w['start'] for w in windows] == [1000, 1010, 1020]
+    assert windows[0]['cpu_percent']['max'] == 95.0
+    assert windows[0]['samples'] == 10
+    assert aggregator.collect() == 0  # current window is not complete yet
+
+    aggregator.acknowledge(2)
+    assert [w['start'] for w in aggregator.pending()] == [1020]
+
+
+@responses.activate
+def test_metrics_batch_is_gzipped_with_legacy_fallback(mocker):
+    """Metrics go out as one gzip batch; a 404 falls back to the legacy snapshot endpoint."""
+    from main import AgentOrchestrator
+
+    mocker.patch('src.api_client.ApiClient._load_token')
+    agent = AgentOrchestrator()
+    agent.api.computer_id = 3
+    mocker.patch.object(agent, 'collect_metrics', return_value={'cpu_usage_percent': 12.5})
+
+    batch_url = f"{API_BASE_URL}/computers/3/metrics/batch"
+    responses.add(responses.POST, batch_url, status=202)
+    assert agent.send_metrics_report() is True
+    request = responses.calls[0].request
+    assert request.headers['Content-Encoding'] == 'gzip'
+    assert json.loads(gzip.decompress(request.body))['snapshot'] == {'cpu_usage_percent': 12.5}
+
+    responses.replace(responses.POST, batch_url, status=404)
+    responses.add(responses.POST, f"{API_BASE_URL}/computers/3/metrics", status=200)
+    assert agent.send_metrics_report() is True
+    assert agent.metrics_batch_supported is False
+    assert json.loads(responses.calls[-1].request.body) == {'cpu_usage_percent': 12.5}
+
+
+@responses.activate
+def test_metrics_parked_before_batch_support_is_known_use_the_legacy_endpoint(mocker):
+    """While the batch route is unconfirmed the outbox gets the legacy snapshot and windows stay pending."""
+    from main import AgentOrchestrator
+
+    mocker.patch('src.api_client.ApiClient._load_token')
+    agent = AgentOrchestrator()
+    agent.api.computer_id = 3
+    mocker.patch.object(agent, 'collect_metrics', return_value={'cpu_usage_percent': 12.5})
+    agent.api._sleep = mocker.Mock()
+    mocker.patch.object(agent.metrics_windows, 'pending', return_value=[{'start': 0}])
+    acknowledge = mocker.patch.object(agent.metrics_windows, 'acknowledge')
+    responses.add(responses.POST, f"{API_BASE_URL}/computers/3/metrics/batch", status=503)
+
+    assert agent.send_metrics_report() is True
+    [entry] = agent.outbox.peek(10)
+    assert (entry['endpoint'], entry['payload'], entry['compressed']) == (
+        '/computers/3/metrics', {'cpu_usage_percent': 12.5}, False)
+    acknowledge.assert_not_called()
+
+    # Once the server has answered on the batch route, batches themselves are parked
+    agent.outbox.ack([entry['id']])
+    responses.replace(responses.POST, f"{API_BASE_URL}/computers/3/metrics/batch", status=202)
+    assert agent.send_metrics_report() is True
+    responses.replace(responses.POST, f"{API_BASE_URL}/computers/3/metrics/batch", status=503)
+    assert agent.send_metrics_report() is True
+    assert agent.outbox.peek(10)[0]['endpoint'] == '/computers/3/metrics/batch'
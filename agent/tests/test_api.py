@@ -59,3 +59,73 @@ def test_agent_registration_payload(mocker):
     assert 'test_token_123' in req_body
     assert 'mock_machine_id' in req_body
     assert 'MockComputer' in req_body
+
+@responses.activate
+def test_retry_after_is_honoured_on_503(mocker):
+    """A 503 with a short Retry-After is retried after exactly that delay."""
+    api = ApiClient()
+    api._sleep = mocker.Mock()
+    url = f"{API_BASE_URL}/agent/me"
+    responses.add(responses.GET, url, status=503, headers={'Retry-After': '2'})
+    responses.add(responses.GET, url, json={}, status=200)
+
+    assert api.get("/agent/me").status_code == 200
+    api._sleep.assert_called_once_with(2.0)
+
+@responses.activate
+def test_post_is_not_retried_on_connection_errors(mocker):
+    """A POST that may have reached the server is not repeated; the error surfaces to the caller."""
+    import requests
+    api = ApiClient()
+    api._sleep = mocker.Mock()
+    url = f"{API_BASE_URL}/computers/1/report"
+    responses.add(responses.POST, url, body=requests.exceptions.ConnectionError("reset"))
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        api.post("/computers/1/report", json={})
+    assert len(responses.calls) == 1
+
+@responses.activate
+def test_circuit_breaker_fails_fast_and_recovers(mocker):
+    """After repeated failures requests fail without network I/O; one probe closes the circuit."""
+    from src.api_client import CircuitBreaker, CircuitOpenError, CIRCUIT_OPEN, CIRCUIT_CLOSED
+    now = [0.0]
+    api = ApiClient()
+    api._sleep = mocker.Mock()
+    api.breaker = CircuitBreaker(failure_threshold=2, reset_timeout=30, clock=lambda: now[0])
+    transitions = []
+    api.add_circuit_listener(lambda old, new: transitions.append(new))
+    url = f"{API_BASE_URL}/computers/1/commands/pending"
+    responses.add(responses.GET, url, status=500)
+
+    api.get("/computers/1/commands/pending")
+    api.get("/computers/1/commands/pending")
+    assert api.circuit_open
+    with pytest.raises(CircuitOpenError):
+        api.get("/computers/1/commands/pending")
+    assert len(responses.calls) == 2
+
+    now[0] = 31.0
+    assert not api.circuit_open  # half-open: the next request is the probe
+    responses.replace(responses.GET, url, json=[], status=200)
+    assert api.get("/computers/1/commands/pending").status_code == 200
+    assert transitions == [CIRCUIT_OPEN, CIRCUIT_CLOSED]
+
+
+def test_failed_probe_after_retry_after_keeps_the_circuit_open():
+    """A Retry-After opens the circuit below the threshold; a failed probe then holds for reset_timeout."""
+    from src.api_client import CircuitBreaker, CircuitOpenError, CIRCUIT_OPEN
+    now = [0.0]
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=30, clock=lambda: now[0])
+
+    breaker.record_failure(retry_after=10)
+    assert breaker.state == CIRCUIT_OPEN
+    now[0] = 10.0
+    breaker.before_request()  # the probe
+    breaker.record_failure()
+
+    now[0] = 39.0
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    now[0] = 40.0
+    breaker.before_request()
@@ -0,0 +1,81 @@
+import gzip
+import json
+
+import responses
+
+from src.api_client import ApiClient
+from src.api_stats import ApiStats, endpoint_template, read_status_file
+from src.config import API_BASE_URL
+
+
+def test_endpoint_template_collapses_ids():
+    """Numeric and UUID path segments are folded so stats stay per endpoint, not per computer."""
+    assert endpoint_template('/computers/42/commands/pending') == '/computers/{id}/commands/pending'
+    assert endpoint_template('/commands/7/status?x=1') == '/commands/{id}/status'
+    assert endpoint_template('/agent/me') == '/agent/me'
+
+
+def test_window_is_the_difference_between_snapshots():
+    """Uploaded stats cover only the requests made since the acknowledged snapshot."""
+    stats = ApiStats()
+    stats.record('GET /agent/me', 0.020, 200, bytes_in=100)
+    first = stats.counters()
+    stats.record('GET /agent/me', 0.300, 500, bytes_in=10)
+    stats.record('GET /agent/me', 2.0)
+    stats.record_retry('GET /agent/me')
+
+    window = ApiStats.window(stats.counters(), first)['endpoints']['GET /agent/me']
+    assert window['requests'] == 2
+    assert window['errors'] == 1
+    assert window['retries'] == 1
+    assert window['statuses'] == {'500': 1}
+    assert window['bytes_in'] == 10
+    assert window['latency_ms']['p50'] == 500
+    assert ApiStats.window(first, first)['endpoints'] == {}
+
+
+@responses.activate
+def test_api_client_records_latency_status_bytes_and_retries(mocker):
+    """Every attempt is timed and counted under its endpoint template."""
+    api = ApiClient()
+    api._sleep = mocker.Mock()
+    url = f"{API_BASE_URL}/computers/3/commands/pending"
+    responses.add(responses.GET, f"{API_BASE_URL}/agent/me", status=503, headers={'Retry-After': '0'})
+    responses.add(responses.GET, f"{API_BASE_URL}/agent/me", json={'ok': True}, status=200)
+    responses.add(responses.GET, url, json=[], status=200)
+
+    api.get('/agent/me')
+    api.get('/computers/3/commands/pending')
+    api.get('/computers/3/commands/pending', params={'wait': 25})
+
+    snapshot = api.stats.snapshot()['endpoints']
+    me = snapshot['GET /agent/me']
+    assert me['requests'] == 2
+    assert me['retries'] == 1
+    assert me['statuses'] == {'503': 1, '200': 1}
+    assert me['bytes_in'] > 0
+    assert snapshot['GET /computers/{id}/commands/pending']['requests'] == 1
+    assert snapshot['GET /computers/{id}/commands/pending?wait']['requests'] == 1
+
+
+@responses.activate
+def test_api_stats_ride_along_with_metrics_and_status_file(mocker, tmp_path):
+    """The metrics batch carries the API stats window; the status file exposes the cumulative view."""
+    from main import AgentOrchestrator
+
+    mocker.patch('src.api_client.ApiClient._load_token')
+    mocker.patch('src.config.STATUS_FILE', str(tmp_path / 'agent_status.json'))
+    agent = AgentOrchestrator()
+    agent.api.computer_id = 3
+    mocker.patch.object(agent, 'collect_metrics', return_value={'cpu_usage_percent': 1.0})
+    responses.add(responses.POST, f"{API_BASE_URL}/computers/3/metrics/batch", status=202)
+
+    assert agent.send_metrics_report() is True
+    assert agent.send_metrics_report() is True
+    second = json.loads(gzip.decompress(responses.calls[1].request.body))
+    assert second['api_stats']['endpoints']['POST /computers/{id}/metrics/batch']['requests'] == 1
+
+    agent.write_status()
+    status = read_status_file()
+    assert status['circuit'] == 'closed'
+    assert status['api']['endpoints']['POST /computers/{id}/metrics/batch']['requests'] == 2
@@ -0,0 +1,71 @@
+import asyncio
+import time
+from unittest.mock import MagicMock
+
+
+def make_response(status=200, body=None):
+    response = MagicMock()
+    response.status_code = status
+    response.json.return_value = body if body is not None else []
+    return response
+
+
+def test_async_stages_overlap(mocker):
+    """Command polling, /agent/me sync and metrics upload run concurrently in async mode."""
+    from main import AsyncAgentOrchestrator
+
+    mocker.patch('src.api_client.ApiClient._load_token')
+    agent = AsyncAgentOrchestrator()
+    agent.api.computer_id = 42
+
+    def slow_request(method, endpoint, **kwargs):
+        time.sleep(0.3)
+        return make_response(body={'lab': None} if endpoint == '/agent/me' else [])
+
+    mocker.patch.object(agent.api, 'request', side_effect=slow_request)
+    mocker.patch.object(agent, 'collect_metrics', return_value={'cpu_usage_percent': 1})
+    mocker.patch.object(agent.wallpaper_man, 'apply_lab_wallpaper')
+
+    async def tick():
+        return await asyncio.gather(
+            agent.check_commands_async(),
+            agent.enforce_lab_wallpaper_async(),
+            agent.send_metrics_report_async(),
+        )
+
+    started = time.monotonic()
+    results = asyncio.run(tick())
+    elapsed = time.monotonic() - started
+
+    assert results[2] is True
+    assert agent.api.request.call_count == 3
+    # Three 0.3s round trips serially would take 0.9s
+    assert elapsed < 0.75
+
+
+def test_async_polling_respects_the_circuit_and_drains_on_request(mocker):
+    """An open circuit skips the command poll; a requested drain runs without a scheduler job."""
+    from main import AsyncAgentOrchestrator
+
+    mocker.patch('src.api_client.ApiClient._load_token')
+    agent = AsyncAgentOrchestrator()
+    agent.api.computer_id = 42
+    mocker.patch.object(agent.api, 'request', return_value=make_response())
+    mocker.patch.object(type(agent.api), 'circuit_open', new_callable=mocker.PropertyMock, return_value=True)
+    drains = []
+    mocker.patch.object(agent, 'drain_outbox', side_effect=lambda: drains.append(1) or True)
+
+    async def scenario():
+        await agent.check_commands_async()
+        agent._loop = asyncio.get_running_loop()
+        agent._outbox_wake = asyncio.Event()
+        stage = asyncio.ensure_future(agent.run_outbox_async())
+        await asyncio.sleep(0.05)
+        # As deliver() does from an executor thread
+        await agent.run_blocking(agent.request_outbox_drain, 0.0)
+        await asyncio.sleep(0.1)
+        stage.cancel()
+
+    asyncio.run(scenario())
+    agent.api.request.assert_not_called()
+    assert len(drains) == 2
@@ -1,6 +1,9 @@
 import pytest
+import threading
+import time
 from datetime import datetime, timezone, timedelta
 from src.commands.parser import is_command_expired
+from src.commands.executor import CommandExecutor
 
 def test_command_expiration_calculation():
     """Verify that commands older than max_age are correctly marked as expired."""
@@ -28,3 +31,84 @@ def test_command_expiration_calculation():
     assert is_command_expired(fresh_cmd, max_age_seconds=300) is False
     assert is_command_expired(old_cmd, max_age_seconds=300) is True
     assert is_command_expired(bad_cmd) is False  # Fails open if no time is provided
+
+def test_executor_lanes_keep_interactive_commands_fast():
+    """A long install in its own lane does not delay interactive commands."""
+    executor = CommandExecutor('/tmp')
+    release = threading.Event()
+    executor.handlers['install_software'] = lambda cmd: release.wait(5) and "installed"
+    executor.handlers['ps_list'] = lambda cmd: "[]"
+
+    install = executor.submit({'id': 1, 'command': 'install_software'})
+    started = time.monotonic()
+    assert executor.submit({'id': 2, 'command': 'ps_list'}).result(timeout=1) == "[]"
+    assert time.monotonic() - started < 1
+    assert executor.is_inflight(1) and not install.done()
+
+    release.set()
+    assert install.result(timeout=2) == "installed"
+    executor.shutdown()
+
+
+def test_executor_timeout_cancel_and_power_preemption(mocker):
+    """Timeouts and cancellations report 'failed' once; shutdown cancels queued work."""
+    mocker.patch.dict('src.config.COMMAND_TIMEOUTS', {'terminal': 0.1})
+    executor = CommandExecutor('/tmp')
+    block = threading.Event()
+    executor.handlers['terminal'] = lambda cmd: block.wait(5) and "ok"
+    executor.handlers['install_software'] = lambda cmd: block.wait(5) and "ok"
+    executor.handlers['shutdown'] = lambda cmd: "Shutdown command executed"
+    results = {}
+    on_done = lambda cmd, status, output: results.setdefault(cmd['id'], (status, output))
+
+    executor.submit({'id': 1, 'command': 'terminal'}, on_done).result(timeout=2)
+    executor.submit({'id': 2, 'command': 'install_software'}, on_done)
+    executor.submit({'id': 3, 'command': 'install_software'}, on_done)  # queued behind id 2
+    executor.submit({'id': 4, 'command': 'shutdown'}, on_done).result(timeout=2)
+    assert executor.cancel(2) is True
+
+    assert results[1][0] == 'failed' and 'Tempo limite' in results[1][1]
+    assert results[3][0] == 'failed'
+    assert results[4] == ('completed', "Shutdown command executed")
+    assert results[2] == ('failed', "Comando cancelado.")
+    block.set()
+    executor.shutdown()
+
+
+def test_timed_out_handlers_give_their_lane_back(mocker):
+    """Hung handlers that timed out no longer hold the lane: new commands still run."""
+    mocker.patch.dict('src.config.COMMAND_TIMEOUTS', {'terminal': 0.1})
+    executor = CommandExecutor('/tmp')
+    block = threading.Event()
+    executor.handlers['terminal'] = lambda cmd: "ok" if cmd.get('quick') else block.wait(5) and "late"
+
+    hung = [executor.submit({'id': i, 'command': 'terminal'}) for i in (1, 2)]
+    assert all('Tempo limite' in f.result(timeout=2) for f in hung)
+    assert executor.submit({'id': 3, 'command': 'terminal', 'quick': True}).result(timeout=1) == "ok"
+    block.set()
+    executor.shutdown()
+
+
+def test_exclusive_lane_waits_for_a_timed_out_handler(mocker):
+    """A timed-out install is reported at once, but the next install starts only after it exits."""
+    mocker.patch.dict('src.config.COMMAND_TIMEOUTS', {'install_software': 0.1})
+    executor = CommandExecutor('/tmp')
+    release = threading.Event()
+    running = []
+
+    def install(cmd):
+        running.append(cmd['id'])
+        if cmd['id'] == 1:
+            release.wait(5)
+        running.remove(cmd['id'])
+        return "installed"
+
+    executor.handlers['install_software'] = install
+    assert 'Tempo limite' in executor.submit({'id': 1, 'command': 'install_software'}).result(timeout=2)
+    second = executor.submit({'id': 2, 'command': 'install_software'})
+    time.sleep(0.2)
+    assert running == [1] and not second.done()
+
+    release.set()
+    assert second.result(timeout=2) == "installed"
+    executor.shutdown()
@@ -0,0 +1,97 @@
+import gzip
+import json
+
+import responses
+
+from src.collectors.rates import CounterRates
+from src.config import API_BASE_URL
+from src.utils.delta import SnapshotDeltaEncoder, delta_apply, delta_encode
+
+
+def test_counter_rates_skip_first_update_and_resets():
+    """Rates need two readings; a counter that goes backwards yields no rate."""
+    rates = CounterRates()
+    assert rates.update({'net_sent': 1000, 'disk_read': 50}, now=10.0) == {}
+    assert rates.update({'net_sent': 3000, 'disk_read': 550}, now=12.0) == {'net_sent': 1000.0, 'disk_read': 250.0}
+    assert rates.update({'net_sent': 100, 'disk_read': 650}, now=13.0) == {'disk_read': 100.0}
+
+
+def test_delta_encode_omits_unchanged_fields_and_round_trips():
+    """Only changed fields are sent; disk_usage is diffed per mount and removals are listed."""
+    base = {
+        'cpu_usage_percent': 10.0,
+        'memory_usage_percent': 40.0,
+        'disk_usage': [{'mount': '/', 'percent': 50.0}, {'mount': '/home', 'percent': 20.0},
+                       {'mount': '/mnt/usb', 'percent': 5.0}],
+        'network_stats': {'bytes_sent': 1, 'bytes_recv': 2},
+        'processes_count': 100,
+        'gpu_temp': 60,
+    }
+    current = {
+        'cpu_usage_percent': 12.0,
+        'memory_usage_percent': 40.0,
+        'disk_usage': [{'mount': '/', 'percent': 50.0}, {'mount': '/home', 'percent': 21.0}],
+        'network_stats': {'bytes_sent': 1, 'bytes_recv': 5},
+        'gpu_temp': None,
+    }
+    delta = delta_encode(base, current)
+    assert delta == {
+        'cpu_usage_percent': 12.0,
+        'disk_usage': {'/home': {'percent': 21.0}, '_removed': ['/mnt/usb']},
+        'network_stats': {'bytes_recv': 5},
+        'gpu_temp': None,
+        '_removed': ['processes_count'],
+    }
+    applied = delta_apply(base, delta)
+    assert applied == delta_apply(current, {})
+    assert 'gpu_temp' in applied and applied['gpu_temp'] is None
+
+
+def test_encoder_deltas_only_against_acknowledged_base():
+    """Without an acknowledged base the snapshot goes in full, and periodically again."""
+    encoder = SnapshotDeltaEncoder(full_every=2)
+    first = encoder.encode({'a': 1, 'b': 1})
+    assert first['snapshot_encoding'] == 'full'
+    assert encoder.encode({'a': 1, 'b': 2})['snapshot_encoding'] == 'full'  # nothing acknowledged yet
+
+    encoder.acknowledge()
+    second = encoder.encode({'a': 1, 'b': 3})
+    assert second['snapshot_encoding'] == 'delta'
+    assert second['snapshot_base'] == 2
+    assert second['snapshot'] == {'b': 3}
+    encoder.acknowledge()
+    assert encoder.encode({'a': 1, 'b': 3})['snapshot'] == {}
+    encoder.acknowledge()
+    assert encoder.encode({'a': 1, 'b': 3})['snapshot_encoding'] == 'full'
+
+    encoder.reset()
+    assert encoder.encode({'a': 2})['snapshot_encoding'] == 'full'
+
+
+@responses.activate
+def test_metrics_batch_sends_delta_and_resyncs_on_conflict(mocker):
+    """Acknowledged snapshots become the delta base; a 409 makes the next upload full."""
+    from main import AgentOrchestrator
+
+    mocker.patch('src.api_client.ApiClient._load_token')
+    agent = AgentOrchestrator()
+    agent.api.computer_id = 3
+    snapshots = iter([
+        {'cpu_usage_percent': 10.0, 'memory_usage_percent': 40.0},
+        {'cpu_usage_percent': 15.0, 'memory_usage_percent': 40.0},
+        {'cpu_usage_percent': 15.0, 'memory_usage_percent': 41.0},
+    ])
+    mocker.patch.object(agent, 'collect_metrics', side_effect=lambda: next(snapshots))
+    batch_url = f"{API_BASE_URL}/computers/3/metrics/batch"
+    sent = lambda i: json.loads(gzip.decompress(responses.calls[i].request.body))
+
+    responses.add(responses.POST, batch_url, status=202)
+    assert agent.send_metrics_report() is True
+    assert agent.send_metrics_report() is True
+    assert sent(0)['snapshot_encoding'] == 'full'
+    assert sent(1)['snapshot_encoding'] == 'delta'
+    assert sent(1)['snapshot'] == {'cpu_usage_percent': 15.0}
+
+    responses.replace(responses.POST, batch_url, status=409)
+    assert agent.send_metrics_report() is False
+    assert agent.metrics_encoder.encode({'cpu_usage_percent': 1.0})['snapshot_encoding'] == 'full'
@@ -0,0 +1,141 @@
+import os
+import threading
+import time
+from collections import namedtuple
+
+from src.collectors.disks import DiskProbe, MountTableWatcher
+
+Partition = namedtuple('Partition', 'device mountpoint fstype opts')
+Usage = namedtuple('Usage', 'total used free percent')
+
+GB = 1024 ** 3
+
+
+class StaticWatcher:
+    def __init__(self):
+        self.pending = False
+
+    def changed(self):
+        changed, self.pending = self.pending, False
+        return changed
+
+
+def test_hung_mount_is_skipped_and_backed_off(mocker):
+    """A mount that does not answer costs one timeout, then is skipped until its backoff expires."""
+    hang = threading.Event()
+    calls = []
+
+    def disk_usage(mount):
+        calls.append(mount)
+        if mount == '/mnt/nfs':
+            hang.wait(10)
+        return Usage(100 * GB, 40 * GB, 60 * GB, 40.0)
+
+    mocker.patch('src.collectors.disks.psutil.disk_partitions', return_value=[
+        Partition('/dev/sda1', '/', 'ext4', 'rw'),
+        Partition('srv:/x', '/mnt/nfs', 'nfs', 'rw'),
+    ])
+    mocker.patch('src.collectors.disks.psutil.disk_usage', side_effect=disk_usage)
+    now = [0.0]
+    probe = DiskProbe(timeout=0.2, backoff=30, backoff_max=60, watcher=StaticWatcher(), clock=lambda: now[0])
+
+    started = time.monotonic()
+    assert [d['mount'] for d in probe.disk_usage()] == ['/']
+    assert time.monotonic() - started < 1.0
+    assert probe.unresponsive() == ['/mnt/nfs']
+
+    # Still hung: not probed again, no extra wait
+    now[0] = 100.0
+    assert [d['mount'] for d in probe.disk_usage()] == ['/']
+    assert calls.count('/mnt/nfs') == 1
+
+    # Recovered: probed again once the thread is free and the backoff has passed
+    hang.set()
+    time.sleep(0.05)
+    assert [d['mount'] for d in probe.disk_usage()] == ['/', '/mnt/nfs']
+    assert probe.unresponsive() == []
+
+
+def test_hung_probes_do_not_starve_healthy_mounts(mocker):
+    """Hung mounts filling every worker slot give them back once abandoned, so / is still reported."""
+    hang = threading.Event()
+
+    def disk_usage(mount):
+        if mount != '/':
+            hang.wait(10)
+        return Usage(100 * GB, 40 * GB, 60 * GB, 40.0)
+
+    mocker.patch('src.collectors.disks.psutil.disk_partitions', return_value=[
+        Partition('srv:/a', '/mnt/a', 'nfs', 'rw'),
+        Partition('srv:/b', '/mnt/b', 'nfs', 'rw'),
+        Partition('/dev/sda1', '/', 'ext4', 'rw'),
+    ])
+    mocker.patch('src.collectors.disks.psutil.disk_usage', side_effect=disk_usage)
+    now = [0.0]
+    probe = DiskProbe(timeout=0.2, max_workers=2, backoff=30, watcher=StaticWatcher(), clock=lambda: now[0])
+
+    try:
+        probe.disk_usage()
+        assert {'/mnt/a', '/mnt/b'} <= set(probe.unresponsive())
+
+        # Both hung threads are still running, yet / gets a slot
+        now[0] = 100.0
+        assert [d['mount'] for d in probe.disk_usage()] == ['/']
+        assert probe.unresponsive() == ['/mnt/a', '/mnt/b']
+    finally:
+        hang.set()
+
+    # Once the hung probes return, nothing is left behind and every slot is free again
+    deadline = time.monotonic() + 2
+    while probe._abandoned and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert probe._abandoned == set()
+    assert probe._slots._value == 2
+
+
+def test_answered_probes_leave_no_bookkeeping(mocker):
+    """Normal probes return their slot and keep no per-probe state."""
+    mocker.patch('src.collectors.disks.psutil.disk_usage', return_value=Usage(100 * GB, 40 * GB, 60 * GB, 40.0))
+    probe = DiskProbe(timeout=1, max_workers=2, watcher=StaticWatcher())
+
+    for _ in range(100):
+        assert probe.usage('/') is not None
+
+    assert probe._abandoned == set()
+    time.sleep(0.05)
+    assert probe._slots._value == 2
+
+
+def test_partition_list_is_cached_until_mount_table_changes(mocker):
+    """psutil.disk_partitions runs again only after the watcher reports a change."""
+    partitions = mocker.patch('src.collectors.disks.psutil.disk_partitions',
+                              return_value=[Partition('/dev/sda1', '/', 'ext4', 'rw')])
+    watcher = StaticWatcher()
+    probe = DiskProbe(watcher=watcher)
+    probe.partitions()
+    probe.partitions()
+    assert partitions.call_count == 1
+    watcher.pending = True
+    probe.partitions()
+    assert partitions.call_count == 2
+
+
+def test_mount_table_watcher_falls_back_to_ttl(tmp_path):
+    """Without a pollable mountinfo the partition list expires after ttl seconds."""
+    now = [0.0]
+    watcher = MountTableWatcher(path=str(tmp_path / 'missing'), ttl=60, clock=lambda: now[0])
+    assert watcher.changed() is True
+    now[0] = 30.0
+    assert watcher.changed() is False
+    now[0] = 61.0
+    assert watcher.changed() is True
+
+
+def test_mount_table_watcher_is_quiet_without_mount_events():
+    """On Linux, mountinfo only signals when something is mounted or unmounted."""
+    if not os.path.exists('/proc/self/mountinfo'):
+        return
+    watcher = MountTableWatcher()
+    assert watcher.changed() is True
+    assert watcher.changed() is False
+    watcher.close()
@@ -0,0 +1,83 @@
+from collections import namedtuple
+
+import responses
+
+from src.collectors.hardware import HardwareInventory
+from src.config import API_BASE_URL
+
+Usage = namedtuple('Usage', 'total used free percent')
+
+
+def make_info(used_gb=10.0, available_gb=2.0, ipv4='10.0.0.5'):
+    return {
+        'cpu': {'physical_cores': 4, 'logical_cores': 8, 'processor': 'x86_64'},
+        'memory': {'total_gb': 16.0, 'available_gb': available_gb},
+        'disk': {'total_gb': 500.0, 'used_gb': used_gb, 'free_gb': 500.0 - used_gb},
+        'network': [{'name': 'eth0', 'ipv4': [ipv4], 'ipv6': [], 'mac': 'aa:bb'}],
+        'os': {'system': 'Linux', 'release': '6.1', 'version': '#1'},
+    }
+
+
+def test_static_facts_are_collected_once(mocker):
+    """platform.processor() and friends run once per process, not per report."""
+    processor = mocker.patch('src.collectors.hardware.platform.processor', return_value='x86_64')
+    inventory = HardwareInventory()
+    first = inventory.collect()
+    second = inventory.collect()
+    assert processor.call_count == 1
+    assert first['cpu'] == second['cpu']
+    assert len(inventory.static_fingerprint) == 64
+
+
+def test_change_detection_ignores_volatile_noise():
+    """Free memory and small disk growth are not material; addresses and big disk changes are."""
+    now = [0.0]
+    inventory = HardwareInventory(disk_change_gb=1.0, resend_interval=100, clock=lambda: now[0])
+    assert inventory.has_changed(make_info()) is True
+
+    inventory.mark_uploaded(make_info())
+    assert inventory.has_changed(make_info(used_gb=10.4, available_gb=5.0)) is False
+    assert inventory.has_changed(make_info(used_gb=11.5)) is True
+    assert inventory.has_changed(make_info(ipv4='10.0.0.9')) is True
+
+    now[0] = 100.0
+    assert inventory.has_changed(make_info()) is True  # periodic refresh
+
+
+@responses.activate
+def test_detailed_report_omits_unchanged_hardware(mocker):
+    """Once the server has the inventory, later reports leave hardware_info out."""
+    from main import AgentOrchestrator
+
+    mocker.patch('src.api_client.ApiClient._load_token')
+    mocker.patch('main.get_hardware_info', return_value=make_info())
+    mocker.patch('main.get_software_list', return_value=[])
+    agent = AgentOrchestrator()
+    agent.api.computer_id = 5
+    responses.add(responses.POST, f"{API_BASE_URL}/computers/5/report", status=200)
+
+    assert agent.send_detailed_report() is True
+    assert b'hardware_info' in responses.calls[0].request.body
+    assert agent.send_detailed_report() is True
+    assert b'hardware_info' not in responses.calls[1].request.body
+
+
+def test_unresponsive_root_mount_keeps_the_last_disk_values(mocker):
+    """A root probe that times out reuses the last disk block; with none known the upload is held back."""
+    probe = mocker.Mock()
+    probe.usage.return_value = None
+    mocker.patch('src.collectors.hardware.get_disk_probe', return_value=probe)
+    inventory = HardwareInventory()
+
+    assert inventory.collect()['disk'] == {}
+    assert inventory.has_changed(inventory.collect()) is False
+
+    gb = 1024 ** 3
+    probe.usage.return_value = Usage(500 * gb, 10 * gb, 490 * gb, 2.0)
+    known = inventory.collect()
+    inventory.mark_uploaded(known)
+
+    probe.usage.return_value = None
+    info = inventory.collect()
+    assert info['disk'] == {'total_gb': 500.0, 'used_gb': 10.0, 'free_gb': 490.0}
+    assert inventory.has_changed(info) is False
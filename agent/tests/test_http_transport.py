@@ -0,0 +1,113 @@
+import gzip
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+import requests
+
+from src.http_transport import Http2Adapter, HttpTransport, TransportStats
+
+
+@pytest.fixture
+def keepalive_server():
+    """Local HTTP/1.1 server that keeps connections open."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            body = self.headers.get('Authorization', 'anonymous').encode()
+            self.send_response(200)
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def test_sessions_share_connections_but_not_headers(keepalive_server):
+    """API calls and downloads reuse one pooled connection; credentials stay on their own session."""
+    transport = HttpTransport(pool_connections=2, pool_maxsize=2, http2=False)
+    api_session = transport.session({'Authorization': 'Bearer secret'})
+
+    assert api_session.get(f"{keepalive_server}/a").text == 'Bearer secret'
+    assert transport.get(f"{keepalive_server}/installer").text == 'anonymous'
+    assert api_session.get(f"{keepalive_server}/b").text == 'Bearer secret'
+
+    stats = transport.stats_snapshot()
+    assert stats['requests'] == 3
+    assert stats['connections_opened'] == 1
+    assert stats['connections_reused'] == 2
+    assert stats['http2'] is False
+    transport.close()
+
+
+def test_http2_falls_back_without_httpx(mocker):
+    """Asking for HTTP/2 without httpx installed keeps the HTTP/1.1 pools."""
+    mocker.patch.dict('sys.modules', {'httpx': None})
+    transport = HttpTransport(http2=True)
+    assert transport.http2 is False
+    assert transport.https_adapter is transport.http_adapter
+
+
+@pytest.fixture
+def gzip_server():
+    """Local server answering /gzip with a gzip-encoded body and /slow after the client gave up."""
+    stop = threading.Event()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = 'HTTP/1.1'
+
+        def do_GET(self):
+            if self.path == '/slow':
+                stop.wait(2)
+            body = gzip.compress(b'wallpaper bytes')
+            self.send_response(200)
+            self.send_header('Content-Encoding', 'gzip')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    stop.set()
+    server.shutdown()
+    server.server_close()
+
+
+def test_http2_adapter_behaves_like_requests(gzip_server):
+    """Bodies are decoded, httpx errors surface as requests exceptions and verify picks the client."""
+    pytest.importorskip('httpx')
+    adapter = Http2Adapter(TransportStats(), pool_maxsize=2)
+    session = requests.Session()
+    session.mount('http://', adapter)
+
+    assert session.get(f"{gzip_server}/gzip").content == b'wallpaper bytes'
+    assert b''.join(session.get(f"{gzip_server}/gzip", stream=True).iter_content(4)) == b'wallpaper bytes'
+
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        session.get(f"{gzip_server}/slow", timeout=(1, 0.2))
+
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        closed_port = sock.getsockname()[1]
+    with pytest.raises(requests.exceptions.ConnectionError):
+        session.get(f"http://127.0.0.1:{closed_port}/", timeout=1)
+
+    session.get(f"{gzip_server}/gzip", verify=False)
+    assert len(adapter._clients) == 2
+    adapter.shutdown()
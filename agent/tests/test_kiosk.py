@@ -0,0 +1,104 @@
+import os
+
+import psutil
+
+from src.features.kiosk import KIOSK_SCRIPT, KioskManager
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_manager(tmp_path, mocker):
+    manager = KioskManager(str(tmp_path))
+    manager.active_file = str(tmp_path / 'kiosk_active.txt')
+    manager.pid_file = str(tmp_path / 'kiosk.pid')
+    manager._clock = FakeClock()
+    mocker.patch.object(manager, '_launch')
+    return manager
+
+
+def test_running_kiosk_is_checked_by_pid_without_scanning(tmp_path, mocker):
+    """Once adopted from its PID file the kiosk is checked with is_running(), never a process scan."""
+    manager = make_manager(tmp_path, mocker)
+    (tmp_path / 'kiosk_active.txt').write_text('1')
+    (tmp_path / 'kiosk.pid').write_text('4242')
+    kiosk = mocker.Mock()
+    kiosk.cmdline.return_value = ['pythonw.exe', r'C:\agent\src\kiosk.py']
+    kiosk.is_running.return_value = True
+    mocker.patch('src.features.kiosk.psutil.Process', return_value=kiosk)
+    process_iter = mocker.patch('src.features.kiosk.psutil.process_iter')
+
+    for _ in range(5):
+        manager.enforce_kiosk_process()
+
+    assert kiosk.cmdline.call_count == 1
+    assert kiosk.is_running.call_count == 4
+    process_iter.assert_not_called()
+    manager._launch.assert_not_called()
+
+
+def test_dead_kiosk_is_relaunched_with_backoff(tmp_path, mocker):
+    """A kiosk that does not come up is relaunched after 10s, then 20s..., not on every tick."""
+    manager = make_manager(tmp_path, mocker)
+    (tmp_path / 'kiosk_active.txt').write_text('1')
+    (tmp_path / 'kiosk.pid').write_text('4242')
+    mocker.patch('src.features.kiosk.psutil.Process', side_effect=psutil.NoSuchProcess(4242))
+    mocker.patch('src.features.kiosk.psutil.process_iter', return_value=[])
+    mocker.patch('src.features.kiosk.config.KIOSK_RESTART_BACKOFF', 10)
+    mocker.patch('src.features.kiosk.config.KIOSK_MAX_RESTART_BACKOFF', 300)
+
+    launches = []
+    for step in [0, 5, 5, 15, 20]:
+        manager._clock.now += step
+        manager.enforce_kiosk_process()
+        launches.append(manager._launch.call_count)
+
+    assert launches == [1, 1, 2, 2, 3]
+
+    os.remove(tmp_path / 'kiosk_active.txt')
+    manager.enforce_kiosk_process()
+    assert manager._launches == 0
+
+
+def test_process_list_is_scanned_before_each_relaunch(tmp_path, mocker):
+    """A kiosk that could not write its PID file is found by a scan instead of being launched twice."""
+    manager = make_manager(tmp_path, mocker)
+    (tmp_path / 'kiosk_active.txt').write_text('1')
+    process_iter = mocker.patch('src.features.kiosk.psutil.process_iter', return_value=[])
+
+    manager.enforce_kiosk_process()
+    assert manager._launch.call_count == 1
+    assert (tmp_path / 'kiosk.pid').exists()
+
+    kiosk = mocker.Mock(info={'name': 'pythonw.exe', 'cmdline': ['pythonw.exe', 'kiosk.py']})
+    kiosk.is_running.return_value = True
+    process_iter.return_value = [kiosk]
+    manager._clock.now += 3600
+    manager.enforce_kiosk_process()
+    manager.enforce_kiosk_process()
+
+    assert process_iter.call_count == 2
+    assert manager._launch.call_count == 1
+    assert manager._process is kiosk
+
+
+def test_script_is_written_only_when_its_content_differs(tmp_path, mocker):
+    """Relaunches reuse the script on disk; an outdated script is replaced."""
+    manager = make_manager(tmp_path, mocker)
+    path = tmp_path / 'src' / 'kiosk.py'
+
+    assert manager.ensure_kiosk_script() == str(path)
+    assert path.read_text(encoding='utf-8') == KIOSK_SCRIPT
+    mtime = path.stat().st_mtime_ns
+    manager.ensure_kiosk_script()
+    assert KioskManager(str(tmp_path)).ensure_kiosk_script() == str(path)
+    assert path.stat().st_mtime_ns == mtime
+
+    path.write_text('old kiosk', encoding='utf-8')
+    manager.ensure_kiosk_script()
+    assert path.read_text(encoding='utf-8') == KIOSK_SCRIPT
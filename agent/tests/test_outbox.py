@@ -0,0 +1,92 @@
+from unittest.mock import MagicMock
+
+import requests
+
+from src.outbox import Outbox
+
+
+def test_outbox_survives_restart_and_dedupes(tmp_path):
+    """Entries persist across reopen; a dedupe_key keeps only the latest payload."""
+    path = tmp_path / 'outbox.db'
+    outbox = Outbox(path)
+    outbox.enqueue('report', 'POST', '/computers/1/report', {'v': 1}, dedupe_key='report')
+    outbox.enqueue('report', 'POST', '/computers/1/report', {'v': 2}, dedupe_key='report')
+    outbox.enqueue('metrics', 'POST', '/computers/1/metrics/batch', {'cpu': 5}, compressed=True)
+    outbox.close()
+
+    reopened = Outbox(path)
+    entries = reopened.peek(10)
+    assert len(reopened) == 2
+    assert [(e['kind'], e['payload'], e['compressed']) for e in entries] == [
+        ('report', {'v': 2}, False),
+        ('metrics', {'cpu': 5}, True),
+    ]
+    assert reopened.contains('report')
+
+
+def test_outbox_caps_spare_command_statuses(tmp_path):
+    """Count caps evict the oldest payloads but never command results; age caps apply to all."""
+    now = [1000.0]
+    outbox = Outbox(tmp_path / 'outbox.db', max_items=2, max_age=100, clock=lambda: now[0])
+    outbox.enqueue('command_status', 'PUT', '/commands/9/status', {'id': 9, 'status': 'completed'})
+    for i in range(4):
+        outbox.enqueue('metrics', 'POST', '/m', {'i': i})
+
+    assert [e['payload'].get('i') for e in outbox.peek(10)] == [None, 2, 3]
+
+    now[0] += 101
+    outbox.enqueue('metrics', 'POST', '/m', {'i': 4})
+    assert [e['payload'] for e in outbox.peek(10)] == [{'i': 4}]
+
+
+def test_failing_kind_does_not_block_other_kinds(tmp_path):
+    """A failed group holds back later entries of its kind only; other kinds keep draining."""
+    outbox = Outbox(tmp_path / 'outbox.db')
+    outbox.enqueue('metrics', 'POST', '/m', {'i': 0})
+    outbox.enqueue('report', 'POST', '/r', {'i': 1})
+    outbox.enqueue('metrics', 'POST', '/m', {'i': 2})
+    outbox.enqueue('report', 'POST', '/r', {'i': 3})
+    sent = []
+
+    def sender(kind, entries):
+        sent.extend(e['payload']['i'] for e in entries)
+        return [] if kind == 'report' else [e['id'] for e in entries]
+
+    assert outbox.drain(sender) == (2, False)
+    assert sent == [0, 1, 2]
+    assert [(e['payload']['i'], e['attempts']) for e in outbox.peek(10)] == [(1, 1), (3, 0)]
+
+
+def test_rejected_command_status_is_acked(mocker):
+    """A command status the server rejects with 4xx leaves the outbox instead of blocking it."""
+    from main import AgentOrchestrator
+
+    mocker.patch('src.api_client.ApiClient._load_token')
+    agent = AgentOrchestrator()
+    agent.api.computer_id = 1
+    agent.outbox.enqueue('command_status', 'PUT', '/commands/7/status', {'id': 7, 'status': 'completed'})
+    agent.outbox.enqueue('report', 'POST', '/computers/1/report', {'hostname': 'lab-01'})
+    mocker.patch.object(agent.api, 'post', return_value=MagicMock(status_code=422))
+    agent.api.request = MagicMock(return_value=MagicMock(status_code=201))
+
+    assert agent.drain_outbox() is True
+    assert len(agent.outbox) == 0
+
+
+def test_orchestrator_stores_payloads_offline_and_replays(mocker):
+    """Reports sent while the API is down land in the outbox and are replayed once it is back."""
+    from main import AgentOrchestrator
+
+    mocker.patch('src.api_client.ApiClient._load_token')
+    agent = AgentOrchestrator()
+    agent.api.computer_id = 1
+    mocker.patch.object(agent, 'build_detailed_report', return_value={'hostname': 'lab-01'})
+    mocker.patch.object(agent.api, 'post', side_effect=requests.exceptions.ConnectionError("offline"))
+
+    assert agent.send_detailed_report() is True
+    assert len(agent.outbox) == 1
+
+    agent.api.request = MagicMock(return_value=MagicMock(status_code=201))
+    assert agent.drain_outbox() is True
+    assert len(agent.outbox) == 0
+    agent.api.request.assert_called_once_with('POST', '/computers/1/report', json={'hostname': 'lab-01'})
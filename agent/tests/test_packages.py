@@ -0,0 +1,106 @@
+import os
+import sqlite3
+import struct
+
+from src.collectors.packages import (
+    PackageInventory, PackageSource, iter_dpkg_packages, iter_rpm_packages,
+)
+
+DPKG_STATUS = """Package: bash
+Status: install ok installed
+Installed-Size: 1864
+Maintainer: Ubuntu Developers <ubuntu-devel@lists.ubuntu.com>
+Architecture: amd64
+Version: 5.2-1
+Description: GNU Bourne Again SHell
+ Bash is an sh-compatible command language interpreter.
+
+Package: removed-pkg
+Status: deinstall ok config-files
+Architecture: amd64
+Version: 1.0
+
+Package: libc6
+Status: install ok installed
+Architecture: amd64
+Version: 2.39-0ubuntu8
+"""
+
+
+def rpm_header(tags):
+    """Build a minimal RPM header blob: (tag, type, value) with types 4 (int32) and 6 (string)."""
+    index, data = b'', b''
+    for tag, kind, value in tags:
+        if kind == 4:
+            while len(data) % 4:
+                data += b'\0'
+            encoded = struct.pack('>I', value)
+        else:
+            encoded = value.encode() + b'\0'
+        index += struct.pack('>IIII', tag, kind, len(data), 1)
+        data += encoded
+    return struct.pack('>II', len(tags), len(data)) + index + data
+
+
+def test_dpkg_status_parser_streams_installed_packages(tmp_path):
+    """Every installed stanza is yielded (no cap), with size and architecture; removed ones are skipped."""
+    status = tmp_path / 'status'
+    status.write_text(DPKG_STATUS)
+    info = tmp_path / 'info'
+    info.mkdir()
+    (info / 'bash.list').write_text('/bin/bash\n')
+    os.utime(info / 'bash.list', (1700000000, 1700000000))
+
+    packages = list(iter_dpkg_packages(str(status), str(info)))
+    assert [p['name'] for p in packages] == ['bash', 'libc6']
+    assert packages[0]['version'] == '5.2-1'
+    assert packages[0]['size_kb'] == 1864
+    assert packages[0]['architecture'] == 'amd64'
+    assert packages[0]['installed_at'] == 1700000000
+    assert packages[1]['installed_at'] is None
+    assert packages[0]['vendor'] is None  # as 'dpkg -l' reported it
+
+
+def test_rpm_sqlite_headers_are_decoded(tmp_path):
+    """Name, epoch:version-release, arch, size and install time come straight from the header blob."""
+    db = tmp_path / 'rpmdb.sqlite'
+    conn = sqlite3.connect(db)
+    conn.execute('CREATE TABLE Packages (hnum INTEGER PRIMARY KEY, blob BLOB)')
+    conn.execute('INSERT INTO Packages (blob) VALUES (?)', (rpm_header([
+        (1000, 6, 'firefox'), (1001, 6, '121.0'), (1002, 6, '1.fc39'), (1003, 4, 2),
+        (1008, 4, 1700000000), (1009, 4, 2048 * 1024), (1022, 6, 'x86_64'),
+    ]),))
+    conn.execute('INSERT INTO Packages (blob) VALUES (?)', (rpm_header([(1000, 6, 'gpg-pubkey')]),))
+    conn.commit()
+    conn.close()
+
+    packages = list(iter_rpm_packages(str(db)))
+    assert len(packages) == 1
+    assert packages[0]['name'] == 'firefox'
+    assert packages[0]['version'] == '2:121.0-1.fc39'
+    assert packages[0]['size_kb'] == 2048
+    assert packages[0]['installed_at'] == 1700000000
+    assert packages[0]['architecture'] == 'x86_64'
+
+
+def test_inventory_reparses_only_when_database_changes(tmp_path):
+    """Unchanged mtime/size reuses the parsed records; a rewrite triggers a new parse."""
+    status = tmp_path / 'status'
+    status.write_text(DPKG_STATUS)
+    reads = []
+
+    def reader():
+        reads.append(1)
+        return iter_dpkg_packages(str(status), str(tmp_path))
+
+    inventory = PackageInventory([
+        PackageSource('dpkg', reader, [str(status)]),
+        PackageSource('rpm', lambda: iter([]), [str(tmp_path / 'missing.sqlite')]),
+    ])
+    assert len(inventory.collect()) == 2
+    assert len(inventory.collect()) == 2
+    assert len(reads) == 1
+
+    status.write_text(DPKG_STATUS.split('\n\n')[0] + '\n')
+    assert [p['name'] for p in inventory.collect()] == ['bash']
+    assert len(reads) == 2
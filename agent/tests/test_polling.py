@@ -0,0 +1,81 @@
+from unittest.mock import MagicMock
+
+from src.commands.polling import AdaptivePollController
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def response(headers=None):
+    return MagicMock(headers=headers or {})
+
+
+def make_controller():
+    clock = FakeClock()
+    controller = AdaptivePollController(base_interval=5, fast_interval=0.5, fast_window=30,
+                                        max_interval=30, backoff_factor=2, clock=clock)
+    return controller, clock
+
+
+def test_idle_backoff_is_capped():
+    """Empty polls back off exponentially from the base interval up to the cap."""
+    controller, _ = make_controller()
+    intervals = []
+    for _ in range(5):
+        controller.observe(response(), 0)
+        intervals.append(controller.next_interval())
+
+    assert intervals == [5, 10, 20, 30, 30]
+
+
+def test_activity_enables_fast_mode_for_a_window():
+    """A received command or a server activity hint switches to sub-second polling."""
+    controller, clock = make_controller()
+    for _ in range(4):
+        controller.observe(response(), 0)
+
+    controller.observe(response(), 1)
+    assert controller.next_interval() == 0.5
+
+    clock.now += 31
+    assert controller.next_interval() == 5
+
+    controller.observe(response({'X-Agent-Activity': '1'}), 0)
+    assert controller.next_interval() == 0.5
+
+
+def test_server_interval_hint_wins():
+    """X-Poll-Interval overrides the local policy and is clamped to sane bounds."""
+    controller, _ = make_controller()
+    controller.observe(response({'X-Poll-Interval': '120'}), 1)
+    assert controller.next_interval() == 120
+
+    controller.observe(response({'X-Poll-Interval': '0'}), 0)
+    assert controller.next_interval() == 0.25
+
+    controller.observe(response({'X-Poll-Interval': 'bogus'}), 0)
+    assert controller.next_interval() == 0.5  # still inside the fast window
+
+
+def test_pushed_commands_switch_polling_to_fast(mocker):
+    """Commands arriving on the push channel count as activity, like polled ones."""
+    from main import AgentOrchestrator
+
+    mocker.patch('src.api_client.ApiClient._load_token')
+    agent = AgentOrchestrator()
+    agent.poll_controller.on_idle()
+    agent.poll_controller.on_idle()
+    agent.scheduler.every('commands', 300, lambda: None, run_now=False)
+    process = mocker.patch.object(agent, 'process_commands')
+
+    agent.on_pushed_commands([{'id': 1, 'command': 'ps_list'}])
+
+    process.assert_called_once_with([{'id': 1, 'command': 'ps_list'}])
+    assert agent.poll_controller.next_interval() == agent.poll_controller.fast_interval
+    assert agent.scheduler.get_job('commands').interval == agent.poll_controller.fast_interval
+    agent.scheduler.stop(wait=False)
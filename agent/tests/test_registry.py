@@ -0,0 +1,81 @@
+import threading
+import time
+
+import responses
+
+from src.collectors.registry import CollectorRegistry, PARTIAL_ERROR, PARTIAL_STALE, PARTIAL_TIMEOUT
+from src.config import API_BASE_URL
+
+
+def test_collectors_run_concurrently_within_their_deadlines():
+    """Slow collectors overlap, and a hung one only costs its own deadline."""
+    hang = threading.Event()
+    registry = CollectorRegistry(max_workers=4)
+    registry.register('a', lambda: time.sleep(0.2) or 'a', timeout=2)
+    registry.register('b', lambda: time.sleep(0.2) or 'b', timeout=2)
+    registry.register('hung', lambda: hang.wait(10), timeout=0.3)
+    registry.register('broken', lambda: 1 / 0, timeout=2)
+
+    started = time.monotonic()
+    result = registry.run()
+    elapsed = time.monotonic() - started
+    hang.set()
+
+    assert result.values == {'a': 'a', 'b': 'b'}
+    assert result.partial == {'hung': PARTIAL_TIMEOUT, 'broken': PARTIAL_ERROR}
+    assert elapsed < 1.0
+
+
+def test_hung_collector_is_not_restarted_and_reuses_last_value():
+    """While a previous run is stuck, the last good value comes back marked stale."""
+    release = threading.Event()
+    calls = []
+
+    def probe():
+        calls.append(1)
+        if len(calls) > 1:
+            release.wait(10)
+        return len(calls)
+
+    registry = CollectorRegistry(max_workers=2)
+    registry.register('disks', probe, timeout=0.2)
+    assert registry.run().values == {'disks': 1}
+    assert registry.run().partial == {'disks': PARTIAL_TIMEOUT}
+
+    result = registry.run()
+    assert result.values == {'disks': 1}
+    assert result.partial == {'disks': PARTIAL_STALE}
+    assert len(calls) == 2
+    release.set()
+
+
+def test_cadence_reuses_recent_results():
+    """A collector with an interval is not probed again until its result ages out."""
+    now = [0.0]
+    calls = []
+    registry = CollectorRegistry(max_workers=1, clock=lambda: now[0])
+    registry.register('sensors', lambda: calls.append(1) or len(calls), timeout=1, interval=60)
+    assert registry.run().get('sensors') == 1
+    now[0] = 30.0
+    assert registry.run().get('sensors') == 1
+    now[0] = 61.0
+    assert registry.run().get('sensors') == 2
+
+
+@responses.activate
+def test_report_is_assembled_from_finished_collectors(mocker):
+    """A software probe that overruns leaves the report with hardware only and a partial marker."""
+    from main import AgentOrchestrator
+
+    release = threading.Event()
+    mocker.patch('src.api_client.ApiClient._load_token')
+    mocker.patch('main.get_hardware_info', return_value={'cpu': {'logical_cores': 4}})
+    mocker.patch('main.get_software_list', side_effect=lambda: release.wait(5) and [])
+    mocker.patch.dict('src.config.COLLECTOR_TIMEOUTS', {'software': 0.2})
+    agent = AgentOrchestrator()
+
+    report = agent.build_detailed_report()
+    release.set()
+    assert report['hardware_info'] == {'cpu': {'logical_cores': 4}}
+    assert 'softwares' not in report and 'softwares_hash' not in report
+    assert report['partial_collectors'] == {'software': PARTIAL_TIMEOUT}
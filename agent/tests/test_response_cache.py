@@ -0,0 +1,118 @@
+import responses
+
+from src.api_client import ApiClient
+from src.config import API_BASE_URL
+
+URL = f"{API_BASE_URL}/agent/me"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def make_client(mocker, ttl=60, stale_window=300):
+    mocker.patch('src.api_client.ApiClient._load_token')
+    api = ApiClient()
+    clock = FakeClock()
+    api.response_cache._clock = clock
+    api.cache_policies = {'/agent/me': (ttl, stale_window)}
+    # Run background revalidation inline so the tests are deterministic
+    mocker.patch.object(api, '_revalidate_in_background',
+                        side_effect=lambda endpoint, key, ttl, kwargs: api._revalidate(endpoint, key, ttl, kwargs))
+    return api, clock
+
+
+@responses.activate
+def test_fresh_response_is_served_without_a_request(mocker):
+    """Within the ttl /agent/me is answered from memory."""
+    api, clock = make_client(mocker)
+    responses.add(responses.GET, URL, json={'lab': {'default_wallpaper_url': '/a.png'}}, status=200)
+
+    first = api.get_cached('/agent/me')
+    clock.now += 30
+    second = api.get_cached('/agent/me')
+
+    assert len(responses.calls) == 1
+    assert second.status_code == 200
+    assert second.json() == first.json()
+    assert second.from_cache == 'fresh'
+    assert api.stats.snapshot()['endpoints']['GET /agent/me']['cache_hits'] == 1
+
+
+@responses.activate
+def test_expired_response_is_revalidated_with_validators(mocker):
+    """After ttl + stale window the GET is conditional and a 304 reuses the stored body."""
+    api, clock = make_client(mocker, ttl=60, stale_window=0)
+    responses.add(responses.GET, URL, json={'lab': None}, status=200,
+                  headers={'ETag': '"v1"', 'Last-Modified': 'Wed, 01 Jan 2025 00:00:00 GMT'})
+    responses.add(responses.GET, URL, status=304, headers={'ETag': '"v1"'})
+
+    api.get_cached('/agent/me')
+    clock.now += 61
+    response = api.get_cached('/agent/me')
+
+    sent = responses.calls[1].request.headers
+    assert sent['If-None-Match'] == '"v1"'
+    assert sent['If-Modified-Since'] == 'Wed, 01 Jan 2025 00:00:00 GMT'
+    assert response.status_code == 200
+    assert response.json() == {'lab': None}
+    assert response.from_cache == 'revalidated'
+
+    # The 304 made the entry fresh again
+    clock.now += 30
+    api.get_cached('/agent/me')
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_stale_response_is_served_while_revalidating(mocker):
+    """Inside the stale window the old body is returned and the refresh happens in the background."""
+    api, clock = make_client(mocker, ttl=60, stale_window=300)
+    responses.add(responses.GET, URL, json={'lab': {'default_wallpaper_enabled': True}}, status=200)
+    responses.add(responses.GET, URL, json={'lab': {'default_wallpaper_enabled': False}}, status=200)
+
+    api.get_cached('/agent/me')
+    clock.now += 120
+    stale = api.get_cached('/agent/me')
+    fresh = api.get_cached('/agent/me')
+
+    assert stale.from_cache == 'stale'
+    assert stale.json()['lab']['default_wallpaper_enabled'] is True
+    assert fresh.json()['lab']['default_wallpaper_enabled'] is False
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_cache_control_overrides_the_configured_ttl(mocker):
+    """max-age shortens the lifetime and no-store keeps the response out of the cache."""
+    api, clock = make_client(mocker, ttl=60, stale_window=0)
+    responses.add(responses.GET, URL, json={}, status=200, headers={'Cache-Control': 'private, max-age=10'})
+    responses.add(responses.GET, URL, json={}, status=200, headers={'Cache-Control': 'no-store'})
+    responses.add(responses.GET, URL, json={}, status=200)
+
+    api.get_cached('/agent/me')
+    clock.now += 11
+    api.get_cached('/agent/me')
+    api.get_cached('/agent/me')
+
+    assert len(responses.calls) == 3
+    assert 'If-None-Match' not in responses.calls[2].request.headers
+
+
+@responses.activate
+def test_laravel_default_cache_control_keeps_the_configured_ttl(mocker):
+    """Laravel's framework-default "no-cache, private" does not turn every call into a revalidation."""
+    api, clock = make_client(mocker, ttl=60, stale_window=300)
+    responses.add(responses.GET, URL, json={'lab': None}, status=200,
+                  headers={'Cache-Control': 'no-cache, private'})
+
+    for _ in range(5):
+        clock.now += 5
+        assert api.get_cached('/agent/me').status_code == 200
+
+    assert len(responses.calls) == 1
+    api._revalidate_in_background.assert_not_called()
@@ -0,0 +1,28 @@
+from src.collectors.sampler import MetricsSampler, RingBuffer
+
+
+def test_ring_buffer_wraps_in_order():
+    """The ring keeps the newest samples, in chronological order, without growing."""
+    ring = RingBuffer(3)
+    for t in range(5):
+        ring.append(float(t), t * 10.0)
+
+    assert len(ring) == 3
+    assert ring.items() == ([2.0, 3.0, 4.0], [20.0, 30.0, 40.0])
+    assert ring.items(since=2.0) == ([3.0, 4.0], [30.0, 40.0])
+    assert ring.latest() == (4.0, 40.0)
+
+
+def test_sampler_reads_are_non_blocking(mocker):
+    """Metrics are read from the sampled buffers; cpu_percent is never called with an interval."""
+    cpu = mocker.patch('src.collectors.sampler.psutil.cpu_percent', side_effect=[0.0, 10.0, 30.0])
+    clock = iter([100.0, 102.0, 104.0]).__next__
+    sampler = MetricsSampler(capacity=8, clock=clock)
+
+    sampler.sample_once()
+    sampler.sample_once()
+
+    assert all(call.kwargs == {'interval': None} for call in cpu.call_args_list)
+    assert sampler.latest()['cpu_percent'] == 30.0
+    assert sampler.mean('cpu_percent', 60) == 20.0
+    assert sampler.latest()['memory_total'] > 0
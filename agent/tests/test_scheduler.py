@@ -0,0 +1,136 @@
+import threading
+from concurrent.futures import Future
+
+from src.utils.scheduler import Scheduler, MISSED_SKIP, MISSED_RUN_ONCE
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class InlineExecutor:
+    """Runs submitted work synchronously so the tests stay deterministic."""
+
+    def submit(self, fn, *args):
+        future = Future()
+        future.set_result(fn(*args))
+        return future
+
+    def shutdown(self, wait=True):
+        pass
+
+
+def make_scheduler():
+    clock = FakeClock()
+    return Scheduler(clock=clock, executor=InlineExecutor()), clock
+
+
+def test_periodic_job_runs_on_interval():
+    """A periodic job runs immediately and then once per interval."""
+    scheduler, clock = make_scheduler()
+    calls = []
+    scheduler.every('tick', 5, lambda: calls.append(clock.now))
+
+    assert scheduler.run_pending() == 5
+    clock.now += 4
+    scheduler.run_pending()
+    clock.now += 1
+    scheduler.run_pending()
+
+    assert calls == [1000.0, 1005.0]
+
+
+def test_failed_job_uses_retry_interval():
+    """A job returning False is retried after retry_interval instead of a full interval."""
+    scheduler, clock = make_scheduler()
+    results = [False, True]
+    calls = []
+
+    def job():
+        calls.append(clock.now)
+        return results.pop(0)
+
+    scheduler.every('metrics', 60, job, retry_interval=5)
+    scheduler.run_pending()
+    clock.now += 5
+    scheduler.run_pending()
+
+    assert calls == [1000.0, 1005.0]
+    assert scheduler.get_job('metrics').next_run == 1065.0
+
+
+def test_missed_run_policies():
+    """Late jobs are either skipped to the next slot or run once, depending on policy."""
+    scheduler, clock = make_scheduler()
+    skipped, caught_up = [], []
+    scheduler.every('skip', 10, lambda: skipped.append(clock.now), deadline=2, missed=MISSED_SKIP, run_now=False)
+    scheduler.every('once', 10, lambda: caught_up.append(clock.now), deadline=2, missed=MISSED_RUN_ONCE, run_now=False)
+
+    clock.now += 35  # both jobs are 25s late
+    scheduler.run_pending()
+
+    assert skipped == []
+    assert caught_up == [1035.0]
+    assert scheduler.get_job('skip').next_run == 1040.0
+    assert scheduler.get_job('skip').missed_count == 1
+
+
+def test_one_shot_trigger_and_cancel():
+    """One-shot jobs run once, trigger brings a job forward and cancel removes it."""
+    scheduler, clock = make_scheduler()
+    calls = []
+    scheduler.once('single', lambda: calls.append('single'), delay=3)
+    scheduler.every('report', 3600, lambda: calls.append('report'), run_now=False)
+
+    clock.now += 3
+    scheduler.run_pending()
+    scheduler.trigger('report')
+    scheduler.run_pending()
+    assert scheduler.cancel('report') is True
+    clock.now += 3600
+    scheduler.run_pending()
+
+    assert calls == ['single', 'report']
+    assert scheduler.get_job('single') is None
+
+
+def test_job_exiting_the_process_is_not_swallowed():
+    """SystemExit from a job on a worker thread is re-raised by run_forever, not lost in its Future."""
+    scheduler = Scheduler(max_workers=2)
+
+    def leave():
+        raise SystemExit(3)
+
+    job = scheduler.every('exit', 60, leave)
+    raised = []
+
+    def loop():
+        try:
+            scheduler.run_forever()
+        except SystemExit as e:
+            raised.append(e.code)
+
+    thread = threading.Thread(target=loop, daemon=True)
+    thread.start()
+    thread.join(timeout=2)
+    scheduler.stop(wait=False)
+
+    assert not thread.is_alive()
+    assert raised == [3]
+    assert job.running is False and job.run_count == 1
+
+
+def test_pool_sized_from_registered_jobs():
+    """With max_workers=None every registered job gets a worker: all run at the same time."""
+    scheduler = Scheduler(max_workers=None)
+    barrier = threading.Barrier(4, timeout=2)
+    for name in ('commands', 'metrics', 'report'):
+        scheduler.every(name, 60, barrier.wait)
+
+    scheduler.run_pending()
+    barrier.wait()  # only returns once the three jobs are running together
+    scheduler.stop()
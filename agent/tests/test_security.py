@@ -0,0 +1,37 @@
+import os
+
+from src.security import AgentIdentity
+
+
+def test_fingerprint_is_computed_once(mocker):
+    """wmic / DMI reads happen a single time per process."""
+    compute = mocker.patch('src.security._compute_hardware_fingerprint', return_value=b'\x01' * 32)
+    identity = AgentIdentity(lambda: '/nonexistent/.agent_identity')
+    identity.fingerprint()
+    identity.encryption_key()
+    identity.load()
+    assert compute.call_count == 1
+
+
+def test_credentials_are_cached_until_the_identity_file_changes(tmp_path, mocker):
+    """load() decrypts once; a rewrite of .agent_identity (e.g. by another process) is picked up."""
+    mocker.patch('src.security._compute_hardware_fingerprint', return_value=b'\x02' * 32)
+    path = tmp_path / '.agent_identity'
+    writer = AgentIdentity(lambda: path)
+    assert writer.save('key-1', 7) is True
+
+    reader = AgentIdentity(lambda: path)
+    decrypt = mocker.spy(reader._get_fernet(), 'decrypt')
+    assert reader.load() == ('key-1', 7)
+    assert reader.load() == ('key-1', 7)
+    assert decrypt.call_count == 1
+
+    writer.save('key-2', 8)
+    # Same size and possibly the same mtime tick: force a distinct mtime
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert reader.load() == ('key-2', 8)
+    assert decrypt.call_count == 2
+
+    path.unlink()
+    assert reader.load() == (None, None)
@@ -0,0 +1,137 @@
+import io
+import threading
+
+from src.features.session_probes import GsettingsMonitor, ProbeCache, parse_picture_uri
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeMonitorProcess:
+    def __init__(self, output):
+        self.stdout = io.StringIO(output)
+        self.returncode = None
+
+    def poll(self):
+        return self.returncode
+
+    def wait(self):
+        self.returncode = 0
+        return 0
+
+    def terminate(self):
+        self.returncode = -15
+
+
+def test_probe_cache_keeps_permanent_values_and_expires_ttl_ones():
+    """Facts without ttl are probed once; ttl facts are re-probed after expiry."""
+    clock = FakeClock()
+    cache = ProbeCache(clock=clock)
+    calls = []
+
+    def probe():
+        calls.append(1)
+        return len(calls)
+
+    assert cache.get('service', probe) == 1
+    clock.now += 10 ** 6
+    assert cache.get('service', probe) == 1
+
+    assert cache.get('wallpaper', probe, ttl=60) == 2
+    clock.now += 30
+    assert cache.get('wallpaper', probe, ttl=60) == 2
+    clock.now += 31
+    assert cache.get('wallpaper', probe, ttl=60) == 3
+
+
+def test_gsettings_monitor_reports_changes_and_exit():
+    """Each monitor line updates the value; the exit callback lets callers fall back to polling."""
+    seen, exited = [], []
+    process = FakeMonitorProcess("picture-uri: 'file:///usr/share/a.png'\npicture-uri: 'file:///tmp/b.jpg'\n")
+    monitor = GsettingsMonitor('org.gnome.desktop.background', 'picture-uri',
+                               on_change=lambda value: seen.append(parse_picture_uri(value)),
+                               on_exit=lambda: exited.append(True),
+                               popen=lambda *args, **kwargs: process)
+
+    assert monitor.start()
+    monitor._thread.join(timeout=2)
+
+    assert seen == ['/usr/share/a.png', '/tmp/b.jpg']
+    assert exited == [True]
+    assert not monitor.alive
+
+
+def test_current_wallpaper_is_probed_once_while_monitored(mocker, monkeypatch):
+    """In steady state the wallpaper loop spawns no gsettings process."""
+    from src.features import wallpaper as wallpaper_module
+
+    monkeypatch.setenv('DBUS_SESSION_BUS_ADDRESS', 'unix:path=/run/user/1000/bus')
+    mocker.patch.object(wallpaper_module.platform, 'system', return_value='Linux')
+    run_silent = mocker.patch.object(wallpaper_module, 'run_silent')
+    run_silent.return_value.returncode = 0
+    run_silent.return_value.stdout = "'file:///var/cache/a.png'\n"
+    released = threading.Event()
+
+    def silent_output():
+        released.wait(5)
+        yield from ()
+
+    process = FakeMonitorProcess('')
+    process.stdout = silent_output()
+    mocker.patch('src.features.session_probes.subprocess.Popen', return_value=process)
+
+    manager = wallpaper_module.WallpaperManager(mocker.Mock())
+    for _ in range(5):
+        assert manager._get_current_wallpaper_path() == '/var/cache/a.png'
+    assert run_silent.call_count == 1
+
+    manager._probes.set('current_wallpaper', parse_picture_uri("'file:///tmp/new.png'"))
+    assert manager._get_current_wallpaper_path() == '/tmp/new.png'
+    assert run_silent.call_count == 1
+    released.set()
+
+
+def test_exited_monitor_is_restarted(mocker, monkeypatch):
+    """A gsettings monitor that dies is started again after the restart interval."""
+    from src.features import wallpaper as wallpaper_module
+
+    monkeypatch.setenv('DBUS_SESSION_BUS_ADDRESS', 'unix:path=/run/user/1000/bus')
+    mocker.patch.object(wallpaper_module.platform, 'system', return_value='Linux')
+    mocker.patch.object(wallpaper_module, 'run_silent').return_value.returncode = 1
+    mocker.patch('src.features.wallpaper.config.WALLPAPER_MONITOR_RESTART_INTERVAL', 0)
+    popen = mocker.patch('src.features.session_probes.subprocess.Popen',
+                         side_effect=lambda *args, **kwargs: FakeMonitorProcess(''))
+
+    manager = wallpaper_module.WallpaperManager(mocker.Mock())
+    manager._get_current_wallpaper_path()
+    manager._wallpaper_monitor._thread.join(timeout=2)
+    assert not manager._wallpaper_monitor.alive
+
+    manager._get_current_wallpaper_path()
+    assert popen.call_count == 2
+
+
+def test_service_wallpaper_loop_spawns_nothing(mocker):
+    """A Linux service never asks gsettings for the session wallpaper; unchanged images are not re-sent."""
+    from src.features import wallpaper as wallpaper_module
+    from src.features.wallpaper_cache import WallpaperFile
+
+    mocker.patch.object(wallpaper_module.platform, 'system', return_value='Linux')
+    run_silent = mocker.patch.object(wallpaper_module, 'run_silent')
+    manager = wallpaper_module.WallpaperManager(mocker.Mock())
+    manager._cached_lab_wallpaper_url = 'http://server.test/lab.jpg'
+    mocker.patch.object(manager, '_probe_linux_service', return_value=True)
+    mocker.patch.object(manager, '_download_wallpaper', return_value=WallpaperFile('/cache/abc.jpg', 'abc', False))
+    mocker.patch.object(manager, '_wallpaper_variant', return_value='/cache/abc-1920x1080.jpg')
+    set_wallpaper = mocker.patch.object(manager, '_set_wallpaper', return_value='/shared/wallpaper.jpg')
+
+    for _ in range(5):
+        manager.apply_lab_wallpaper()
+
+    assert set_wallpaper.call_count == 1
+    run_silent.assert_not_called()
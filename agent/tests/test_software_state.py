@@ -0,0 +1,81 @@
+import responses
+
+from src.collectors.software_state import SoftwareInventoryState, diff_inventories, inventory_hash
+from src.config import API_BASE_URL
+
+BASE = [
+    {'name': 'firefox', 'version': '120', 'vendor': 'Mozilla'},
+    {'name': 'vlc', 'version': '3.0', 'vendor': None},
+]
+
+
+def test_diff_reports_added_removed_and_upgraded():
+    """A package whose version changed is an upgrade, not a remove plus add."""
+    new = [
+        {'name': 'firefox', 'version': '121', 'vendor': 'Mozilla'},
+        {'name': 'gimp', 'version': '2.10', 'vendor': None},
+    ]
+    diff = diff_inventories(BASE, new)
+    assert diff['added'] == [{'name': 'gimp', 'version': '2.10', 'vendor': None}]
+    assert diff['removed'] == [{'name': 'vlc', 'version': '3.0', 'vendor': None}]
+    assert diff['upgraded'] == [{'name': 'firefox', 'version': '121', 'vendor': 'Mozilla', 'from_version': '120'}]
+    assert inventory_hash(BASE) == inventory_hash(list(reversed(BASE)))
+
+
+def test_state_sends_full_then_hash_then_diff(tmp_path):
+    """Full list first, then only the hash while unchanged, then a diff against the acknowledged base."""
+    state = SoftwareInventoryState(tmp_path / 'state.json')
+    assert 'softwares' in state.build(BASE)
+    state.acknowledge(inventory_hash(BASE))
+
+    assert state.build(BASE) == {'softwares_hash': inventory_hash(BASE)}
+    state.acknowledge(inventory_hash(BASE))
+
+    changed = BASE + [{'name': 'gimp', 'version': '2.10', 'vendor': None}]
+    fields = state.build(changed)
+    assert 'softwares' not in fields
+    assert fields['softwares_base_hash'] == inventory_hash(BASE)
+    assert fields['softwares_diff']['added'] == [{'name': 'gimp', 'version': '2.10', 'vendor': None}]
+
+    # The server ends up with something else: resync in full
+    state.acknowledge('mismatch')
+    assert 'softwares' in state.build(changed)
+
+    # The acknowledged base survives a restart
+    state.acknowledge(inventory_hash(changed))
+    restarted = SoftwareInventoryState(tmp_path / 'state.json')
+    assert restarted.build(changed) == {'softwares_hash': inventory_hash(changed)}
+
+
+def test_legacy_server_keeps_getting_full_lists_only_when_changed(tmp_path):
+    """Servers that never echo a hash never receive diffs."""
+    state = SoftwareInventoryState(tmp_path / 'state.json')
+    state.build(BASE)
+    state.acknowledge(None)
+    assert state.build(BASE) == {'softwares_hash': inventory_hash(BASE)}
+    state.acknowledge(None)
+    assert 'softwares' in state.build(BASE[:1])
+
+
+@responses.activate
+def test_detailed_report_resyncs_after_conflict(mocker):
+    """A 409 from the report endpoint makes the next report carry the full list."""
+    from main import AgentOrchestrator
+
+    mocker.patch('src.api_client.ApiClient._load_token')
+    mocker.patch('main.get_hardware_info', return_value={})
+    mocker.patch('main.get_software_list', return_value=BASE)
+    agent = AgentOrchestrator()
+    agent.api.computer_id = 5
+    url = f"{API_BASE_URL}/computers/5/report"
+    responses.add(responses.POST, url, json={'softwares_hash': inventory_hash(BASE)}, status=200)
+
+    assert agent.send_detailed_report() is True
+    assert agent.send_detailed_report() is True
+    assert b'"softwares"' not in responses.calls[1].request.body
+
+    responses.replace(responses.POST, url, status=409)
+    agent.send_detailed_report()
+    responses.replace(responses.POST, url, status=200)
+    agent.send_detailed_report()
+    assert b'"softwares"' in responses.calls[3].request.body
@@ -0,0 +1,82 @@
+from unittest.mock import MagicMock
+
+from src.commands.status import StatusReporter
+
+
+def make_api(post_status=200, put_status=200):
+    api = MagicMock()
+    api.post.return_value = MagicMock(status_code=post_status)
+    api.put.return_value = MagicMock(status_code=put_status)
+    return api
+
+
+def buffered_reporter(api):
+    reporter = StatusReporter(api, max_batch=100)
+    reporter._thread = MagicMock()  # pretend the flusher runs so report() only buffers
+    return reporter
+
+
+def test_transitions_are_merged_into_one_batch():
+    """processing -> completed within one window is sent once, in a single request."""
+    api = make_api()
+    reporter = buffered_reporter(api)
+    reporter.report(1, 'processing')
+    reporter.report(2, 'failed', 'Comando expirado')
+    reporter.report(1, 'completed', 'ok')
+    reporter.report(1, 'processing')  # late 'processing' must not override the result
+
+    assert reporter.has_unsent(1)
+    assert reporter.flush() is True
+
+    api.post.assert_called_once()
+    updates = api.post.call_args.kwargs['json']['updates']
+    assert updates == [
+        {'id': 1, 'status': 'completed', 'output': 'ok'},
+        {'id': 2, 'status': 'failed', 'output': 'Comando expirado'},
+    ]
+    assert not reporter.has_unsent(1)
+
+
+def test_falls_back_to_individual_puts_without_batch_endpoint():
+    """A 404 on the batch endpoint switches to one PUT per merged transition."""
+    api = make_api(post_status=404)
+    reporter = buffered_reporter(api)
+    reporter.report(5, 'processing')
+    reporter.report(5, 'completed', 'done')
+    reporter.flush()
+
+    assert reporter.batch_supported is False
+    api.put.assert_called_once_with('/commands/5/status', json={'status': 'completed', 'output': 'done'})
+
+
+def test_terminal_status_is_requeued_until_delivered():
+    """Terminal states survive a failed flush; 'processing' ones are dropped."""
+    api = make_api(post_status=503)
+    reporter = buffered_reporter(api)
+    reporter.report(1, 'completed', 'ok')
+    reporter.report(2, 'processing')
+
+    assert reporter.flush() is False
+    assert reporter.has_unsent(1)
+    assert not reporter.has_unsent(2)
+
+    api.post.return_value = MagicMock(status_code=200)
+    assert reporter.flush() is True
+    assert api.post.call_args.kwargs['json']['updates'] == [{'id': 1, 'status': 'completed', 'output': 'ok'}]
+
+
+def test_rejected_updates_are_dropped_and_throttled_ones_retried():
+    """A 4xx rejection is permanent (dropped); 408/429/5xx and connection errors are retried."""
+    api = make_api(post_status=422)
+    reporter = buffered_reporter(api)
+    updates = [{'id': 1, 'status': 'completed', 'output': 'ok'}]
+    assert reporter.send_updates(updates) == []
+
+    api.post.return_value = MagicMock(status_code=429)
+    assert reporter.send_updates(updates) == updates
+
+    reporter.batch_supported = False
+    api.put.side_effect = [MagicMock(status_code=404), MagicMock(status_code=408),
+                           ConnectionError('down'), MagicMock(status_code=200)]
+    updates = [{'id': i, 'status': 'failed'} for i in range(4)]
+    assert [u['id'] for u in reporter.send_updates(updates)] == [1, 2]
@@ -0,0 +1,118 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+import pytest
+
+from src.api_client import ApiClient
+from src.commands.transport import LongPollTransport, LONG_POLL_HEADER
+
+
+class StandInServer:
+    """Minimal local stand-in for the backend pending-commands endpoint."""
+
+    def __init__(self, long_poll=True):
+        self.long_poll = long_poll
+        self.queue = []
+        self.requests = 0
+        self.cond = threading.Condition()
+        outer = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                outer.requests += 1
+                wait = float(parse_qs(urlparse(self.path).query).get('wait', ['0'])[0])
+                with outer.cond:
+                    if outer.long_poll and not outer.queue:
+                        outer.cond.wait(timeout=wait)
+                    commands, outer.queue[:] = list(outer.queue), []
+                body = json.dumps(commands).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                if outer.long_poll:
+                    self.send_header(LONG_POLL_HEADER, str(int(wait)))
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.httpd.server_address[1]}/api/v1"
+
+    def push(self, command):
+        with self.cond:
+            self.queue.append(command)
+            self.cond.notify_all()
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def make_transport(mocker, server, received, **kwargs):
+    mocker.patch('src.api_client.ApiClient._load_token')
+    mocker.patch('src.config.API_BASE_URL', server.base_url)
+    api = ApiClient()
+    api.computer_id = 7
+    return LongPollTransport(api, received.extend, **kwargs)
+
+
+def test_long_poll_delivers_commands_immediately(mocker):
+    """A command queued on the server reaches the agent while the request is held open."""
+    received = []
+    with StandInServer(long_poll=True) as server:
+        transport = make_transport(mocker, server, received, wait_seconds=2, grace_seconds=1)
+        transport.start()
+        deadline = time.monotonic() + 4  # first heartbeat arrives after wait_seconds
+        while not transport.is_active() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert transport.is_active()
+
+        time.sleep(0.2)  # let the next request be held by the server
+        pushed_at = time.monotonic()
+        server.push({'id': 1, 'command': 'lock'})
+        while not received and time.monotonic() < pushed_at + 2:
+            time.sleep(0.01)
+        latency = time.monotonic() - pushed_at
+        transport.stop(timeout=3)
+
+    assert received == [{'id': 1, 'command': 'lock'}]
+    assert latency < 1
+
+
+def test_falls_back_to_polling_without_server_support(mocker):
+    """A server that answers immediately leaves the channel inactive, so polling takes over."""
+    received = []
+    with StandInServer(long_poll=False) as server:
+        server.push({'id': 2, 'command': 'ps_list'})
+        transport = make_transport(mocker, server, received, wait_seconds=2, probe_interval=60)
+        assert transport.poll_once() == [{'id': 2, 'command': 'ps_list'}]
+
+    assert transport.supported is False
+    assert transport.is_active() is False
+
+
+def test_reconnects_with_backoff_after_failure(mocker):
+    """Connection errors mark the channel inactive and are retried with backoff."""
+    received = []
+    with StandInServer() as server:
+        transport = make_transport(mocker, server, received, wait_seconds=1, max_backoff=0.1)
+    # Server is gone: every attempt fails
+    transport.start()
+    time.sleep(0.5)
+    transport.stop(timeout=2)
+
+    assert transport.failures >= 2
+    assert transport.is_active() is False
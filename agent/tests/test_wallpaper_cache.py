@@ -0,0 +1,78 @@
+import hashlib
+import os
+
+import requests
+import responses
+
+from src.features.wallpaper_cache import WallpaperCache
+
+URL = "http://server.test/storage/wallpapers/lab.png"
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+@responses.activate
+def test_unchanged_image_is_revalidated_not_downloaded(tmp_path):
+    """A 304 reuses the sha256-named file; within the revalidate interval no request is made."""
+    clock = FakeClock()
+    cache = WallpaperCache(tmp_path, keep=3, revalidate_interval=300, clock=clock)
+    body = b"\x89PNG first"
+    responses.add(responses.GET, URL, body=body, status=200, headers={'ETag': '"abc"'})
+    responses.add(responses.GET, URL, status=304)
+
+    first = cache.fetch(URL, requests.Session())
+    assert first.changed
+    assert first.sha256 == hashlib.sha256(body).hexdigest()
+    assert os.path.basename(first.path) == f"{first.sha256}.png"
+
+    clock.now += 10
+    assert cache.fetch(URL, requests.Session()).path == first.path
+    assert len(responses.calls) == 1
+
+    clock.now += 300
+    again = cache.fetch(URL, requests.Session())
+    assert responses.calls[1].request.headers['If-None-Match'] == '"abc"'
+    assert again.path == first.path
+    assert not again.changed
+
+
+@responses.activate
+def test_new_content_gets_a_new_file_and_old_versions_are_evicted(tmp_path):
+    """Only changed content produces a new path; at most keep versions stay on disk."""
+    clock = FakeClock()
+    cache = WallpaperCache(tmp_path, keep=2, revalidate_interval=0, clock=clock)
+    paths = []
+    for i in range(3):
+        responses.add(responses.GET, URL, body=f"image {i}".encode(), status=200)
+        result = cache.fetch(URL, requests.Session())
+        assert result.changed
+        paths.append(result.path)
+        os.utime(result.path, (i, i))
+    # Same bytes again: not a change, same file
+    responses.add(responses.GET, URL, body=b"image 2", status=200)
+    assert not cache.fetch(URL, requests.Session()).changed
+
+    assert len(set(paths)) == 3
+    assert not os.path.exists(paths[0])
+    assert os.path.exists(paths[2])
+    assert not [p for p in os.listdir(tmp_path) if p.startswith('.download-')]
+
+
+@responses.activate
+def test_failed_download_leaves_no_partial_file(tmp_path):
+    """HTTP errors raise and never replace the cached image."""
+    cache = WallpaperCache(tmp_path, keep=3, revalidate_interval=0)
+    responses.add(responses.GET, URL, status=500)
+
+    try:
+        cache.fetch(URL, requests.Session())
+        assert False, "expected HTTPError"
+    except requests.HTTPError:
+        pass
+    assert [p for p in os.listdir(tmp_path) if p != 'index.json'] == []
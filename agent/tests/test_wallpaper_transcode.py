@@ -0,0 +1,51 @@
+import os
+
+from PIL import Image
+
+from src.features.wallpaper_transcode import WallpaperVariants, drm_resolution, target_size
+
+
+def make_image(path, size):
+    Image.new('RGB', size, (30, 120, 200)).save(path, format='JPEG', quality=95)
+    return str(path)
+
+
+def test_target_size_covers_the_screen_without_upscaling():
+    """The variant keeps the aspect ratio, fills the screen and never grows the source."""
+    assert target_size((6000, 4000), (1920, 1080)) == (1920, 1280)
+    assert target_size((4000, 6000), (1920, 1080)) == (1920, 2880)
+    assert target_size((1280, 720), (1920, 1080)) == (1280, 720)
+
+
+def test_variants_are_cached_per_hash_and_resolution(tmp_path):
+    """Each (content, resolution) pair is transcoded once; a source that fits is used as is."""
+    source = make_image(tmp_path / 'source.jpg', (4000, 3000))
+    small = make_image(tmp_path / 'small.jpg', (800, 600))
+    variants = WallpaperVariants(tmp_path / 'variants', keep=2, fmt='JPEG')
+
+    hd = variants.variant(source, 'abc', (1920, 1080))
+    assert os.path.basename(hd) == 'abc-1920x1080.jpg'
+    with Image.open(hd) as img:
+        assert img.size == (1920, 1440)
+    mtime = os.stat(hd).st_mtime_ns
+    assert variants.variant(source, 'abc', (1920, 1080)) == hd
+    assert os.stat(hd).st_mtime_ns >= mtime
+
+    assert variants.variant(source, 'abc', (1366, 768)) != hd
+    assert variants.variant(small, 'def', (1920, 1080)) == small
+
+    variants.variant(source, 'abc', (1280, 720))
+    assert len(os.listdir(tmp_path / 'variants')) == 2
+
+
+def test_drm_resolution_picks_the_largest_connected_output(tmp_path):
+    """Preferred modes are read from sysfs; disconnected outputs are ignored."""
+    for name, status, modes in [('card0-HDMI-A-1', 'connected', '1920x1080\n1280x720\n'),
+                                ('card0-DP-1', 'connected', '2560x1440\n'),
+                                ('card0-DP-2', 'disconnected', '')]:
+        (tmp_path / name).mkdir()
+        (tmp_path / name / 'status').write_text(status + '\n')
+        (tmp_path / name / 'modes').write_text(modes)
+
+    assert drm_resolution(str(tmp_path)) == (2560, 1440)
+    assert drm_resolution(str(tmp_path / 'missing')) is None
@@ -0,0 +1,117 @@
+import os
+import threading
+import time
+
+from src.features.wallpaper_watcher import PENDING_FILE, PendingWallpaperWatcher
+
+
+def start(watcher):
+    thread = threading.Thread(target=watcher.run, daemon=True)
+    thread.start()
+    return thread
+
+
+def wait_for(predicate, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+def write_pending(directory, path):
+    tmp = directory / (PENDING_FILE + '.tmp')
+    tmp.write_text(path, encoding='utf-8')
+    os.replace(tmp, directory / PENDING_FILE)
+
+
+def test_inotify_applies_as_soon_as_the_service_writes(tmp_path):
+    """A renamed-in pending file is applied without waiting for a poll."""
+    applied = []
+    watcher = PendingWallpaperWatcher(tmp_path, apply=lambda: applied.append(1) or True,
+                                      poll_interval=3600, rescan_interval=3600)
+    thread = start(watcher)
+    assert wait_for(lambda: watcher._inotify is not None)
+
+    write_pending(tmp_path, '/var/lib/iflab-agent/wallpaper.jpg')
+    assert wait_for(lambda: len(applied) == 1)
+    (tmp_path / 'unrelated.txt').write_text('x')
+    write_pending(tmp_path, '/var/lib/iflab-agent/wallpaper.png')
+    assert wait_for(lambda: len(applied) == 2)
+
+    watcher.stop()
+    thread.join(timeout=3)
+    assert len(applied) == 2
+
+
+def test_poll_fallback_applies_only_changed_files(tmp_path):
+    """Without inotify the file's stat signature is polled; an unchanged file is not re-applied."""
+    write_pending(tmp_path, '/a.jpg')
+    applied = []
+    watcher = PendingWallpaperWatcher(tmp_path, apply=lambda: applied.append(1) or True,
+                                      poll_interval=0.02, use_inotify=False)
+    thread = start(watcher)
+    assert wait_for(lambda: len(applied) == 1)
+    time.sleep(0.1)
+    assert len(applied) == 1
+
+    write_pending(tmp_path, '/b.jpg')
+    assert wait_for(lambda: len(applied) == 2)
+    watcher.stop()
+    thread.join(timeout=3)
+
+
+def test_failed_apply_is_retried_with_backoff(tmp_path):
+    """A wallpaper that fails to apply (desktop not ready yet) is retried until it succeeds."""
+    write_pending(tmp_path, '/a.jpg')
+    results = [False, False, True]
+    calls = []
+
+    def apply():
+        calls.append(time.monotonic())
+        return results[len(calls) - 1]
+
+    watcher = PendingWallpaperWatcher(tmp_path, apply=apply, poll_interval=3600, rescan_interval=3600,
+                                      retry_interval=0.05)
+    thread = start(watcher)
+    assert wait_for(lambda: len(calls) == 3)
+    time.sleep(0.3)
+    watcher.stop()
+    thread.join(timeout=3)
+
+    assert len(calls) == 3
+    assert calls[2] - calls[1] >= calls[1] - calls[0] >= 0.05
+
+
+def test_linux_service_hands_the_image_to_the_session_watcher(tmp_path, mocker):
+    """The root service writes pending_wallpaper.txt instead of running gsettings; the watcher applies it."""
+    from src.features import wallpaper as wallpaper_module
+
+    shared = tmp_path / 'shared'
+    shared.mkdir()
+    image = tmp_path / 'abc.jpg'
+    image.write_bytes(b'jpeg')
+    mocker.patch.object(wallpaper_module.platform, 'system', return_value='Linux')
+    run_silent = mocker.patch.object(wallpaper_module, 'run_silent')
+
+    session = wallpaper_module.WallpaperManager(mocker.Mock())
+    mocker.patch.object(session, '_wallpaper_shared_dir', return_value=shared)
+    set_direct = mocker.patch.object(session, '_set_wallpaper_direct')
+    watcher = PendingWallpaperWatcher(shared, apply=session.apply_from_pending,
+                                      poll_interval=3600, rescan_interval=3600)
+    thread = start(watcher)
+    assert wait_for(lambda: watcher._inotify is not None)
+
+    service = wallpaper_module.WallpaperManager(mocker.Mock())
+    mocker.patch.object(service, '_probe_linux_service', return_value=True)
+    mocker.patch.object(service, '_wallpaper_shared_dir', return_value=shared)
+    dest = service._set_wallpaper(str(image))
+
+    assert (shared / PENDING_FILE).read_text(encoding='utf-8') == dest
+    assert open(dest, 'rb').read() == b'jpeg'
+    run_silent.assert_not_called()
+    assert wait_for(lambda: set_direct.call_count == 1)
+    set_direct.assert_called_once_with(dest)
+    watcher.stop()
+    thread.join(timeout=3)
@@ -43,6 +43,15 @@ except ImportError:
         API_BASE_URL = os.getenv('API_BASE_URL', 'http://localhost:8000/api/v1')
         INSTALLATION_TOKEN = os.getenv('INSTALLATION_TOKEN', '')
 
+# Reuse the agent's pooled HTTP transport when available (one connection for check + download)
+try:
+    from src.http_transport import get_transport
+    http = get_transport().session()
+    CONNECT_TIMEOUT = config.HTTP_CONNECT_TIMEOUT
+except ImportError:
+    http = requests.Session()
+    CONNECT_TIMEOUT = 10
+
 
 def get_current_version():
     """Get the current agent version."""
@@ -79,11 +88,11 @@ def check_for_updates(api_base_url, token=None):
         url = urljoin(api_base_url.rstrip('/') + '/', 'agent/check-update')
         
         current_version = get_current_version()
-        response = requests.get(
+        response = http.get(
             url,
             headers=headers,
             params={'current_version': current_version},
-            timeout=10
+            timeout=(CONNECT_TIMEOUT, 10)
         )
         
         if response.status_code == 200:
@@ -115,7 +124,7 @@ def download_update(download_url, token=None):
             headers['Authorization'] = f'Bearer {token}'
         
         logger.info(f"Downloading update from {download_url}...")
-        response = requests.get(download_url, headers=headers, stream=True, timeout=60)
+        response = http.get(download_url, headers=headers, stream=True, timeout=(CONNECT_TIMEOUT, 60))
         response.raise_for_status()
         
         # Save to temporary file